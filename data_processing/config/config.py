@@ -1,4 +1,7 @@
 # src/backend/data_processing/config.py
+import os
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 
 class PredictionConfig:
@@ -19,6 +22,12 @@ class PredictionConfig:
         "min_data_points": 8,
         "lags": [1, 2, 4],
         "rolling_windows": [4, 8],
+        # Estrategia ML: "recursive" (un paso a la vez) o "direct" (multi-horizonte)
+        "ml_strategy": "recursive",
+        "direct_max_training_rows": 50000,
+        # Cadencia del pronóstico: "auto" (inferida de los datos) o alias fijo ("D", "7D")
+        "forecast_frequency": "auto",
+        "interpolate_daily": False,
     }
 
     # Configuración de Prophet (si está disponible)
@@ -29,6 +38,51 @@ class PredictionConfig:
         "seasonality_mode": "multiplicative",
     }
 
+    # Configuración de Holt-Winters por lotes (alternativa rápida a Prophet)
+    ETS_CONFIG = {
+        "seasonal": "mul",  # "add", "mul" o None
+        "seasonal_periods": 52,
+        "step_days": 7,
+        "interval_width": 0.8,
+        "param_grid": {
+            "alpha": [0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9],
+            "beta": [0.0, 0.01, 0.05, 0.1, 0.2],
+            "gamma": [0.05, 0.1, 0.2, 0.3, 0.5],
+        },
+    }
+
+    # Ejecución de Prophet: procesos en paralelo (None = núcleos disponibles),
+    # archivo único para los logs de Stan/cmdstanpy y arranque en caliente
+    # desde los parámetros del último ajuste de cada serie
+    PROPHET_RUNTIME_CONFIG = {
+        "n_workers": None,
+        "log_file": os.path.join(ROOT_DIR, "data", "logs", "prophet_stan.log"),
+        "warm_start": True,
+        "warm_start_file": os.path.join(
+            ROOT_DIR, "data", "models", "prophet_warm_start.json"
+        ),
+    }
+
+    # Registro de modelos entrenados (se reutilizan si datos y configuración no cambian);
+    # ENERGY_MODEL_DIR lo redirige (p. ej. a un directorio temporal en los tests)
+    REGISTRY_CONFIG = {
+        "enabled": True,
+        "model_dir": os.environ.get(
+            "ENERGY_MODEL_DIR", os.path.join(ROOT_DIR, "data", "models")
+        ),
+    }
+
+    # Características preparadas en disco (.npy mapeados en memoria); con los
+    # mismos datos no se recalculan y con filas anexadas solo se calculan esas.
+    # Opcional: se activa con ENERGY_FEATURE_DIR o con feature_dir en EnergyPredictor
+    FEATURE_STORE_CONFIG = {
+        "enabled": "ENERGY_FEATURE_DIR" in os.environ,
+        "store_dir": os.environ.get(
+            "ENERGY_FEATURE_DIR", os.path.join(ROOT_DIR, "data", "features")
+        ),
+        "version": 1,
+    }
+
     @classmethod
     def validate_dataframe(cls, df):
         """Validar que el DataFrame tenga las columnas necesarias"""
@@ -39,3 +93,85 @@ class PredictionConfig:
             raise ValueError(f"Columnas faltantes en el DataFrame: {missing_columns}")
 
         return True
+
+
+class DataConfig:
+    """Configuración de la ingesta de datos"""
+
+    # Tipos de las columnas normalizadas del CSV crudo
+    RAW_SCHEMA = {
+        "departamento": "category",
+        "tecnologia": "category",
+        "produccion_mwh": "float32",
+        "fecha": "datetime64[ns]",
+    }
+    DATE_FORMAT = "%Y-%m-%d"
+
+    # Ingesta de varios archivos (directorio o glob) en paralelo
+    INGEST_CONFIG = {
+        "n_workers": None,  # None = os.cpu_count()
+        # Filas del primer archivo leídas sin y con tipos para medir el ahorro
+        "memory_sample_rows": 100_000,
+    }
+    DEDUP_KEYS = ["departamento", "tecnologia", "fecha"]
+
+    # Ingesta por bloques hacia un almacén particionado por departamento/tecnología
+    STREAMING_CONFIG = {
+        "max_memory_mb": 256,
+        "partition_dir": os.path.join(ROOT_DIR, "data", "partitions"),
+        "sample_rows": 1000,
+    }
+
+    # Ingesta incremental con marca de agua por serie
+    INCREMENTAL_CONFIG = {
+        "store_dir": os.path.join(ROOT_DIR, "data", "incremental"),
+    }
+
+    # Caché columnar (Parquet, o pickle sin pyarrow) junto al CSV fuente
+    CACHE_CONFIG = {
+        "enabled": True,
+        "version": 1,
+    }
+
+    @classmethod
+    def cache_key(cls, schema=None):
+        """Todo lo que cambia el DataFrame cargado invalida la caché"""
+        return {
+            "version": cls.CACHE_CONFIG["version"],
+            "schema": schema if schema is not None else cls.RAW_SCHEMA,
+            "date_format": cls.DATE_FORMAT,
+        }
+
+
+class EDAConfig:
+    """Configuración del análisis exploratorio"""
+
+    # Secciones del EDA (EnergyEDA.insights se calcula bajo demanda)
+    SECTIONS_CONFIG = {
+        # True: main.py calcula todas las secciones al inicio (reporte completo);
+        # False: solo las que se lean (p. ej. una actualización del tablero)
+        "materialize_all": True,
+    }
+
+    # Ejecución de las secciones en paralelo (EnergyEDA.run_sections)
+    PARALLEL_CONFIG = {
+        "executor": "process",  # "process" o "thread"
+        "n_workers": None,  # None = os.cpu_count(); 1 = secuencial
+    }
+
+    # Percentiles, medianas y outliers IQR: exactos o con sketch de cuantiles
+    QUANTILE_CONFIG = {
+        "mode": "auto",  # "exact", "approx" o "auto" (aproximado desde approx_min_rows)
+        "approx_min_rows": 2_000_000,
+        "max_error": 0.01,  # error de rango normalizado del sketch
+        "seed": 42,
+    }
+
+    # Pruebas de distribución (normalidad, z-score, asimetría) sobre una muestra
+    SAMPLING_CONFIG = {
+        "mode": "auto",  # "full", "sample" o "auto" (muestra desde min_rows)
+        "min_rows": 1_000_000,
+        "sample_rows": 100_000,
+        "strata": ["departamento", "tecnologia"],
+        "seed": 42,
+    }
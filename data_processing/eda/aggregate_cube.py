@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from data_processing.import_export_Data.calendar_store import CalendarFeatureStore
+from .moments import CUBE_DIMENSIONS, merge_moments
+
+ORDERED_DIMENSIONS = ["departamento", "tecnologia"]
+STATS = ["sum", "count", "m2", "min", "max"]
+
+
+def appearance_order(df):
+    # Orden de primera aparición, para iterar como lo hacía ``unique()``
+    return {dim: list(pd.unique(df[dim])) for dim in ORDERED_DIMENSIONS}
+
+
+class AggregateCube:
+    """Cubo de agregados por (departamento, tecnologia, año, mes).
+
+    Cada celda guarda suma, conteo, M2 (suma de cuadrados de las desviaciones
+    respecto de la media de la celda), mínimo y máximo de ``produccion_mwh``;
+    con eso cualquier agregación por un subconjunto de dimensiones (y por
+    ``trimestre``, derivado del mes) se obtiene fusionando celdas, sin volver
+    a recorrer las filas. Media y desviación estándar (ddof=1) salen de
+    conteo, suma y M2 fusionados con ``merge_moments`` (Chan et al.), sin la
+    cancelación de restar cuadrados grandes.
+    """
+
+    def __init__(self, cells, order=None):
+        self.cells = cells
+        self.order = order or {}
+
+        # Códigos por dimensión para agregar con NumPy (el cubo es pequeño y
+        # el costo fijo de un groupby de pandas dominaría)
+        self._levels = {}
+        self._codes = {}
+        for dim in CUBE_DIMENSIONS + ["trimestre"]:
+            codes, levels = pd.factorize(cells[dim], sort=True)
+            self._codes[dim] = codes
+            self._levels[dim] = pd.Index(np.asarray(levels), name=dim)
+        self._stats = {stat: cells[stat].to_numpy() for stat in STATS}
+
+    @classmethod
+    def from_frame(cls, df, value="produccion_mwh", calendar=None):
+        # Año y mes desde el calendario por fecha distinta, sin recorrer ``fecha``
+        calendar = CalendarFeatureStore.for_frame(df, calendar)
+        values = df[value].to_numpy(dtype=np.float64)
+        frame = pd.DataFrame(
+            {
+                "departamento": df["departamento"].to_numpy(),
+                "tecnologia": df["tecnologia"].to_numpy(),
+                "año": calendar.column("año").to_numpy(),
+                "mes": calendar.column("mes").to_numpy(),
+                "valor": values,
+            }
+        )
+        grouped = frame.groupby(CUBE_DIMENSIONS, observed=True, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        sums = grouped["valor"].sum()
+        counts = grouped["valor"].count()
+        deviation = values - (sums.to_numpy() / counts.to_numpy())[codes]
+        cells = pd.DataFrame(
+            {
+                "sum": sums,
+                "count": counts,
+                "m2": np.bincount(codes, weights=deviation**2, minlength=len(sums)),
+                "min": grouped["valor"].min(),
+                "max": grouped["valor"].max(),
+            }
+        ).reset_index()
+        cells["trimestre"] = (cells["mes"] - 1) // 3 + 1
+        return cls(cells, appearance_order(df))
+
+    @classmethod
+    def from_moments(cls, moments, order=None):
+        """Cubo desde las celdas de un ``MomentStore``, sin recorrer las filas"""
+        cells = moments[CUBE_DIMENSIONS + STATS].copy()
+        cells["count"] = cells["count"].astype(np.int64)
+        cells["trimestre"] = (cells["mes"] - 1) // 3 + 1
+        return cls(cells, order)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def _mask(self, filters):
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in filters.items():
+            levels = self._levels[dim]
+            if value not in levels:
+                return np.zeros(len(self.cells), dtype=bool)
+            mask &= self._codes[dim] == levels.get_loc(value)
+        return mask
+
+    def rollup(self, by, **filters):
+        """Agregados por las dimensiones ``by`` (str o lista) sobre las celdas filtradas.
+
+        Ejemplo: ``cube.rollup("mes", tecnologia="Solar")["mean"]`` equivale a
+        ``df[df.tecnologia == "Solar"].groupby("mes")["produccion_mwh"].mean()``.
+        """
+        dims = [by] if isinstance(by, str) else list(by)
+        mask = self._mask(filters)
+        sizes = [len(self._levels[dim]) for dim in dims]
+        codes = [self._codes[dim][mask] for dim in dims]
+        flat = (
+            np.ravel_multi_index(codes, sizes)
+            if dims
+            else np.zeros(int(mask.sum()), dtype=np.int64)
+        )
+        keys, inverse = np.unique(flat, return_inverse=True)
+        n_keys = len(keys)
+
+        stats = {stat: values[mask] for stat, values in self._stats.items()}
+        count, total, m2, _ = merge_moments(
+            inverse,
+            stats["count"].astype(np.float64),
+            stats["sum"],
+            stats["m2"],
+            n_keys,
+        )
+        totals = {
+            "sum": total,
+            "count": count.astype(np.int64),
+            "min": np.full(n_keys, np.inf),
+            "max": np.full(n_keys, -np.inf),
+        }
+        np.minimum.at(totals["min"], inverse, stats["min"])
+        np.maximum.at(totals["max"], inverse, stats["max"])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            totals["mean"] = total / count
+            totals["std"] = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+
+        if len(dims) == 1:
+            index = self._levels[dims[0]][keys]
+        elif dims:
+            positions = np.unravel_index(keys, sizes)
+            index = pd.MultiIndex.from_arrays(
+                [self._levels[dim][pos] for dim, pos in zip(dims, positions)],
+                names=dims,
+            )
+        else:
+            index = None
+        return pd.DataFrame(totals, index=index)
+
+    def total(self, **filters):
+        """Agregados de todas las celdas (filtradas) como una Serie"""
+        totals = self.rollup([], **filters)
+        if totals.empty:
+            return pd.Series({"sum": 0.0, "count": 0, "mean": np.nan, "std": np.nan})
+        return totals.iloc[0]
+
+    def matrix(self, index="departamento", columns="tecnologia", stat="sum"):
+        """Tabla cruzada ``index`` x ``columns`` (0 donde no hay datos), como ``pd.crosstab``"""
+        return self.rollup([index, columns])[stat].unstack(columns, fill_value=0)
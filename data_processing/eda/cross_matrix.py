@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+
+def normalized_entropy(shares, present=None, axis=-1):
+    """Entropía de Shannon de ``shares`` a lo largo de ``axis`` dividida por log(n).
+
+    ``present`` marca las combinaciones que existen (por defecto todas); n es
+    cuántas hay en cada fila/columna. Con una sola presente el índice es 0.
+    """
+    shares = np.asarray(shares, dtype=np.float64)
+    if present is None:
+        present = np.ones(shares.shape, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(present & (shares > 0), shares * np.log(shares), 0.0)
+        entropy = -terms.sum(axis=axis)
+        max_entropy = np.log(present.sum(axis=axis))
+        return np.where(max_entropy > 0, entropy / max_entropy, 0.0)
+
+
+def gini_coefficient(shares):
+    # Cálculo simplificado del coeficiente de Gini
+    sorted_shares = np.sort(np.asarray(shares, dtype=np.float64))
+    n = len(sorted_shares)
+    cumsum = np.cumsum(sorted_shares)
+    return float(
+        (2 * np.sum((np.arange(1, n + 1) * sorted_shares))) / (n * cumsum[-1])
+        - (n + 1) / n
+    )
+
+
+class CrossMatrix:
+    """Análisis cruzado sobre la matriz departamento x tecnología.
+
+    Parte de la matriz de producción (0 donde no hay datos) y de la de
+    conteos, que dice qué combinaciones existen. Cada métrica (entropías,
+    concentraciones, gaps, sinergias) se calcula para todas las filas o
+    columnas a la vez con broadcasting de NumPy; Python solo recorre los
+    resultados para armar los diccionarios.
+    """
+
+    def __init__(self, production, counts, order=None):
+        self.production = production
+        self.depts = production.index
+        self.techs = production.columns
+        self.values = production.to_numpy(dtype=np.float64)
+        self.present = (
+            counts.reindex(index=self.depts, columns=self.techs, fill_value=0)
+            .to_numpy()
+            .astype(bool)
+        )
+        order = order or {}
+        self.dept_order = list(order.get("departamento", self.depts))
+        self.tech_order = list(order.get("tecnologia", self.techs))
+
+    @classmethod
+    def from_cube(cls, cube):
+        return cls(cube.matrix(stat="sum"), cube.matrix(stat="count"), cube.order)
+
+    def _shares(self, axis):
+        totals = self.values.sum(axis=axis, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.values / totals
+
+    def _masked_argmax(self, shares, axis):
+        masked = np.where(self.present, shares, -np.inf)
+        return masked.argmax(axis=axis), masked.max(axis=axis)
+
+    def dept_diversification(self):
+        """Diversificación tecnológica de cada departamento (entre sus tecnologías presentes)"""
+        shares = self._shares(axis=1)
+        scores = normalized_entropy(shares, self.present, axis=1)
+        active = (self.present & (shares > 0.01)).sum(axis=1)
+        dominant, concentration = self._masked_argmax(shares, axis=1)
+
+        diversification = {}
+        for dept in self.dept_order:
+            i = self.depts.get_loc(dept)
+            diversification[dept] = {
+                "score": float(scores[i]),
+                "tecnologias_activas": int(active[i]),
+                "tecnologia_dominante": self.techs[dominant[i]],
+                "concentracion": float(concentration[i]),
+            }
+        return diversification
+
+    def tech_specialization(self):
+        """Concentración geográfica de cada tecnología (entre los departamentos donde existe)"""
+        shares = self._shares(axis=0)
+        present = self.present
+        n_present = present.sum(axis=0)
+        leader, concentration = self._masked_argmax(shares, axis=0)
+        presence = (present & (shares > 0.01)).sum(axis=0)
+
+        # Desviación estándar (ddof=1) solo sobre los departamentos presentes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(present, shares, 0.0).sum(axis=0) / n_present
+            squares = np.where(present, (shares - mean) ** 2, 0.0).sum(axis=0)
+            std = np.where(n_present > 1, np.sqrt(squares / (n_present - 1)), np.nan)
+
+        specialization = {}
+        for tech in self.tech_order:
+            j = self.techs.get_loc(tech)
+            specialization[tech] = {
+                "departamento_lider": self.depts[leader[j]],
+                "concentracion": float(concentration[j]),
+                "presencia_geografica": int(presence[j]),
+                "distribucion_equilibrio": float(1 - std[j]),
+            }
+        return specialization
+
+    def geographic_concentration(self):
+        dept_totals = self.values.sum(axis=1)
+        shares = dept_totals / dept_totals.sum()
+        ranked = np.sort(shares)[::-1]
+
+        return {
+            "top3_concentration": float(ranked[:3].sum()),
+            "top5_concentration": float(ranked[:5].sum()),
+            "gini_coefficient": gini_coefficient(shares),
+            "departamentos_significativos": int((shares > 0.05).sum()),
+        }
+
+    def potential_synergies(self):
+        """Departamentos con una sola tecnología: candidatos a diversificar"""
+        single = self.present.sum(axis=1) == 1
+        tech_positions = self.techs.get_indexer(self.tech_order)
+        dept_totals = self.values.sum(axis=1)
+
+        synergies = []
+        for dept in self.dept_order:
+            i = self.depts.get_loc(dept)
+            if not single[i]:
+                continue
+            missing = ~self.present[i, tech_positions]
+            synergies.append(
+                {
+                    "departamento": dept,
+                    "oportunidad": "diversificacion_tecnologica",
+                    "tecnologias_potenciales": [
+                        tech for tech, gap in zip(self.tech_order, missing) if gap
+                    ],
+                    "produccion_actual": float(dept_totals[i]),
+                }
+            )
+        return synergies
+
+    def market_gaps(self):
+        """Combinaciones sin producción o por debajo de la mitad de la media de su tecnología"""
+        values = self.values
+        column_mean = values.mean(axis=0)
+        producing = values > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Potencial de una ausencia: media de los departamentos que sí producen
+            producing_mean = np.where(producing, values, 0.0).sum(
+                axis=0
+            ) / producing.sum(axis=0)
+
+        absent = values == 0
+        underdeveloped = ~absent & (values < column_mean * 0.5)
+
+        gaps = []
+        for i, j in zip(*np.nonzero(absent | underdeveloped)):
+            dept, tech = self.depts[i], self.techs[j]
+            if absent[i, j]:
+                gaps.append(
+                    {
+                        "departamento": dept,
+                        "tecnologia": tech,
+                        "potencial_estimado": float(producing_mean[j]),
+                        "tipo_gap": "ausencia_total",
+                    }
+                )
+            else:
+                gaps.append(
+                    {
+                        "departamento": dept,
+                        "tecnologia": tech,
+                        "produccion_actual": float(values[i, j]),
+                        "potencial_estimado": float(column_mean[j]),
+                        "tipo_gap": "subdesarrollo",
+                    }
+                )
+        return gaps
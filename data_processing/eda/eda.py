@@ -1,66 +1,243 @@
 import pandas as pd
 import numpy as np
 from scipy import stats
+from data_processing.config.config import EDAConfig
+from data_processing.import_export_Data.calendar_store import CalendarFeatureStore
+from data_processing.import_export_Data.data_loader import source_dtype
+from .aggregate_cube import AggregateCube, appearance_order
+from .cross_matrix import CrossMatrix, normalized_entropy
+from .eda_runner import run_sections
+from .lazy_insights import LazyInsights
+from .group_stats import grouped_stats
+from .quantile_sketch import GroupedQuantileSketch
+from .sampling import stratified_sample
 
 
 class EnergyEDA:
-    def __init__(self, df):
+    def __init__(self, df, cube=None, moments=None, sketches=None, calendar=None):
         self.df = df
-        self.insights = {}
+        self._cube = cube
+        # Columnas de calendario por fecha distinta, compartidas con otros módulos
+        self._calendar = calendar
+        # Acumuladores fusionables (MomentStore) de una ingesta incremental
+        self.moments = moments
+        # Sketch de cuantiles por departamento (modo aproximado)
+        self._sketches = sketches
+        self._sample = None
+        self._cross = None
+        self._derived_columns = []
+
+        # Cada sección se calcula la primera vez que se lee una de sus claves
+        self.insights = LazyInsights()
+        self.insights.register("calendario", self.add_calendar_columns)
+        self.insights.register(
+            "basica",
+            self.basic_info,
+            ["informacion_basica", "estadisticas_produccion", "analisis_distribucion"],
+        )
+        self.insights.register(
+            "temporal",
+            self.analyze_temporal_patterns,
+            ["estacionalidad", "analisis_temporal"],
+            depends=["calendario"],
+        )
+        self.insights.register(
+            "departamentos",
+            self.analyze_departments,
+            ["departamento_lider", "analisis_departamentos", "rankings_departamentos"],
+            depends=["calendario"],
+        )
+        self.insights.register(
+            "tecnologias",
+            self.analyze_technologies,
+            ["tecnologia_dominante", "analisis_tecnologias", "comparativa_tecnologica"],
+        )
+        self.insights.register("cruzado", self.cross_analysis, ["analisis_cruzado"])
+
+    @property
+    def cube(self):
+        """Cubo de agregados compartido por los análisis (se construye en el primer uso)"""
+        return self.build_cube()
+
+    def build_cube(self):
+        if self._cube is None and self.moments is not None:
+            self._cube = AggregateCube.from_moments(
+                self.moments.cells, appearance_order(self.df)
+            )
+        elif self._cube is None:
+            self._cube = AggregateCube.from_frame(self.df, calendar=self.calendar)
+        return self._cube
+
+    @property
+    def cross_matrix(self):
+        """Matriz departamento x tecnología del cubo (también la usa ``InsightsGenerator``)"""
+        return self.build_cross_matrix()
+
+    def build_cross_matrix(self):
+        if self._cross is None:
+            self._cross = CrossMatrix.from_cube(self.cube)
+        return self._cross
+
+    @property
+    def calendar(self):
+        """``CalendarFeatureStore`` de ``df`` (el recibido si corresponde a sus filas)"""
+        self._calendar = CalendarFeatureStore.for_frame(self.df, self._calendar)
+        return self._calendar
+
+    @property
+    def approximate_quantiles(self):
+        """Percentiles y outliers IQR desde el sketch (``EDAConfig.QUANTILE_CONFIG``)"""
+        config = EDAConfig.QUANTILE_CONFIG
+        if config["mode"] == "auto":
+            return len(self.df) >= config["approx_min_rows"]
+        return config["mode"] == "approx"
+
+    @property
+    def sketches(self):
+        """Sketch de cuantiles por departamento (una pasada, en el primer uso)"""
+        return self.build_sketches()
+
+    def build_sketches(self):
+        if self._sketches is None:
+            config = EDAConfig.QUANTILE_CONFIG
+            self._sketches = GroupedQuantileSketch.from_frame(
+                self.df, "departamento", config["max_error"], config["seed"]
+            )
+        return self._sketches
+
+    @property
+    def sampled_tests(self):
+        """Pruebas de distribución sobre una muestra (``EDAConfig.SAMPLING_CONFIG``)"""
+        config = EDAConfig.SAMPLING_CONFIG
+        if config["mode"] == "auto":
+            return len(self.df) >= config["min_rows"]
+        return config["mode"] == "sample"
+
+    @property
+    def distribution_sample(self):
+        """(valores, info) que comparten todas las pruebas de distribución.
+
+        Con muestreo activo es una muestra estratificada con semilla, tomada
+        una sola vez; si no, la columna completa.
+        """
+        return self.build_distribution_sample()
+
+    def build_distribution_sample(self):
+        if self._sample is None:
+            if self.sampled_tests:
+                config = EDAConfig.SAMPLING_CONFIG
+                values, info = stratified_sample(
+                    self.df, config["strata"], config["sample_rows"], config["seed"]
+                )
+            else:
+                values, info = self.df["produccion_mwh"], None
+            # Las pruebas reducen en el tipo recibido: float64 aunque se cargue float32
+            self._sample = (values.astype(np.float64), info)
+        return self._sample
+
+    def warm(self):
+        """Construir ya lo que comparten las secciones: cubo, matriz, sketch y muestra.
+
+        Las copias que reparte ``run_sections`` lo reciben listo en vez de
+        construirlo cada una.
+        """
+        self.build_cube()
+        self.build_cross_matrix()
+        if self.approximate_quantiles:
+            self.build_sketches()
+        self.build_distribution_sample()
+        return self
+
+    def run_sections(self, executor=None, n_workers=None):
+        """Calcular todas las secciones pendientes, en paralelo si hay más de un núcleo"""
+        return run_sections(self, executor, n_workers)
+
+    def add_calendar_columns(self):
+        """Agregar al DataFrame las columnas de calendario (una sola vez)"""
+        if "dia_semana" in self.df.columns:
+            return
+        columns = list(self.df.columns)
+        self.calendar.assign(
+            self.df, ["fecha", "mes", "trimestre", "año", "dia_semana"]
+        )
+        self._derived_columns = [c for c in self.df.columns if c not in columns]
 
     def basic_info(self):
         print("\n" + "=" * 50)
         print("📋 INFORMACIÓN BÁSICA DEL DATASET")
         print("=" * 50)
 
+        # Describe el dataset cargado, sin las columnas de calendario que
+        # agregan otras secciones (el resultado no depende del orden)
+        df = (
+            self.df.drop(columns=self._derived_columns)
+            if self._derived_columns
+            else self.df
+        )
+
         # Información básica mejorada
         basic_stats = {
-            "filas_total": len(self.df),
-            "columnas_total": len(self.df.columns),
-            "periodo_inicio": str(self.df["fecha"].min()),
-            "periodo_fin": str(self.df["fecha"].max()),
+            "filas_total": len(df),
+            "columnas_total": len(df.columns),
+            "periodo_inicio": str(pd.to_datetime(df["fecha"].min()).date()),
+            "periodo_fin": str(pd.to_datetime(df["fecha"].max()).date()),
             "dias_totales": (
-                pd.to_datetime(self.df["fecha"].max())
-                - pd.to_datetime(self.df["fecha"].min())
+                pd.to_datetime(df["fecha"].max()) - pd.to_datetime(df["fecha"].min())
             ).days,
-            "memoria_uso_mb": round(self.df.memory_usage(deep=True).sum() / 1024**2, 2),
-            "duplicados": self.df.duplicated().sum(),
-            "valores_nulos_total": self.df.isnull().sum().sum(),
+            "memoria_uso_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 2),
+            "duplicados": df.duplicated().sum(),
+            "valores_nulos_total": df.isnull().sum().sum(),
             "porcentaje_completitud": round(
-                (
-                    1
-                    - self.df.isnull().sum().sum()
-                    / (len(self.df) * len(self.df.columns))
-                )
-                * 100,
+                (1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100,
                 2,
             ),
         }
 
         # Estadísticas de producción detalladas
+        totals = self.cube.total()
+        if self.approximate_quantiles:
+            median, q25, q75 = self.sketches.overall().quantiles([0.5, 0.25, 0.75])
+        else:
+            production = self.df["produccion_mwh"].astype(np.float64)
+            median = production.median()
+            q25 = production.quantile(0.25)
+            q75 = production.quantile(0.75)
+        values, sample_info = self.distribution_sample
+        if self.moments is not None:
+            # Forma de la distribución desde los acumuladores, sin recorrer filas
+            shape = self.moments.total()
+            skewness, kurtosis = shape["skew"], shape["kurtosis"]
+        else:
+            skewness = stats.skew(values)
+            kurtosis = stats.kurtosis(values)
         produccion_stats = {
-            "produccion_total_mwh": float(self.df["produccion_mwh"].sum()),
-            "produccion_promedio_mwh": float(self.df["produccion_mwh"].mean()),
-            "produccion_mediana_mwh": float(self.df["produccion_mwh"].median()),
-            "produccion_std_mwh": float(self.df["produccion_mwh"].std()),
-            "produccion_min_mwh": float(self.df["produccion_mwh"].min()),
-            "produccion_max_mwh": float(self.df["produccion_mwh"].max()),
-            "produccion_percentil_25": float(self.df["produccion_mwh"].quantile(0.25)),
-            "produccion_percentil_75": float(self.df["produccion_mwh"].quantile(0.75)),
-            "coeficiente_variacion": float(
-                self.df["produccion_mwh"].std() / self.df["produccion_mwh"].mean()
-            ),
-            "asimetria": float(stats.skew(self.df["produccion_mwh"])),
-            "curtosis": float(stats.kurtosis(self.df["produccion_mwh"])),
+            "produccion_total_mwh": float(totals["sum"]),
+            "produccion_promedio_mwh": float(totals["mean"]),
+            "produccion_mediana_mwh": float(median),
+            "produccion_std_mwh": float(totals["std"]),
+            "produccion_min_mwh": float(totals["min"]),
+            "produccion_max_mwh": float(totals["max"]),
+            "produccion_percentil_25": float(q25),
+            "produccion_percentil_75": float(q75),
+            "coeficiente_variacion": float(totals["std"] / totals["mean"]),
+            "asimetria": float(skewness),
+            "curtosis": float(kurtosis),
         }
 
         # Análisis de distribución
         distribucion_analysis = {
-            "outliers_iqr": self._detect_outliers_iqr(),
-            "outliers_zscore": self._detect_outliers_zscore(),
-            "normalidad_test": self._test_normalidad(),
+            "outliers_iqr": self._detect_outliers_iqr(q25, q75),
+            "outliers_zscore": self._detect_outliers_zscore(values),
+            "normalidad_test": self._test_normalidad(values),
             "estacionariedad": self._test_estacionariedad(),
         }
+        if sample_info is not None:
+            distribucion_analysis["muestra"] = sample_info
+
+        if self.approximate_quantiles:
+            distribucion_analysis["cuantiles_aproximados"] = {
+                "error_rango_maximo": float(self.sketches.overall().max_error),
+            }
 
         self.insights["informacion_basica"] = basic_stats
         self.insights["estadisticas_produccion"] = produccion_stats
@@ -74,45 +251,66 @@ class EnergyEDA:
         print(f"📊 Completitud: {basic_stats['porcentaje_completitud']}%")
 
     def analyze_departments(self):
-
-        # Análisis detallado por departamentos
-        dept_stats = (
-            self.df.groupby("departamento")["produccion_mwh"]
-            .agg(["sum", "mean", "median", "std", "min", "max", "count"])
-            .round(2)
-        )
+        # La tendencia mensual necesita "mes" (también al llamarse directamente)
+        self.add_calendar_columns()
+
+        # Estadísticos de todos los departamentos en una sola pasada
+        if self.approximate_quantiles:
+            group_stats, monthly = self._sketch_department_stats()
+        elif self.moments is None:
+            group_stats, monthly = grouped_stats(self.df, "departamento")
+        else:
+            # Momentos, extremos y conteos desde los acumuladores; las filas
+            # solo se recorren para mediana, cuartiles y outliers
+            group_stats, _ = grouped_stats(self.df, "departamento", month=None)
+            exact = self.moments.rollup("departamento")
+            group_stats.update(exact[["sum", "mean", "std", "min", "max", "count"]])
+            monthly = self.moments.rollup(["departamento", "mes"])
+        dept_stats = group_stats[
+            ["sum", "mean", "median", "std", "min", "max", "count"]
+        ].round(2)
+        total_production = float(self.cube.total()["sum"])
 
         # Métricas adicionales por departamento
         dept_detailed = {}
-        for dept in self.df["departamento"].unique():
-            dept_data = self.df[self.df["departamento"] == dept]["produccion_mwh"]
+        for dept in self.cube.order["departamento"]:
+            stats_row = group_stats.loc[dept]
+            monthly_stats = monthly.loc[dept]
 
             dept_detailed[dept] = {
-                "produccion_total": float(dept_data.sum()),
-                "produccion_promedio": float(dept_data.mean()),
-                "produccion_mediana": float(dept_data.median()),
-                "desviacion_estandar": float(dept_data.std()),
-                "coeficiente_variacion": float(dept_data.std() / dept_data.mean()),
-                "min_produccion": float(dept_data.min()),
-                "max_produccion": float(dept_data.max()),
-                "rango_produccion": float(dept_data.max() - dept_data.min()),
-                "num_registros": int(len(dept_data)),
-                "porcentaje_total": float(
-                    dept_data.sum() / self.df["produccion_mwh"].sum() * 100
+                "produccion_total": float(stats_row["sum"]),
+                "produccion_promedio": float(stats_row["mean"]),
+                "produccion_mediana": float(stats_row["median"]),
+                "desviacion_estandar": float(stats_row["std"]),
+                "coeficiente_variacion": float(stats_row["std"] / stats_row["mean"]),
+                "min_produccion": float(stats_row["min"]),
+                "max_produccion": float(stats_row["max"]),
+                "rango_produccion": float(stats_row["max"] - stats_row["min"]),
+                "num_registros": int(stats_row["count"]),
+                "porcentaje_total": float(stats_row["sum"] / total_production * 100),
+                "percentil_25": float(stats_row["q25"]),
+                "percentil_75": float(stats_row["q75"]),
+                "iqr": float(stats_row["iqr"]),
+                "outliers": int(stats_row["outliers"]),
+                "tendencia_mensual": {
+                    str(k): float(v) for k, v in monthly_stats["mean"].items()
+                },
+                "estacionalidad": self._calculate_seasonality(monthly_stats),
+                "volatilidad": (
+                    float(stats_row["std"] / stats_row["mean"])
+                    if stats_row["mean"] > 0
+                    else 0.0
                 ),
-                "percentil_25": float(dept_data.quantile(0.25)),
-                "percentil_75": float(dept_data.quantile(0.75)),
-                "iqr": float(dept_data.quantile(0.75) - dept_data.quantile(0.25)),
-                "outliers": int(self._count_outliers_by_group(dept_data)),
-                "tendencia_mensual": self._calculate_monthly_trend(dept),
-                "estacionalidad": self._calculate_seasonality(dept),
-                "volatilidad": self._calculate_volatility(dept),
             }
 
         # Ranking y comparativas
         dept_ranking = {
+            # Totales con el tipo del CSV (enteros si la producción lo es)
             "ranking_produccion": dict(
-                dept_stats["sum"].sort_values(ascending=False).head(10)
+                dept_stats["sum"]
+                .astype(source_dtype(self.df["produccion_mwh"]))
+                .sort_values(ascending=False)
+                .head(10)
             ),
             "ranking_eficiencia": dict(
                 dept_stats["mean"].sort_values(ascending=False).head(10)
@@ -130,7 +328,7 @@ class EnergyEDA:
             "nombre": top_dept,
             "produccion_total": float(dept_stats.loc[top_dept, "sum"]),
             "porcentaje": float(
-                dept_stats.loc[top_dept, "sum"] / self.df["produccion_mwh"].sum() * 100
+                dept_stats.loc[top_dept, "sum"] / total_production * 100
             ),
             "superioridad": float(
                 dept_stats.loc[top_dept, "sum"] / dept_stats["sum"].nlargest(2).iloc[1]
@@ -150,26 +348,27 @@ class EnergyEDA:
     def analyze_technologies(self):
         # Análisis detallado por tecnologías
         tech_stats = (
-            self.df.groupby("tecnologia")["produccion_mwh"]
-            .agg(["sum", "mean", "median", "std", "min", "max", "count"])
-            .round(2)
-        )
+            self.cube.rollup("tecnologia")[
+                ["sum", "mean", "std", "min", "max", "count"]
+            ]
+        ).round(2)
+        total_production = self.cube.total()["sum"]
 
         tech_detailed = {}
-        for tech in self.df["tecnologia"].unique():
-            tech_data = self.df[self.df["tecnologia"] == tech]["produccion_mwh"]
+        for tech in self.cube.order["tecnologia"]:
+            tech_data = self.cube.total(tecnologia=tech)
 
             tech_detailed[tech] = {
-                "produccion_total": float(tech_data.sum()),
-                "produccion_promedio": float(tech_data.mean()),
+                "produccion_total": float(tech_data["sum"]),
+                "produccion_promedio": float(tech_data["mean"]),
                 "participacion_mercado": float(
-                    tech_data.sum() / self.df["produccion_mwh"].sum() * 100
+                    tech_data["sum"] / total_production * 100
                 ),
-                "num_instalaciones": int(len(tech_data)),
-                "eficiencia_promedio": float(tech_data.mean()),
-                "variabilidad": float(tech_data.std() / tech_data.mean()),
-                "capacidad_maxima": float(tech_data.max()),
-                "factor_utilizacion": float(tech_data.mean() / tech_data.max()),
+                "num_instalaciones": int(tech_data["count"]),
+                "eficiencia_promedio": float(tech_data["mean"]),
+                "variabilidad": float(tech_data["std"] / tech_data["mean"]),
+                "capacidad_maxima": float(tech_data["max"]),
+                "factor_utilizacion": float(tech_data["mean"] / tech_data["max"]),
                 "crecimiento_temporal": self._calculate_tech_growth(tech),
                 "distribucion_geografica": self._analyze_geographic_distribution(tech),
                 "rendimiento_por_mes": self._analyze_monthly_performance(tech),
@@ -177,17 +376,12 @@ class EnergyEDA:
             }
 
         # Comparativa entre tecnologías
+        solar_total = self.cube.total(tecnologia="Solar")["sum"]
+        eolica_total = self.cube.total(tecnologia="Eólica")["sum"]
         tech_comparison = {
-            "dominancia_solar": float(
-                self.df[self.df["tecnologia"] == "Solar"]["produccion_mwh"].sum()
-            ),
-            "dominancia_eolica": float(
-                self.df[self.df["tecnologia"] == "Eólica"]["produccion_mwh"].sum()
-            ),
-            "ratio_solar_eolica": float(
-                self.df[self.df["tecnologia"] == "Solar"]["produccion_mwh"].sum()
-                / self.df[self.df["tecnologia"] == "Eólica"]["produccion_mwh"].sum()
-            ),
+            "dominancia_solar": float(solar_total),
+            "dominancia_eolica": float(eolica_total),
+            "ratio_solar_eolica": float(solar_total / eolica_total),
             "complementariedad": self._calculate_tech_complementarity(),
             "diversificacion_indice": self._calculate_diversification_index(),
         }
@@ -197,9 +391,7 @@ class EnergyEDA:
             "lider": lider_tech,
             "produccion_total": float(tech_stats.loc[lider_tech, "sum"]),
             "participacion": float(
-                tech_stats.loc[lider_tech, "sum"]
-                / self.df["produccion_mwh"].sum()
-                * 100
+                tech_stats.loc[lider_tech, "sum"] / total_production * 100
             ),
             "ventaja_competitiva": float(
                 tech_stats.loc[lider_tech, "sum"] / tech_stats["sum"].sum() * 100
@@ -217,11 +409,7 @@ class EnergyEDA:
         )
 
     def analyze_temporal_patterns(self):
-        self.df["fecha"] = pd.to_datetime(self.df["fecha"])
-        self.df["mes"] = self.df["fecha"].dt.month
-        self.df["trimestre"] = self.df["fecha"].dt.quarter
-        self.df["año"] = self.df["fecha"].dt.year
-        self.df["dia_semana"] = self.df["fecha"].dt.dayofweek
+        self.add_calendar_columns()
 
         # Patrones temporales detallados
         temporal_analysis = {
@@ -236,11 +424,7 @@ class EnergyEDA:
         }
 
         # Identificar mejores y peores períodos
-        monthly_production = (
-            self.df.groupby("mes")["produccion_mwh"]
-            .agg(["sum", "mean", "count"])
-            .round(2)
-        )
+        monthly_production = self.cube.rollup("mes")[["sum", "mean", "count"]].round(2)
         best_month = monthly_production["sum"].idxmax()
         worst_month = monthly_production["sum"].idxmin()
 
@@ -279,22 +463,21 @@ class EnergyEDA:
         )
 
     def cross_analysis(self):
-        # Análisis cruzado mejorado
-        cross_matrix = pd.crosstab(
-            self.df["departamento"],
-            self.df["tecnologia"],
-            values=self.df["produccion_mwh"],
-            aggfunc="sum",
-        ).fillna(0)
+        # Análisis cruzado mejorado: todas las métricas salen de la matriz
+        # departamento x tecnología, sin filtrar filas por grupo
+        cross = self.cross_matrix
 
         # Métricas de diversificación y concentración
         cross_analysis = {
-            "matriz_cruzada": cross_matrix.to_dict(),
-            "diversificacion_por_depto": self._calculate_dept_diversification(),
-            "especializacion_tecnologica": self._calculate_tech_specialization(),
-            "concentracion_geografica": self._calculate_geographic_concentration(),
-            "sinergias_potenciales": self._identify_potential_synergies(),
-            "gaps_de_mercado": self._identify_market_gaps(),
+            # Totales con el tipo del CSV, como ``ranking_produccion``
+            "matriz_cruzada": cross.production.astype(
+                source_dtype(self.df["produccion_mwh"])
+            ).to_dict(),
+            "diversificacion_por_depto": cross.dept_diversification(),
+            "especializacion_tecnologica": cross.tech_specialization(),
+            "concentracion_geografica": cross.geographic_concentration(),
+            "sinergias_potenciales": cross.potential_synergies(),
+            "gaps_de_mercado": cross.market_gaps(),
             "oportunidades_expansion": self._identify_expansion_opportunities(),
         }
 
@@ -306,9 +489,7 @@ class EnergyEDA:
         print("Matriz de especialización tecnológica por departamento calculada")
 
     # Métodos auxiliares para cálculos detallados
-    def _detect_outliers_iqr(self):
-        Q1 = self.df["produccion_mwh"].quantile(0.25)
-        Q3 = self.df["produccion_mwh"].quantile(0.75)
+    def _detect_outliers_iqr(self, Q1, Q3):
         IQR = Q3 - Q1
         outliers = self.df[
             (self.df["produccion_mwh"] < (Q1 - 1.5 * IQR))
@@ -321,17 +502,58 @@ class EnergyEDA:
             "threshold_upper": float(Q3 + 1.5 * IQR),
         }
 
-    def _detect_outliers_zscore(self):
-        z_scores = np.abs(stats.zscore(self.df["produccion_mwh"]))
-        outliers = self.df[z_scores > 3]
+    def _sketch_department_stats(self):
+        """Estadísticos por departamento sin ordenar filas.
+
+        Momentos, extremos y conteos salen de los acumuladores (o del cubo) y
+        mediana/cuartiles del sketch; los outliers se cuentan contra los
+        umbrales aproximados en una pasada lineal.
+        """
+        source = self.moments if self.moments is not None else self.cube
+        group_stats = source.rollup("departamento")[
+            ["sum", "mean", "std", "min", "max", "count"]
+        ].copy()
+        quartiles = self.sketches.quantiles([0.25, 0.5, 0.75]).reindex(
+            group_stats.index
+        )
+        group_stats["median"] = quartiles[0.5]
+        group_stats["q25"] = quartiles[0.25]
+        group_stats["q75"] = quartiles[0.75]
+        group_stats["iqr"] = group_stats["q75"] - group_stats["q25"]
+        group_stats["outliers"] = self._count_outliers_by_group(
+            "departamento",
+            group_stats["q25"] - 1.5 * group_stats["iqr"],
+            group_stats["q75"] + 1.5 * group_stats["iqr"],
+        )
+        return group_stats, source.rollup(["departamento", "mes"])
+
+    def _count_outliers_by_group(self, by, lower, upper):
+        """Filas fuera de [lower, upper] de su grupo (Series indexadas por grupo)"""
+        codes, groups = pd.factorize(self.df[by])
+        positions = lower.index.get_indexer(groups)
+        values = self.df["produccion_mwh"].to_numpy(dtype=np.float64)
+
+        valid = codes >= 0
+        rows = np.where(valid, positions[codes], -1)
+        valid &= rows >= 0
+        low = lower.to_numpy()[rows]
+        high = upper.to_numpy()[rows]
+        outside = valid & ((values < low) | (values > high))
+        counts = np.bincount(rows[outside], minlength=len(lower))
+        return pd.Series(counts, index=lower.index)
+
+    def _detect_outliers_zscore(self, values):
+        z_scores = np.abs(stats.zscore(values))
+        share = float(np.mean(z_scores > 3)) if len(values) else 0.0
+        # Sobre una muestra, el conteo se extrapola al total de filas
         return {
-            "count": len(outliers),
-            "percentage": float(len(outliers) / len(self.df) * 100),
+            "count": int(round(share * len(self.df))),
+            "percentage": share * 100,
             "threshold": 3.0,
         }
 
-    def _test_normalidad(self):
-        stat, p_value = stats.normaltest(self.df["produccion_mwh"])
+    def _test_normalidad(self, values):
+        stat, p_value = stats.normaltest(values)
         return {
             "test_statistic": float(stat),
             "p_value": float(p_value),
@@ -346,31 +568,13 @@ class EnergyEDA:
             "note": "Análisis básico de estacionariedad",
         }
 
-    def _count_outliers_by_group(self, data):
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
-        IQR = Q3 - Q1
-        return len(data[(data < (Q1 - 1.5 * IQR)) | (data > (Q3 + 1.5 * IQR))])
-
-    def _calculate_monthly_trend(self, dept):
-        dept_data = self.df[self.df["departamento"] == dept]
-        monthly_avg = dept_data.groupby("mes")["produccion_mwh"].mean().to_dict()
-        return {str(k): float(v) for k, v in monthly_avg.items()}
-
-    def _calculate_seasonality(self, dept):
-        dept_data = self.df[self.df["departamento"] == dept]
-        monthly_std = dept_data.groupby("mes")["produccion_mwh"].std().mean()
-        monthly_mean = dept_data.groupby("mes")["produccion_mwh"].mean().mean()
+    def _calculate_seasonality(self, monthly_stats):
+        monthly_std = monthly_stats["std"].mean()
+        monthly_mean = monthly_stats["mean"].mean()
         return float(monthly_std / monthly_mean) if monthly_mean > 0 else 0.0
 
-    def _calculate_volatility(self, dept):
-        dept_data = self.df[self.df["departamento"] == dept]["produccion_mwh"]
-        return (
-            float(dept_data.std() / dept_data.mean()) if dept_data.mean() > 0 else 0.0
-        )
-
     def _calculate_market_concentration(self):
-        dept_shares = self.df.groupby("departamento")["produccion_mwh"].sum()
+        dept_shares = self.cube.rollup("departamento")["sum"]
         total = dept_shares.sum()
         shares = (dept_shares / total) ** 2
         hhi = shares.sum()
@@ -382,11 +586,10 @@ class EnergyEDA:
         }
 
     def _calculate_tech_growth(self, tech):
-        tech_data = self.df[self.df["tecnologia"] == tech]
-        if len(tech_data["año"].unique()) < 2:
+        yearly_production = self.cube.rollup("año", tecnologia=tech)["sum"]
+        if len(yearly_production) < 2:
             return {"growth_rate": 0.0, "trend": "insufficient_data"}
 
-        yearly_production = tech_data.groupby("año")["produccion_mwh"].sum()
         growth_rates = yearly_production.pct_change().dropna()
 
         return {
@@ -397,28 +600,25 @@ class EnergyEDA:
         }
 
     def _analyze_geographic_distribution(self, tech):
-        tech_data = self.df[self.df["tecnologia"] == tech]
-        geo_dist = (
-            tech_data.groupby("departamento")["produccion_mwh"]
-            .sum()
-            .sort_values(ascending=False)
+        geo_dist = self.cube.rollup("departamento", tecnologia=tech)["sum"].sort_values(
+            ascending=False
         )
 
         return {
-            "top_departments": geo_dist.head(5).to_dict(),
+            "top_departments": geo_dist.head(5)
+            .astype(source_dtype(self.df["produccion_mwh"]))
+            .to_dict(),
             "geographic_concentration": float(geo_dist.head(3).sum() / geo_dist.sum()),
             "presence_coverage": int(len(geo_dist[geo_dist > 0])),
         }
 
     def _analyze_monthly_performance(self, tech):
-        tech_data = self.df[self.df["tecnologia"] == tech]
-        monthly_perf = tech_data.groupby("mes")["produccion_mwh"].mean().to_dict()
+        monthly_perf = self.cube.rollup("mes", tecnologia=tech)["mean"].to_dict()
         return {str(k): float(v) for k, v in monthly_perf.items()}
 
     def _analyze_climate_correlation(self, tech):
         # Análisis básico basado en patrones estacionales
-        tech_data = self.df[self.df["tecnologia"] == tech]
-        seasonal_pattern = tech_data.groupby("mes")["produccion_mwh"].mean()
+        seasonal_pattern = self.cube.rollup("mes", tecnologia=tech)["mean"]
 
         if tech == "Solar":
             summer_months = [6, 7, 8]
@@ -439,20 +639,10 @@ class EnergyEDA:
         }
 
     def _calculate_tech_complementarity(self):
-        if (
-            "Solar" in self.df["tecnologia"].values
-            and "Eólica" in self.df["tecnologia"].values
-        ):
-            solar_monthly = (
-                self.df[self.df["tecnologia"] == "Solar"]
-                .groupby("mes")["produccion_mwh"]
-                .mean()
-            )
-            eolica_monthly = (
-                self.df[self.df["tecnologia"] == "Eólica"]
-                .groupby("mes")["produccion_mwh"]
-                .mean()
-            )
+        techs = self.cube.order["tecnologia"]
+        if "Solar" in techs and "Eólica" in techs:
+            solar_monthly = self.cube.rollup("mes", tecnologia="Solar")["mean"]
+            eolica_monthly = self.cube.rollup("mes", tecnologia="Eólica")["mean"]
             correlation = float(solar_monthly.corr(eolica_monthly))
             return {
                 "correlation": correlation,
@@ -465,12 +655,9 @@ class EnergyEDA:
         return {"correlation": 0.0, "complementarity": "no_calculable"}
 
     def _calculate_diversification_index(self):
-        tech_shares = self.df.groupby("tecnologia")["produccion_mwh"].sum()
+        tech_shares = self.cube.rollup("tecnologia")["sum"]
         total = tech_shares.sum()
-        shares = tech_shares / total
-        entropy = -sum(share * np.log(share) for share in shares if share > 0)
-        max_entropy = np.log(len(tech_shares))
-        diversification = entropy / max_entropy if max_entropy > 0 else 0
+        diversification = normalized_entropy(tech_shares / total)
 
         return {
             "diversification_score": float(diversification),
@@ -483,9 +670,7 @@ class EnergyEDA:
 
     # Métodos adicionales para análisis temporal detallado
     def _analyze_monthly_patterns(self):
-        monthly_stats = self.df.groupby("mes")["produccion_mwh"].agg(
-            ["mean", "std", "min", "max", "count"]
-        )
+        monthly_stats = self.cube.rollup("mes")
         return {
             str(k): {
                 "promedio": float(v["mean"]),
@@ -498,9 +683,7 @@ class EnergyEDA:
         }
 
     def _analyze_quarterly_patterns(self):
-        quarterly_stats = self.df.groupby("trimestre")["produccion_mwh"].agg(
-            ["sum", "mean", "count"]
-        )
+        quarterly_stats = self.cube.rollup("trimestre")
         return {
             str(k): {
                 "total": float(v["sum"]),
@@ -511,9 +694,7 @@ class EnergyEDA:
         }
 
     def _analyze_yearly_patterns(self):
-        yearly_stats = self.df.groupby("año")["produccion_mwh"].agg(
-            ["sum", "mean", "count"]
-        )
+        yearly_stats = self.cube.rollup("año")
         return {
             str(k): {
                 "total": float(v["sum"]),
@@ -524,7 +705,8 @@ class EnergyEDA:
         }
 
     def _analyze_weekly_patterns(self):
-        weekly_stats = self.df.groupby("dia_semana")["produccion_mwh"].mean().to_dict()
+        production = self.df["produccion_mwh"].astype(np.float64)
+        weekly_stats = production.groupby(self.df["dia_semana"]).mean().to_dict()
         days = [
             "Lunes",
             "Martes",
@@ -538,24 +720,21 @@ class EnergyEDA:
 
     def _analyze_time_trends(self):
         # Análisis de tendencias temporales
-        if "año" in self.df.columns:
-            yearly_production = self.df.groupby("año")["produccion_mwh"].sum()
-            if len(yearly_production) > 1:
-                trend_slope = (
-                    yearly_production.iloc[-1] - yearly_production.iloc[0]
-                ) / len(yearly_production)
-                return {
-                    "trend_direction": (
-                        "creciente" if trend_slope > 0 else "decreciente"
-                    ),
-                    "trend_magnitude": float(abs(trend_slope)),
-                    "annual_change_rate": float(yearly_production.pct_change().mean()),
-                }
+        yearly_production = self.cube.rollup("año")["sum"]
+        if len(yearly_production) > 1:
+            trend_slope = (
+                yearly_production.iloc[-1] - yearly_production.iloc[0]
+            ) / len(yearly_production)
+            return {
+                "trend_direction": ("creciente" if trend_slope > 0 else "decreciente"),
+                "trend_magnitude": float(abs(trend_slope)),
+                "annual_change_rate": float(yearly_production.pct_change().mean()),
+            }
 
         return {"trend_direction": "estable", "trend_magnitude": 0.0}
 
     def _analyze_detailed_seasonality(self):
-        monthly_prod = self.df.groupby("mes")["produccion_mwh"].sum()
+        monthly_prod = self.cube.rollup("mes")["sum"]
         seasonal_index = monthly_prod / monthly_prod.mean()
 
         return {
@@ -576,7 +755,7 @@ class EnergyEDA:
         }
 
     def _analyze_temporal_volatility(self):
-        monthly_volatility = self.df.groupby("mes")["produccion_mwh"].std()
+        monthly_volatility = self.cube.rollup("mes")["std"]
         return {
             "volatilidad_por_mes": {
                 str(k): float(v) for k, v in monthly_volatility.items()
@@ -587,138 +766,17 @@ class EnergyEDA:
         }
 
     # Métodos para análisis cruzado avanzado
-    def _calculate_dept_diversification(self):
-        diversification = {}
-        for dept in self.df["departamento"].unique():
-            dept_data = self.df[self.df["departamento"] == dept]
-            tech_shares = dept_data.groupby("tecnologia")["produccion_mwh"].sum()
-            tech_shares = tech_shares / tech_shares.sum()
-            entropy = -sum(share * np.log(share) for share in tech_shares if share > 0)
-            max_entropy = np.log(len(tech_shares))
-            div_score = entropy / max_entropy if max_entropy > 0 else 0
-
-            diversification[dept] = {
-                "score": float(div_score),
-                "tecnologias_activas": int(len(tech_shares[tech_shares > 0.01])),
-                "tecnologia_dominante": tech_shares.idxmax(),
-                "concentracion": float(tech_shares.max()),
-            }
-
-        return diversification
-
-    def _calculate_tech_specialization(self):
-        specialization = {}
-        for tech in self.df["tecnologia"].unique():
-            tech_data = self.df[self.df["tecnologia"] == tech]
-            dept_shares = tech_data.groupby("departamento")["produccion_mwh"].sum()
-            dept_shares = dept_shares / dept_shares.sum()
-
-            specialization[tech] = {
-                "departamento_lider": dept_shares.idxmax(),
-                "concentracion": float(dept_shares.max()),
-                "presencia_geografica": int(len(dept_shares[dept_shares > 0.01])),
-                "distribucion_equilibrio": float(1 - dept_shares.std()),
-            }
-
-        return specialization
-
-    def _calculate_geographic_concentration(self):
-        dept_totals = self.df.groupby("departamento")["produccion_mwh"].sum()
-        total_production = dept_totals.sum()
-        shares = dept_totals / total_production
-
-        return {
-            "top3_concentration": float(shares.nlargest(3).sum()),
-            "top5_concentration": float(shares.nlargest(5).sum()),
-            "gini_coefficient": self._calculate_gini(shares.values),
-            "departamentos_significativos": int(len(shares[shares > 0.05])),
-        }
-
-    def _calculate_gini(self, shares):
-        # Cálculo simplificado del coeficiente de Gini
-        sorted_shares = np.sort(shares)
-        n = len(sorted_shares)
-        cumsum = np.cumsum(sorted_shares)
-        return float(
-            (2 * np.sum((np.arange(1, n + 1) * sorted_shares))) / (n * cumsum[-1])
-            - (n + 1) / n
-        )
-
-    def _identify_potential_synergies(self):
-        # Identificar potenciales sinergias entre tecnologías y departamentos
-        synergies = []
-
-        for dept in self.df["departamento"].unique():
-            dept_data = self.df[self.df["departamento"] == dept]
-            tech_presence = dept_data.groupby("tecnologia")["produccion_mwh"].sum()
-
-            if len(tech_presence) == 1:  # Solo una tecnología
-                missing_tech = [
-                    t
-                    for t in self.df["tecnologia"].unique()
-                    if t not in tech_presence.index
-                ]
-                synergies.append(
-                    {
-                        "departamento": dept,
-                        "oportunidad": "diversificacion_tecnologica",
-                        "tecnologias_potenciales": missing_tech,
-                        "produccion_actual": float(tech_presence.iloc[0]),
-                    }
-                )
-
-        return synergies
-
-    def _identify_market_gaps(self):
-        # Identificar gaps en el mercado
-        cross_matrix = pd.crosstab(
-            self.df["departamento"],
-            self.df["tecnologia"],
-            values=self.df["produccion_mwh"],
-            aggfunc="sum",
-        ).fillna(0)
-
-        gaps = []
-        for dept in cross_matrix.index:
-            for tech in cross_matrix.columns:
-                if cross_matrix.loc[dept, tech] == 0:
-                    # Calcular potencial basado en departamentos similares
-                    similar_depts_avg = cross_matrix[cross_matrix[tech] > 0][
-                        tech
-                    ].mean()
-                    gaps.append(
-                        {
-                            "departamento": dept,
-                            "tecnologia": tech,
-                            "potencial_estimado": float(similar_depts_avg),
-                            "tipo_gap": "ausencia_total",
-                        }
-                    )
-                elif cross_matrix.loc[dept, tech] < cross_matrix[tech].mean() * 0.5:
-                    gaps.append(
-                        {
-                            "departamento": dept,
-                            "tecnologia": tech,
-                            "produccion_actual": float(cross_matrix.loc[dept, tech]),
-                            "potencial_estimado": float(cross_matrix[tech].mean()),
-                            "tipo_gap": "subdesarrollo",
-                        }
-                    )
-
-        return gaps
-
     def _identify_expansion_opportunities(self):
         # Identificar oportunidades de expansión
         opportunities = []
 
         # Análisis por departamento
-        dept_performance = self.df.groupby("departamento")["produccion_mwh"].agg(
-            ["sum", "mean", "count"]
-        )
+        dept_performance = self.cube.rollup("departamento")[["sum", "mean", "count"]]
+        overall_mean = self.cube.total()["mean"]
+        mean_count = dept_performance["count"].mean()
 
         for dept in dept_performance.index:
             dept_stats = dept_performance.loc[dept]
-            overall_mean = self.df["produccion_mwh"].mean()
 
             if dept_stats["mean"] > overall_mean * 1.2:  # Alto rendimiento
                 opportunities.append(
@@ -730,19 +788,14 @@ class EnergyEDA:
                         "produccion_actual": float(dept_stats["sum"]),
                     }
                 )
-            elif (
-                dept_stats["count"]
-                < self.df.groupby("departamento").size().mean() * 0.8
-            ):
+            elif dept_stats["count"] < mean_count * 0.8:
                 opportunities.append(
                     {
                         "departamento": dept,
                         "tipo": "expansion_cobertura",
                         "razon": "baja_densidad_instalaciones",
                         "instalaciones_actuales": int(dept_stats["count"]),
-                        "potencial_instalaciones": int(
-                            self.df.groupby("departamento").size().mean()
-                        ),
+                        "potencial_instalaciones": int(mean_count),
                     }
                 )
 
@@ -0,0 +1,109 @@
+import contextlib
+import copy
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from data_processing.config.config import EDAConfig
+
+# EDA del proceso trabajador (se envía una sola vez con el initializer)
+_worker_eda = None
+
+
+class _ThreadLocalStdout:
+    """stdout que, dentro de un hilo con buffer asignado, escribe en ese buffer"""
+
+    def __init__(self, target):
+        self.target = target
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.target).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+def _section_worker(eda):
+    """Copia superficial de ``eda`` que comparte DataFrame y cubo pero escribe en un dict propio"""
+    worker = copy.copy(eda)
+    worker.insights = {}
+    return worker
+
+
+def _run_in_thread(args):
+    worker, method_name, stdout = args
+    stdout.local.buffer = io.StringIO()
+    try:
+        getattr(worker, method_name)()
+        return worker.insights, stdout.local.buffer.getvalue()
+    finally:
+        stdout.local.buffer = None
+
+
+def _init_process(eda):
+    global _worker_eda
+    _worker_eda = eda
+
+
+def _run_in_process(method_name):
+    worker = _section_worker(_worker_eda)
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        getattr(worker, method_name)()
+    return worker.insights, buffer.getvalue()
+
+
+def run_sections(eda, executor=None, n_workers=None):
+    """Calcular en paralelo las secciones pendientes de ``eda.insights``.
+
+    Las columnas de calendario y lo que construye ``eda.warm()`` se preparan
+    antes, una sola vez; luego cada tanda de secciones listas (dependencias
+    resueltas) corre en un pool de hilos o procesos. Resultados y mensajes
+    se incorporan en el orden de registro, así que ``eda.insights`` y la
+    salida quedan iguales a una ejecución secuencial.
+    """
+    config = EDAConfig.PARALLEL_CONFIG
+    executor = executor or config["executor"]
+    n_workers = n_workers or config["n_workers"] or os.cpu_count() or 1
+    insights = eda.insights
+
+    # Dependencias compartidas: se calculan aquí y no en cada trabajador
+    insights.compute("calendario")
+    eda.warm()
+
+    while True:
+        ready = insights.ready()
+        if not ready:
+            break
+        workers = min(n_workers, len(ready))
+        if workers <= 1:
+            for name in ready:
+                insights.compute(name)
+            continue
+
+        methods = [insights.producer(name).__name__ for name in ready]
+        if executor == "process":
+            shared = _section_worker(eda)
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_process, initargs=(shared,)
+            ) as pool:
+                results = list(pool.map(_run_in_process, methods))
+        else:
+            stdout = _ThreadLocalStdout(sys.stdout)
+            tasks = [(_section_worker(eda), method, stdout) for method in methods]
+            sys.stdout = stdout
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_run_in_thread, tasks))
+            finally:
+                sys.stdout = stdout.target
+
+        # map conserva el orden de registro: fusión determinista
+        for name, (values, output) in zip(ready, results):
+            sys.stdout.write(output)
+            insights.store(name, values)
+
+    return insights
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+def _lerp(low, high, t):
+    # Misma interpolación lineal que np.percentile / Series.quantile
+    diff = high - low
+    return np.where(t >= 0.5, high - diff * (1 - t), low + diff * t)
+
+
+def _sorted_quantile(values, starts, counts, q):
+    """Cuantil ``q`` de cada grupo sobre valores ya ordenados dentro del grupo"""
+    position = (counts - 1) * q
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, counts - 1)
+    return _lerp(values[starts + below], values[starts + above], position - below)
+
+
+def _grouped_moments(codes, values, n_groups):
+    """Conteo, suma, media y desviación (ddof=1, en dos pasadas) por código de grupo"""
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        squares = np.bincount(
+            codes, weights=(values - means[codes]) ** 2, minlength=n_groups
+        )
+        std = np.sqrt(np.where(counts > 1, squares / (counts - 1), np.nan))
+    return counts, sums, means, std
+
+
+def grouped_stats(df, by, value="produccion_mwh", month="mes", quantiles=(0.25, 0.75)):
+    """Estadísticos de ``value`` por ``by`` en una sola pasada ordenada.
+
+    Se ordena una vez por (grupo, valor) y todo sale de reducciones NumPy
+    sobre los límites de cada grupo: suma, media, mediana, desviación,
+    mínimo, máximo, conteo, cuantiles y outliers por IQR. Si existe la
+    columna ``month`` se agregan media, desviación y conteo por grupo y mes.
+
+    Devuelve ``(stats, monthly)``: ``stats`` indexado por grupo (orden
+    alfabético, como ``groupby``) y ``monthly`` indexado por (grupo, mes), o
+    None si no hay columna de mes.
+    """
+    values = df[value].to_numpy(dtype=np.float64)
+    codes, groups = pd.factorize(df[by], sort=True)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    n_groups = len(groups)
+
+    counts, sums, means, std = _grouped_moments(codes, values, n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    ends = starts + counts - 1
+
+    stats = pd.DataFrame(
+        {
+            "sum": sums,
+            "mean": means,
+            "median": _sorted_quantile(values, starts, counts, 0.5),
+            "std": std,
+            "min": values[starts],
+            "max": values[ends],
+            "count": counts,
+        },
+        index=pd.Index(groups, name=by),
+    )
+    for q in quantiles:
+        stats[f"q{int(round(q * 100))}"] = _sorted_quantile(values, starts, counts, q)
+
+    # Outliers por IQR con los umbrales de cada grupo
+    q1 = _sorted_quantile(values, starts, counts, 0.25)
+    q3 = _sorted_quantile(values, starts, counts, 0.75)
+    iqr = q3 - q1
+    outside = (values < (q1 - 1.5 * iqr)[codes]) | (values > (q3 + 1.5 * iqr)[codes])
+    stats["iqr"] = iqr
+    stats["outliers"] = np.bincount(codes[outside], minlength=n_groups)
+
+    monthly = None
+    if month in df.columns:
+        month_codes, months = pd.factorize(df[month], sort=True)
+        month_codes = month_codes[valid][order]
+        combined = codes * len(months) + month_codes
+        m_counts, _, m_means, m_std = _grouped_moments(
+            combined, values, n_groups * len(months)
+        )
+        present = np.flatnonzero(m_counts)
+        monthly = pd.DataFrame(
+            {
+                "mean": m_means[present],
+                "std": m_std[present],
+                "count": m_counts[present],
+            },
+            index=pd.MultiIndex.from_arrays(
+                [groups[present // len(months)], months[present % len(months)]],
+                names=[by, month],
+            ),
+        )
+
+    return stats, monthly
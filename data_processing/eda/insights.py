@@ -1,11 +1,21 @@
 # data_processing/eda/insights.py - VERSIÓN MEJORADA
+import numpy as np
 import pandas as pd
+from .aggregate_cube import AggregateCube
 
 
 class InsightsGenerator:
-    def __init__(self, df, insights):
+    def __init__(self, df, insights, cube=None, pivot=None):
         self.df = df
         self.insights = insights
+        # Reutilizar el cubo de EnergyEDA si se entrega; si no, construirlo
+        self.cube = cube if cube is not None else AggregateCube.from_frame(df)
+        # Producción departamento x tecnología (la de EnergyEDA si se entrega)
+        self.pivot = (
+            pivot
+            if pivot is not None
+            else self.cube.matrix("departamento", "tecnologia")
+        )
 
     def generate_summary(self):
         """Generar resumen de insights más detallado"""
@@ -44,36 +54,44 @@ class InsightsGenerator:
         print(f"\n📊 ANÁLISIS DE EFICIENCIA:")
         print("-" * 25)
 
-        # Eficiencia por departamento (producción vs registros)
-        dept_efficiency = {}
-        for dept in self.df["departamento"].unique():
-            dept_data = self.df[self.df["departamento"] == dept]
-            avg_production = dept_data["produccion_mwh"].mean()
-            consistency = (
-                1 - (dept_data["produccion_mwh"].std() / avg_production)
-                if avg_production > 0
-                else 0
+        # Eficiencia por departamento (producción vs registros), con una sola
+        # agregación para todos los departamentos
+        depts = self.cube.order["departamento"]
+        dept_stats = self.cube.rollup("departamento").reindex(depts)
+        avg_production = dept_stats["mean"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            consistency = np.where(
+                avg_production > 0, 1 - dept_stats["std"].to_numpy() / avg_production, 0
             )
 
-            dept_efficiency[dept] = {
-                "produccion_promedio": avg_production,
-                "consistencia": consistency,
-                "total_registros": len(dept_data),
+        dept_efficiency = {
+            dept: {
+                "produccion_promedio": avg,
+                "consistencia": cons,
+                "total_registros": count,
             }
-
-            print(
-                f"   • {dept}: {avg_production:.2f} MWh promedio (Consistencia: {consistency:.2f})"
+            for dept, avg, cons, count in zip(
+                depts,
+                avg_production.tolist(),
+                consistency.tolist(),
+                dept_stats["count"].astype(np.int64).tolist(),
             )
+        }
+        print(
+            "\n".join(
+                f"   • {dept}: {values['produccion_promedio']:.2f} MWh promedio"
+                f" (Consistencia: {values['consistencia']:.2f})"
+                for dept, values in dept_efficiency.items()
+            )
+        )
 
         self.insights["eficiencia_departamental"] = dept_efficiency
 
-        # Departamento más eficiente
-        most_efficient = max(
-            dept_efficiency.items(), key=lambda x: x[1]["produccion_promedio"]
-        )
+        # Departamento más eficiente (el primero en caso de empate)
+        best = depts[int(np.argmax(avg_production))]
         self.insights["departamento_mas_eficiente"] = {
-            "nombre": most_efficient[0],
-            "eficiencia": most_efficient[1]["produccion_promedio"],
+            "nombre": best,
+            "eficiencia": dept_efficiency[best]["produccion_promedio"],
         }
 
     def _generate_growth_insights(self):
@@ -85,15 +103,16 @@ class InsightsGenerator:
         if len(self.df) > 50:  # Si hay suficientes registros
             self.df["fecha"] = pd.to_datetime(self.df["fecha"])
 
-            # Dividir en periodos
-            df_sorted = self.df.sort_values("fecha")
+            # Dividir en periodos (solo se ordenan las columnas necesarias)
+            df_sorted = self.df[["fecha", "produccion_mwh"]].sort_values("fecha")
             mid_point = len(df_sorted) // 2
 
             first_period = df_sorted.iloc[:mid_point]
             second_period = df_sorted.iloc[mid_point:]
 
-            first_avg = first_period["produccion_mwh"].mean()
-            second_avg = second_period["produccion_mwh"].mean()
+            # Promedios en float64 (la producción puede venir en float32)
+            first_avg = float(first_period["produccion_mwh"].astype(float).mean())
+            second_avg = float(second_period["produccion_mwh"].astype(float).mean())
 
             if first_avg > 0:
                 growth_rate = ((second_avg - first_avg) / first_avg) * 100
@@ -115,20 +134,20 @@ class InsightsGenerator:
         print("-" * 24)
 
         # Concentración geográfica
-        dept_production = self.df.groupby("departamento")["produccion_mwh"].sum()
+        dept_production = self.cube.rollup("departamento")["sum"]
         total_production = dept_production.sum()
 
-        concentration_risk = []
-        for dept, production in dept_production.items():
-            percentage = (production / total_production) * 100
-            if percentage > 40:  # Concentración alta
-                concentration_risk.append(
-                    {
-                        "departamento": dept,
-                        "porcentaje": percentage,
-                        "nivel_riesgo": "alto" if percentage > 60 else "medio",
-                    }
-                )
+        # Concentración alta: más del 40% de la producción
+        percentages = dept_production.to_numpy() / total_production * 100
+        high = np.flatnonzero(percentages > 40)
+        concentration_risk = [
+            {
+                "departamento": dept_production.index[i],
+                "porcentaje": float(percentages[i]),
+                "nivel_riesgo": "alto" if percentages[i] > 60 else "medio",
+            }
+            for i in high
+        ]
 
         self.insights["riesgo_concentracion"] = concentration_risk
 
@@ -141,7 +160,7 @@ class InsightsGenerator:
             print("   • Diversificación geográfica adecuada")
 
         # Diversificación tecnológica
-        tech_production = self.df.groupby("tecnologia")["produccion_mwh"].sum()
+        tech_production = self.cube.rollup("tecnologia")["sum"]
         tech_diversity = len(tech_production)
 
         self.insights["diversificacion_tecnologica"] = {
@@ -166,44 +185,40 @@ class InsightsGenerator:
         print(f"\n🔗 ANÁLISIS DE CORRELACIONES:")
         print("-" * 30)
 
-        # Correlación entre departamentos y tecnologías
-        cross_analysis = self.df.pivot_table(
-            index="departamento",
-            columns="tecnologia",
-            values="produccion_mwh",
-            aggfunc="sum",
-        ).fillna(0)
+        # Correlación entre tecnologías (sobre los departamentos): toda la
+        # matriz de una vez
+        cross_analysis = self.pivot
+        techs = list(cross_analysis.columns)
+        corr_matrix = self._correlation_matrix(cross_analysis)
 
         correlations = {}
-        if cross_analysis.shape[1] > 1:  # Si hay más de una tecnología
-            for tech1 in cross_analysis.columns:
-                for tech2 in cross_analysis.columns:
-                    if tech1 != tech2:
-                        corr = cross_analysis[tech1].corr(cross_analysis[tech2])
-                        if abs(corr) > 0.5:  # Correlación significativa
-                            correlations[f"{tech1}_vs_{tech2}"] = {
-                                "correlacion": corr,
-                                "tipo": "positiva" if corr > 0 else "negativa",
-                                "fuerza": "fuerte" if abs(corr) > 0.7 else "moderada",
-                            }
+        if len(techs) > 1:  # Si hay más de una tecnología
+            # Correlación significativa; se reportan ambos sentidos de cada par
+            significant = np.abs(corr_matrix) > 0.5
+            np.fill_diagonal(significant, False)
+            for i, j in zip(*np.nonzero(significant)):
+                corr = float(corr_matrix[i, j])
+                correlations[f"{techs[i]}_vs_{techs[j]}"] = {
+                    "correlacion": corr,
+                    "tipo": "positiva" if corr > 0 else "negativa",
+                    "fuerza": "fuerte" if abs(corr) > 0.7 else "moderada",
+                }
 
         self.insights["correlaciones_tecnologicas"] = correlations
 
         if correlations:
             for pair, data in correlations.items():
-                techs = pair.replace("_vs_", " vs ")
+                pair_names = pair.replace("_vs_", " vs ")
                 print(
-                    f"   • {techs}: Correlación {data['tipo']} {data['fuerza']} ({data['correlacion']:.2f})"
+                    f"   • {pair_names}: Correlación {data['tipo']} {data['fuerza']} ({data['correlacion']:.2f})"
                 )
         else:
             print("   • No se encontraron correlaciones significativas")
 
         # Patrón de complementariedad
-        if len(cross_analysis.columns) == 2:  # Solo para dos tecnologías
-            tech_names = list(cross_analysis.columns)
-            complementarity_score = 1 - abs(
-                cross_analysis[tech_names[0]].corr(cross_analysis[tech_names[1]])
-            )
+        if len(techs) == 2:  # Solo para dos tecnologías
+            tech_names = techs
+            complementarity_score = 1 - abs(float(corr_matrix[0, 1]))
 
             self.insights["complementariedad"] = {
                 "score": complementarity_score,
@@ -219,6 +234,16 @@ class InsightsGenerator:
                 f"   • Complementariedad {' + '.join(tech_names)}: {self.insights['complementariedad']['nivel']}"
             )
 
+    @staticmethod
+    def _correlation_matrix(pivot):
+        """Correlación de Pearson entre las columnas de ``pivot`` (NaN si no se puede calcular)"""
+        values = pivot.to_numpy(dtype=np.float64)
+        n_columns = values.shape[1]
+        if len(values) < 2 or n_columns < 2:
+            return np.full((n_columns, n_columns), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.corrcoef(values, rowvar=False)
+
     def _get_month_name(self, month_num):
         """Obtener nombre del mes"""
         months = {
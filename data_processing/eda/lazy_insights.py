@@ -0,0 +1,111 @@
+class LazyInsights(dict):
+    """Diccionario de insights cuyas secciones se calculan al leerlas.
+
+    Cada sección se registra con la función que la produce, las claves que
+    escribe y las secciones de las que depende. Leer una clave pendiente
+    (``insights["estacionalidad"]``, ``.get``) ejecuta solo su sección y sus
+    dependencias, una única vez. ``in`` responde sin calcular nada. Las vistas
+    completas (iterar, ``len``, ``items``, ``json.dump``) y ``materialize()``
+    calculan todas las secciones pendientes en orden de registro.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sections = {}
+        self._owners = {}
+        self._done = set()
+        self._running = set()
+
+    def register(self, name, producer, keys=(), depends=()):
+        """Registrar la sección ``name``: ``producer()`` escribe ``keys`` en este diccionario"""
+        self._sections[name] = (producer, tuple(keys), tuple(depends))
+        for key in keys:
+            self._owners[key] = name
+
+    def is_computed(self, name):
+        _, keys, _ = self._sections[name]
+        if name in self._done:
+            return True
+        # Secciones ejecutadas directamente (p. ej. ``eda.basic_info()``)
+        return bool(keys) and all(dict.__contains__(self, key) for key in keys)
+
+    def compute(self, name):
+        """Calcular la sección ``name`` (y sus dependencias) si aún no está calculada"""
+        if self.is_computed(name):
+            return
+        if name in self._running:
+            raise RuntimeError(f"Dependencia circular en la sección '{name}'")
+
+        producer, _, depends = self._sections[name]
+        self._running.add(name)
+        try:
+            for dependency in depends:
+                self.compute(dependency)
+            producer()
+        finally:
+            self._running.discard(name)
+        self._done.add(name)
+
+    def pending(self):
+        return [name for name in self._sections if not self.is_computed(name)]
+
+    def ready(self):
+        """Secciones pendientes cuyas dependencias ya están calculadas"""
+        return [
+            name
+            for name in self.pending()
+            if all(self.is_computed(dep) for dep in self._sections[name][2])
+        ]
+
+    def producer(self, name):
+        return self._sections[name][0]
+
+    def store(self, name, values):
+        """Guardar el resultado de una sección calculada fuera (p. ej. en otro proceso)"""
+        dict.update(self, values)
+        self._done.add(name)
+
+    def materialize(self):
+        """Calcular todas las secciones pendientes (orden de registro)"""
+        for name in self._sections:
+            self.compute(name)
+        return self
+
+    def _resolve(self, key):
+        if not dict.__contains__(self, key) and key in self._owners:
+            self.compute(self._owners[key])
+
+    def __getitem__(self, key):
+        self._resolve(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._resolve(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._owners
+
+    def __iter__(self):
+        self.materialize()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self.materialize()
+        return dict.__len__(self)
+
+    def keys(self):
+        self.materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self.materialize()
+        return dict.values(self)
+
+    def items(self):
+        self.materialize()
+        return dict.items(self)
+
+    def __reduce__(self):
+        # Al serializar (pickle/deepcopy) se entrega un dict ya calculado
+        return dict, (dict(self.items()),)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+
+def _codes(column):
+    # Las categóricas ya traen sus códigos; factorizar de nuevo es una pasada más
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(), len(column.cat.categories)
+    codes, levels = pd.factorize(column)
+    return codes, len(levels)
+
+
+def _take_quotas(rows, codes, quota, n_strata, rng):
+    """De cada estrato, ``quota`` filas al azar de ``rows`` (códigos ``codes``)"""
+    counts = np.bincount(codes, minlength=n_strata)
+    # Barajar y agrupar por estrato con un ordenamiento estable: dentro de cada
+    # estrato las filas quedan en orden aleatorio y se toman las primeras
+    shuffled = rng.permutation(len(rows))
+    by_stratum = rows[shuffled[np.argsort(codes[shuffled], kind="stable")]]
+    rank = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.sort(by_stratum[rank < np.repeat(quota, counts)])
+
+
+def stratified_sample(df, strata, size, seed=None, value="produccion_mwh"):
+    """Muestra estratificada con semilla, de ~``size`` filas.
+
+    Cada estrato (combinación de ``strata``) aporta exactamente su cuota:
+    su tamaño por la fracción ``size / filas``, redondeado y con al menos
+    una fila, así que ningún estrato desaparece y el total es la suma de
+    cuotas. Una pasada Bernoulli lineal elige candidatos con algo de
+    holgura sobre cada cuota y de ellos se toma la cuota exacta al azar.
+    Devuelve ``(valores, info)``: la serie ``value`` muestreada (en el
+    orden original) y un resumen con el tamaño obtenido, los estratos y la
+    semilla.
+    """
+    n_rows = len(df)
+    codes = np.zeros(n_rows, dtype=np.int32)
+    n_strata = 1
+    for column in strata:
+        column_codes, n_levels = _codes(df[column])
+        # +1 para que los nulos (código -1) formen su propio estrato
+        codes *= n_levels + 1
+        codes += column_codes + 1
+        n_strata *= n_levels + 1
+
+    counts = np.bincount(codes, minlength=n_strata)
+    fraction = min(1.0, size / n_rows) if n_rows else 1.0
+    quota = np.maximum(np.round(counts * fraction), np.minimum(counts, 1))
+    quota = quota.astype(np.int64)
+
+    # Candidatos: la cuota más ~4 desviaciones de holgura por estrato
+    rng = np.random.default_rng(seed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slack = quota + 4 * np.sqrt(quota) + 4
+        probability = np.where(counts > 0, np.minimum(slack / counts, 1.0), 0.0)
+    chosen = (
+        rng.random(n_rows, dtype=np.float32) < probability.astype(np.float32)[codes]
+    )
+    candidates = np.flatnonzero(chosen)
+    if (np.bincount(codes[candidates], minlength=n_strata) < quota).any():
+        # Muy improbable con esa holgura: se sortea entre todas las filas
+        candidates = np.arange(n_rows)
+    selected = _take_quotas(candidates, codes[candidates], quota, n_strata, rng)
+    sample = df[value].iloc[selected]
+
+    info = {
+        "filas_muestra": int(len(sample)),
+        "filas_total": int(n_rows),
+        "fraccion": float(fraction),
+        "estratos": list(strata),
+        "semilla": seed,
+    }
+    return sample, info
@@ -0,0 +1,109 @@
+import copy
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Estación del año por mes
+SEASON_BY_MONTH = {
+    12: "Invierno",
+    1: "Invierno",
+    2: "Invierno",
+    3: "Primavera",
+    4: "Primavera",
+    5: "Primavera",
+    6: "Verano",
+    7: "Verano",
+    8: "Verano",
+    9: "Otoño",
+    10: "Otoño",
+    11: "Otoño",
+}
+
+
+def calendar_table(dates):
+    """Características de calendario de cada fecha de ``dates`` (una fila por fecha)"""
+    fechas = pd.Series(pd.to_datetime(dates), name="fecha")
+    table = pd.DataFrame({"fecha": fechas})
+    table["año"] = fechas.dt.year
+    table["mes"] = fechas.dt.month
+    table["trimestre"] = fechas.dt.quarter
+    table["semana_año"] = fechas.dt.isocalendar().week
+    table["dia_año"] = fechas.dt.dayofyear
+    table["dia_semana"] = fechas.dt.dayofweek
+    table["estacion"] = table["mes"].map(SEASON_BY_MONTH)
+    return table
+
+
+def values_digest(values):
+    """Hash del contenido de ``values`` (sin el índice), para detectar cambios"""
+    hashed = pd.util.hash_pandas_object(pd.Series(values), index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()
+
+
+class CalendarFeatureStore:
+    """Columnas de calendario calculadas una vez por fecha distinta.
+
+    ``codes`` asigna a cada fila del DataFrame el índice de su fecha en
+    ``table``; cada columna se obtiene por ``take`` con esos códigos. Hay
+    muchas menos fechas que filas, así que ``fecha`` se interpreta y las
+    características se derivan solo sobre las fechas distintas. Se reutiliza
+    para otro DataFrame solo si tiene el mismo índice y las mismas fechas.
+    """
+
+    def __init__(self, dates, codes, index=None):
+        self.dates = pd.Index(dates)
+        self.table = calendar_table(dates)
+        self.codes = np.asarray(codes)
+        self.index = index if index is not None else pd.RangeIndex(len(self.codes))
+        self._digest = None
+
+    @classmethod
+    def from_frame(cls, df, column="fecha"):
+        # Los nulos quedan como una fecha más (NaT) en lugar del código -1
+        codes, dates = pd.factorize(df[column], use_na_sentinel=False)
+        return cls(dates, codes, df.index)
+
+    @classmethod
+    def for_frame(cls, df, calendar=None):
+        """``calendar`` si corresponde a las filas de ``df``; si no, uno nuevo"""
+        if calendar is not None and calendar.matches(df):
+            return calendar
+        return cls.from_frame(df)
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def digest(self):
+        """Hash de la fecha de cada fila (se calcula la primera vez que se compara)"""
+        if self._digest is None:
+            self._digest = values_digest(self.dates.take(self.codes))
+        return self._digest
+
+    def matches(self, df, column="fecha"):
+        """Si ``df`` tiene las mismas filas y las mismas fechas que este calendario"""
+        return (
+            len(df) == len(self.codes)
+            and df.index.equals(self.index)
+            and column in df
+            and values_digest(df[column]) == self.digest
+        )
+
+    def column(self, name):
+        """Columna ``name`` por fila, alineada con el índice del DataFrame"""
+        values = self.table[name].array.take(self.codes)
+        return pd.Series(values, index=self.index, name=name)
+
+    def take(self, positions):
+        """Calendario de las filas ``positions`` (con índice 0..n-1), sin recalcular la tabla"""
+        taken = copy.copy(self)
+        taken.codes = self.codes[positions]
+        taken.index = pd.RangeIndex(len(taken.codes))
+        taken._digest = None
+        return taken
+
+    def assign(self, df, columns, names=None):
+        """Agregar ``columns`` a ``df`` (con ``names`` como nombres de destino)"""
+        for column, name in zip(columns, names or columns):
+            df[name] = self.column(column)
+        return df
@@ -1,23 +1,197 @@
-import pandas as pd
+import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from data_processing.config.config import DataConfig
+from .frame_cache import FrameCache
+from .incremental_store import IncrementalStore
+from .partition_store import PartitionedStore
+
+
+def normalize_columns(columns):
+    """Quitar tildes de los nombres de columna (``tecnología`` -> ``tecnologia``)"""
+    return (
+        pd.Index(columns)
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("utf-8")
+    )
+
+
+def sample_memory(path, nrows, schema=None):
+    """Memoria medida (bytes) y filas de las primeras ``nrows`` filas de ``path``.
+
+    Sin ``schema`` es la lectura por defecto de ``pd.read_csv`` (cadenas
+    ``object`` y enteros/flotantes de 64 bits), la que hacía el cargador
+    antes de declarar tipos; con ``schema``, la lectura tipada.
+    """
+    if schema is None:
+        df = pd.read_csv(path, nrows=nrows)
+    else:
+        names, dtypes = schema_dtypes(path, schema)
+        df = pd.read_csv(path, dtype=dtypes, nrows=nrows)
+        df = apply_schema(df, names, schema, errors="coerce")
+    return int(df.memory_usage(deep=True).sum()), len(df)
+
+
+def source_dtype(values):
+    """Tipo con el que ``values`` vendría en el CSV, para exportar y agregar.
+
+    La producción se guarda en float32 solo para ahorrar memoria: si todos
+    los valores son enteros (como en el CSV crudo) se vuelve a int64 y, si
+    no, a float64, para no escribir ``1033.0`` ni promediar en float32.
+    """
+    if values.dtype != np.float32:
+        return values.dtype
+    data = values.to_numpy()
+    if np.isfinite(data).all() and (data == np.floor(data)).all():
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+def validate_chunk(df, schema):
+    """Descartar filas con claves/valores nulos o producción negativa"""
+    missing = [column for column in schema if column not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas del esquema: {missing}")
+
+    invalid = df[list(schema)].isna().any(axis=1)
+    if "produccion_mwh" in schema:
+        invalid |= df["produccion_mwh"] < 0
+    return df[~invalid], int(invalid.sum())
+
+
+def resolve_paths(data_path):
+    """Archivo único, directorio (todos sus ``*.csv``) o patrón glob -> lista ordenada"""
+    if os.path.isfile(data_path):
+        return [data_path]
+    if os.path.isdir(data_path):
+        paths = glob.glob(os.path.join(data_path, "*.csv"))
+    else:
+        paths = glob.glob(data_path, recursive=True)
+    paths = sorted(path for path in paths if os.path.isfile(path))
+    if not paths:
+        raise FileNotFoundError(data_path)
+    return paths
+
+
+def schema_dtypes(path, schema):
+    """Mapa columna cruda -> normalizada y tipos de lectura según el esquema"""
+    header = pd.read_csv(path, nrows=0).columns
+    names = dict(zip(header, normalize_columns(header)))
+
+    dtypes = {}
+    for raw_name, name in names.items():
+        dtype = schema.get(name)
+        if dtype is not None and not dtype.startswith("datetime"):
+            dtypes[raw_name] = dtype
+    return names, dtypes
+
+
+def apply_schema(df, names, schema, errors="raise"):
+    df.columns = [names[column] for column in df.columns]
+    for column, dtype in schema.items():
+        if column in df.columns and dtype.startswith("datetime"):
+            df[column] = pd.to_datetime(
+                df[column], format=DataConfig.DATE_FORMAT, errors=errors
+            )
+    return df
+
+
+def read_typed_csv(path, schema):
+    """Leer un CSV con los tipos declarados en el esquema"""
+    names, dtypes = schema_dtypes(path, schema)
+    df = pd.read_csv(path, dtype=dtypes)
+    return apply_schema(df, names, schema)
+
+
+def iter_csv_chunks(path, schema, chunk_rows, offset=0):
+    """Bloques tipados del CSV; con ``offset`` > 0 se lee solo desde ese byte.
+
+    Las fechas inválidas quedan como NaT para que ``validate_chunk`` las
+    descarte sin abortar una ingesta grande.
+    """
+    names, dtypes = schema_dtypes(path, schema)
+    with open(path, "rb") as f:
+        options = {"dtype": dtypes, "chunksize": chunk_rows}
+        if offset:
+            f.seek(offset)
+            options.update(header=None, names=list(names))
+        with pd.read_csv(f, **options) as reader:
+            for chunk in reader:
+                yield apply_schema(chunk, names, schema, errors="coerce")
+
+
+def load_csv(path, schema, use_cache):
+    """Leer un CSV pasando por su caché columnar; devuelve (df, desde_cache)"""
+    cache = FrameCache(path, key=DataConfig.cache_key(schema))
+    df = cache.load() if use_cache else None
+    if df is not None:
+        return df, True
+
+    df = read_typed_csv(path, schema)
+    if use_cache:
+        cache.store(df)
+    return df, False
+
+
+def _load_csv_task(task):
+    """Tarea de un proceso del pool (función de módulo para poder serializarla)"""
+    return load_csv(*task)
+
+
+def concat_frames(frames):
+    """Concatenar columna a columna, en una sola copia.
+
+    Las categóricas se unen con ``union_categoricals`` (``pd.concat`` las
+    degradaría a ``object`` si los archivos traen categorías distintas).
+    """
+    if len(frames) == 1:
+        return frames[0]
+
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[column] = union_categoricals(parts, sort_categories=True)
+        else:
+            columns[column] = np.concatenate([part.to_numpy() for part in parts])
+    return pd.DataFrame(columns)
+
 
 class DataLoader:
-    def __init__(self, data_path):
+    def __init__(self, data_path, use_cache=None, schema=None):
         self.data_path = data_path
         self.df = None
+        self.store = None
+        self.changed_series = set()
+        self.moments = None
+        self.sketches = None
+        if use_cache is None:
+            use_cache = DataConfig.CACHE_CONFIG["enabled"]
+        self.use_cache = use_cache
+        self.schema = schema if schema is not None else DataConfig.RAW_SCHEMA
 
     def load_data(self):
-        """Cargar y preparar los datos iniciales"""
+        """Cargar y preparar los datos iniciales (un archivo, un directorio o un glob)"""
         try:
-            self.df = pd.read_csv(self.data_path)
-            self.df.columns = (
-                self.df.columns.str.normalize("NFKD")
-                .str.encode("ascii", errors="ignore")
-                .str.decode("utf-8")
-            )
-            print("✅ Datos cargados exitosamente")
-            print(f"📄 Archivo cargado: {os.path.basename(self.data_path)}")
+            paths = resolve_paths(self.data_path)
+            if len(paths) == 1:
+                self.df, from_cache = load_csv(paths[0], self.schema, self.use_cache)
+                if from_cache:
+                    print("✅ Datos cargados desde caché")
+                else:
+                    print("✅ Datos cargados exitosamente")
+                print(f"📄 Archivo cargado: {os.path.basename(paths[0])}")
+            else:
+                self.df = self._load_many(paths)
+                print("✅ Datos cargados exitosamente")
+                print(f"📄 Archivos cargados: {len(paths)}")
+
             print(f"📊 Dimensiones: {self.df.shape}")
+            self._report_memory(paths[0])
             return True
         except FileNotFoundError:
             print(f"❌ Error: No se encontró el archivo {self.data_path}")
@@ -25,3 +199,216 @@ class DataLoader:
         except Exception as e:
             print(f"❌ Error al cargar datos: {e}")
             return False
+
+    def _load_many(self, paths):
+        """Leer varios CSV en paralelo y quitar duplicados entre archivos.
+
+        Si una (departamento, tecnologia, fecha) aparece en varios archivos
+        se conservan solo sus filas del último en orden de nombre: una
+        re-entrega corrige a la anterior. Dentro de un mismo archivo no se
+        quita nada, igual que al cargar un solo CSV.
+        """
+        tasks = [(path, self.schema, self.use_cache) for path in paths]
+        n_workers = DataConfig.INGEST_CONFIG["n_workers"] or os.cpu_count() or 1
+        n_workers = min(n_workers, len(tasks))
+
+        if n_workers > 1:
+            print(f"📚 Leyendo {len(paths)} archivos en {n_workers} procesos...")
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                # map conserva el orden de los archivos: resultado determinista
+                results = list(executor.map(_load_csv_task, tasks))
+        else:
+            results = [_load_csv_task(task) for task in tasks]
+
+        n_cached = sum(from_cache for _, from_cache in results)
+        if n_cached:
+            print(f"   ♻️  {n_cached} archivos leídos desde caché")
+
+        frames = [frame for frame, _ in results]
+        df = concat_frames(frames)
+        source = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+
+        # Último archivo que trae cada clave
+        keys = [key for key in DataConfig.DEDUP_KEYS if key in df.columns]
+        codes = df.groupby(keys, sort=False, observed=True, dropna=False).ngroup()
+        codes = codes.to_numpy()
+        last_source = np.zeros(codes.max() + 1 if len(codes) else 0, dtype=np.int64)
+        np.maximum.at(last_source, codes, source)
+
+        replaced = source < last_source[codes]
+        if replaced.any():
+            df = df[~replaced].reset_index(drop=True)
+            print(
+                f"🧹 {int(replaced.sum())} filas reemplazadas por un archivo posterior "
+                "con la misma (departamento, tecnologia, fecha)"
+            )
+        return df
+
+    def stream_data(self, partition_dir=None, max_memory_mb=None):
+        """Ingesta por bloques hacia un almacén particionado, con memoria acotada.
+
+        No deja el dataset en ``self.df``: las etapas siguientes recorren
+        ``self.store.iter_partitions()`` una partición a la vez.
+        """
+        config = DataConfig.STREAMING_CONFIG
+        partition_dir = partition_dir or config["partition_dir"]
+        max_memory_mb = max_memory_mb or config["max_memory_mb"]
+
+        try:
+            paths = resolve_paths(self.data_path)
+            chunk_rows = self._chunk_rows(
+                paths[0], max_memory_mb, config["sample_rows"]
+            )
+            print(
+                f"🌊 Ingesta por bloques de {chunk_rows:,} filas "
+                f"(límite {max_memory_mb} MB) -> {partition_dir}"
+            )
+
+            store = PartitionedStore(partition_dir)
+            store.clear()
+            rows = {}
+            n_valid = n_invalid = 0
+            part_id = 0
+            for path in paths:
+                for chunk in iter_csv_chunks(path, self.schema, chunk_rows):
+                    chunk, invalid = validate_chunk(chunk, self.schema)
+                    n_invalid += invalid
+                    n_valid += len(chunk)
+                    for key, count in store.append(chunk, part_id).items():
+                        rows[key] = rows.get(key, 0) + count
+                    part_id += 1
+
+            store.write_manifest(
+                {
+                    "sources": [os.path.abspath(path) for path in paths],
+                    "schema": self.schema,
+                    "chunk_rows": chunk_rows,
+                    "rows": n_valid,
+                    "invalid_rows": n_invalid,
+                    "partitions": [
+                        {"departamento": dept, "tecnologia": tech, "rows": count}
+                        for (dept, tech), count in sorted(rows.items())
+                    ],
+                }
+            )
+            self.store = store
+
+            print(f"✅ {n_valid:,} filas en {len(rows)} particiones")
+            if n_invalid:
+                print(f"⚠️ {n_invalid:,} filas descartadas por no cumplir el esquema")
+            return True
+        except FileNotFoundError:
+            print(f"❌ Error: No se encontró el archivo {self.data_path}")
+            return False
+        except Exception as e:
+            print(f"❌ Error en la ingesta por bloques: {e}")
+            return False
+
+    def load_incremental(self, store_dir=None):
+        """Ingesta incremental: leer solo lo que cada archivo agregó desde la anterior.
+
+        Se conservan todas las filas, igual que en ``load_data()`` sobre el
+        mismo archivo; las tardías (en o antes de la marca de agua) solo se
+        cuentan. Un archivo reescrito reemplaza las filas que había aportado.
+        Deja en ``self.df`` la vista completa del almacén, en
+        ``self.changed_series`` el conjunto de (departamento, tecnologia) que
+        cambiaron en esta corrida y en ``self.moments`` / ``self.sketches``
+        los acumuladores de momentos y de cuantiles ya actualizados (para
+        ``EnergyEDA``).
+        """
+        store_dir = store_dir or DataConfig.INCREMENTAL_CONFIG["store_dir"]
+        streaming = DataConfig.STREAMING_CONFIG
+
+        try:
+            store = IncrementalStore(store_dir)
+            paths = resolve_paths(self.data_path)
+
+            # Primero se borran las filas de los archivos nuevos o reescritos, así
+            # las tardías se cuentan contra lo que queda en el almacén
+            offsets = {path: store.source_offset(path) for path in paths}
+            dropped = set()
+            n_rewritten = 0
+            for path, offset in offsets.items():
+                if offset == 0:
+                    replaced = store.drop_source(path)
+                    n_rewritten += bool(replaced)
+                    dropped |= replaced
+
+            written = {}
+            n_read = n_invalid = n_late = 0
+            for path, offset in offsets.items():
+                if offset is None:
+                    continue
+                chunk_rows = self._chunk_rows(
+                    path, streaming["max_memory_mb"], streaming["sample_rows"]
+                )
+                frames = []
+                for chunk in iter_csv_chunks(path, self.schema, chunk_rows, offset):
+                    chunk, invalid = validate_chunk(chunk, self.schema)
+                    n_invalid += invalid
+                    n_read += len(chunk)
+                    frames.append(chunk)
+                rows = concat_frames(frames) if frames else None
+                if rows is not None and len(rows):
+                    counts, late = store.append(rows, path)
+                    n_late += late
+                    for key, count in counts.items():
+                        written[key] = written.get(key, 0) + count
+                store.mark_source(path)
+            store.save()
+
+            self.df = store.load()
+            self.store = store.series
+            self.changed_series = set(written) | dropped
+            self.moments = store.moments
+            self.sketches = store.sketches
+
+            print(
+                f"🔁 Ingesta incremental: {n_read:,} filas leídas, "
+                f"{sum(written.values()):,} anexadas ({n_late:,} tardías) "
+                f"en {len(self.changed_series)} series"
+            )
+            if n_rewritten:
+                print(
+                    f"♻️ {n_rewritten} archivos reescritos: sus filas anteriores "
+                    "se reemplazaron por las nuevas"
+                )
+            if n_invalid:
+                print(f"⚠️ {n_invalid:,} filas descartadas por no cumplir el esquema")
+            print(f"📊 Dimensiones: {self.df.shape}")
+            return True
+        except FileNotFoundError:
+            print(f"❌ Error: No se encontró el archivo {self.data_path}")
+            return False
+        except Exception as e:
+            print(f"❌ Error en la ingesta incremental: {e}")
+            return False
+
+    def _chunk_rows(self, path, max_memory_mb, sample_rows):
+        """Filas por bloque a partir del límite de memoria.
+
+        El costo por fila se mide sobre una muestra leída sin tipos (el
+        parser materializa cadenas antes de categorizar) y se duplica por la
+        copia que genera el reparto en particiones.
+        """
+        untyped, n_rows = sample_memory(path, sample_rows)
+        row_bytes = untyped / max(n_rows, 1)
+        return max(1, int(max_memory_mb * 1024**2 / (2 * row_bytes)))
+
+    def _report_memory(self, path):
+        """Memoria con esquema frente a la lectura sin tipos de las mismas filas"""
+        typed = self.df.memory_usage(deep=True).sum()
+        rows = DataConfig.INGEST_CONFIG["memory_sample_rows"]
+        sample_untyped, n_rows = sample_memory(path, rows)
+        sample_typed, _ = sample_memory(path, rows, self.schema)
+        ratio = sample_untyped / max(sample_typed, 1)
+        if n_rows >= len(self.df):
+            print(
+                f"🧮 Memoria: {sample_untyped / 1024**2:.2f} MB sin tipos -> "
+                f"{typed / 1024**2:.2f} MB con esquema (x{ratio:.1f})"
+            )
+        else:
+            print(
+                f"🧮 Memoria: {typed / 1024**2:.2f} MB con esquema; sin tipos ocupa "
+                f"x{ratio:.1f} (medido en las primeras {n_rows:,} filas)"
+            )
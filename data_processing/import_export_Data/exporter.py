@@ -1,39 +1,35 @@
 import os
-import pandas as pd
+from .calendar_store import CalendarFeatureStore
+from .data_loader import source_dtype
 
 
 class DataExporter:
-    def __init__(self, df, export_dir):
+    def __init__(self, df, export_dir, calendar=None):
         self.df = df
         self.export_dir = export_dir
+        self.calendar = calendar
 
     def export_processed_data(self):
         os.makedirs(self.export_dir, exist_ok=True)
         export_df = self.df.copy()
-        export_df["fecha"] = pd.to_datetime(export_df["fecha"])
-        export_df["año"] = export_df["fecha"].dt.year
-        export_df["mes"] = export_df["fecha"].dt.month
-        export_df["trimestre"] = export_df["fecha"].dt.quarter
-        export_df["semana"] = export_df["fecha"].dt.isocalendar().week
-
-        # Nueva columna: estación del año
-        def get_season(month):
-            if month in [12, 1, 2]:
-                return "Invierno"
-            elif month in [3, 4, 5]:
-                return "Primavera"
-            elif month in [6, 7, 8]:
-                return "Verano"
-            else:
-                return "Otoño"
+        # float32 es solo el formato en memoria: se exporta y agrega con el tipo del CSV
+        export_df["produccion_mwh"] = export_df["produccion_mwh"].astype(
+            source_dtype(export_df["produccion_mwh"])
+        )
 
-        export_df["estacion"] = export_df["mes"].apply(get_season)
+        # Columnas de calendario (con la estación del año) por fecha distinta
+        calendar = CalendarFeatureStore.for_frame(export_df, self.calendar)
+        calendar.assign(
+            export_df,
+            ["fecha", "año", "mes", "trimestre", "semana_año", "estacion"],
+            ["fecha", "año", "mes", "trimestre", "semana", "estacion"],
+        )
 
         export_path = os.path.join(self.export_dir, "energia_produccion_clean.csv")
         export_df.to_csv(export_path, index=False)
 
         monthly_agg = (
-            self.df.groupby(["departamento", "tecnologia", "mes"])
+            export_df.groupby(["departamento", "tecnologia", "mes"], observed=True)
             .agg({"produccion_mwh": ["sum", "mean", "count"]})
             .reset_index()
         )
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# El aviso de pickle sin pyarrow se muestra una sola vez por proceso
+_fallback_reported = False
+
+
+def _report_pickle_fallback():
+    global _fallback_reported
+    if not _fallback_reported:
+        print(
+            "⚠️ pyarrow no está instalado: cachés y almacenes se guardan en pickle "
+            "(pip install -r requirements.txt)"
+        )
+        _fallback_reported = True
+
+
+def write_frame(df, path):
+    """Guardar un DataFrame en formato columnar (Parquet) o pickle si no hay pyarrow"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if PARQUET_AVAILABLE:
+        df.to_parquet(tmp_path, index=False)
+    else:
+        _report_pickle_fallback()
+        df.reset_index(drop=True).to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_frame(path):
+    if PARQUET_AVAILABLE:
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def frame_extension():
+    return ".parquet" if PARQUET_AVAILABLE else ".pkl"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FrameCache:
+    """Caché binaria del DataFrame normalizado, junto al archivo fuente.
+
+    Se invalida si cambian el tamaño o la fecha de modificación de la fuente
+    y además su hash de contenido; si solo cambió el mtime (p. ej. el archivo
+    se volvió a copiar) pero el hash coincide, la caché sigue siendo válida.
+    """
+
+    def __init__(self, source_path, key=None):
+        self.source_path = source_path
+        self.key = key or {}
+        base = f"{source_path}.cache"
+        self.cache_path = base + frame_extension()
+        self.meta_path = base + ".json"
+
+    def _source_stat(self):
+        stat = os.stat(self.source_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta):
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def load(self):
+        """Devolver el DataFrame en caché si sigue vigente, o None"""
+        meta = self._read_meta()
+        if meta is None or not os.path.exists(self.cache_path):
+            return None
+        if meta.get("key") != self.key:
+            return None
+
+        stat = self._source_stat()
+        if stat["size"] != meta["size"]:
+            return None
+        if stat["mtime_ns"] != meta["mtime_ns"]:
+            if file_sha256(self.source_path) != meta["sha256"]:
+                return None
+            meta.update(stat)
+            self._write_meta(meta)
+
+        try:
+            return read_frame(self.cache_path)
+        except Exception as e:
+            print(f"⚠️ Caché ilegible, se vuelve a leer el CSV: {e}")
+            return None
+
+    def store(self, df):
+        try:
+            write_frame(df, self.cache_path)
+            meta = self._source_stat()
+            meta["sha256"] = file_sha256(self.source_path)
+            meta["key"] = self.key
+            self._write_meta(meta)
+        except Exception as e:
+            print(f"⚠️ No se pudo escribir la caché: {e}")
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from data_processing.config.config import EDAConfig
+from data_processing.eda.moments import MomentStore
+from data_processing.eda.quantile_sketch import (
+    GroupedQuantileSketch,
+    capacity_for_error,
+)
+from .frame_cache import frame_extension, read_frame, write_frame
+from .partition_store import PARTITION_KEYS, PartitionedStore
+
+STATE_FILE = "_state.json"
+MOMENTS_PREFIX = "moments-"
+SKETCHES_PREFIX = "sketches-"
+TAIL_BYTES = 64 * 1024
+# Formato de _state.json (marcas de agua como registros, partes por fuente)
+STATE_VERSION = 2
+
+
+def _tail_digest(path, offset):
+    """Hash de los últimos ``TAIL_BYTES`` antes de ``offset`` y si terminan en salto de línea"""
+    start = max(0, offset - TAIL_BYTES)
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(offset - start)
+    return hashlib.sha256(data).hexdigest(), data.endswith(b"\n")
+
+
+class IncrementalStore:
+    """Almacén local para ingesta incremental.
+
+    Guarda las filas en un ``PartitionedStore`` por departamento/tecnología
+    y, en ``_state.json``, la posición leída de cada archivo fuente con las
+    partes que escribió, más la marca de agua (última ``fecha``) de cada
+    serie. Lo nuevo de cada archivo se escribe como una parte propia, de
+    modo que el costo crece con los datos nuevos y no con la historia
+    completa.
+
+    Se conservan todas las filas, como ``load_data()`` sobre los mismos
+    archivos: ni las claves repetidas ni las filas tardías (en o antes de
+    la marca de agua de su serie) se descartan, así que el resultado no
+    depende de en cuántas corridas llegó cada archivo. Si un archivo se
+    reescribe (no solo crece) se borran sus partes y se vuelve a leer.
+
+    Junto al estado se guardan los acumuladores de momentos (``MomentStore``)
+    y el sketch de cuantiles por departamento de todo lo almacenado; una
+    corrida que solo anexa los actualiza con sus filas nuevas y una que
+    borra partes los reconstruye desde las particiones.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.series = PartitionedStore(os.path.join(root, "series"))
+        self.state_path = os.path.join(root, STATE_FILE)
+        self.state = self._read_state()
+        self.watermarks = {
+            (mark["departamento"], mark["tecnologia"]): pd.Timestamp(mark["fecha"])
+            for mark in self.state["watermarks"]
+        }
+        self.moments = MomentStore()
+        self.sketches = self._empty_sketches()
+        self._stale = False
+        if self.state["next_part"]:
+            saved = self._read_accumulators()
+            if saved is None:
+                self._rebuild()
+            else:
+                self.moments, self.sketches = saved
+
+    def _read_state(self):
+        fresh = {
+            "version": STATE_VERSION,
+            "watermarks": [],
+            "sources": {},
+            "next_part": 0,
+        }
+        if not os.path.exists(self.state_path):
+            return fresh
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            print("   ♻️  Almacén incremental de otro formato: se vuelve a ingerir")
+            self.series.clear()
+            self._remove_accumulators()
+            return fresh
+        return state
+
+    def _moments_path(self, part):
+        # El nombre lleva el número de parte: si el estado no llegó a guardarse,
+        # los acumuladores no coinciden y se reconstruyen
+        return os.path.join(self.root, f"{MOMENTS_PREFIX}{part:05d}{frame_extension()}")
+
+    def _sketches_path(self, part):
+        return os.path.join(self.root, f"{SKETCHES_PREFIX}{part:05d}.json")
+
+    def _read_accumulators(self):
+        """Momentos y sketches guardados por la última corrida, o None"""
+        moments_path = self._moments_path(self.state["next_part"])
+        sketches_path = self._sketches_path(self.state["next_part"])
+        if not (os.path.exists(moments_path) and os.path.exists(sketches_path)):
+            return None
+        with open(sketches_path, "r", encoding="utf-8") as f:
+            sketches = GroupedQuantileSketch.from_dict(json.load(f))
+        # Un cambio de error configurado exige reconstruir con la nueva capacidad
+        max_error = EDAConfig.QUANTILE_CONFIG["max_error"]
+        if sketches.capacity != capacity_for_error(max_error):
+            return None
+        return MomentStore(read_frame(moments_path)), sketches
+
+    @staticmethod
+    def _empty_sketches():
+        config = EDAConfig.QUANTILE_CONFIG
+        return GroupedQuantileSketch.for_error(
+            config["max_error"], "departamento", config["seed"]
+        )
+
+    def _rebuild(self):
+        """Acumuladores y marcas de agua desde las particiones, una a la vez"""
+        print("   ♻️  Reconstruyendo acumuladores desde el almacén...")
+        self.moments = MomentStore()
+        self.sketches = self._empty_sketches()
+        self.watermarks = {}
+        for key, partition in self.series.iter_partitions():
+            self.moments.update(partition)
+            self.sketches.update(partition)
+            self.watermarks[key] = partition["fecha"].max()
+        self._stale = False
+
+    def _remove_accumulators(self, keep=()):
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith((MOMENTS_PREFIX, SKETCHES_PREFIX)) and path not in keep:
+                os.remove(path)
+
+    def save(self):
+        if self._stale:
+            self._rebuild()
+        os.makedirs(self.root, exist_ok=True)
+        current = [
+            self._moments_path(self.state["next_part"]),
+            self._sketches_path(self.state["next_part"]),
+        ]
+        write_frame(self.moments.cells, current[0])
+        tmp_path = f"{current[1]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.sketches.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, current[1])
+
+        self.state["watermarks"] = [
+            {"departamento": dept, "tecnologia": tech, "fecha": fecha.isoformat()}
+            for (dept, tech), fecha in sorted(self.watermarks.items())
+        ]
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+        # Acumuladores de corridas anteriores, solo cuando el estado ya apunta al nuevo
+        self._remove_accumulators(keep=current)
+
+    def source_offset(self, path):
+        """Byte desde el que hay que leer ``path``, o None si no cambió.
+
+        Si el archivo solo creció (el final de lo ya leído sigue intacto) se
+        continúa desde la posición anterior; si fue reescrito se relee
+        entero (antes hay que borrar sus partes con ``drop_source``).
+        """
+        meta = self.state["sources"].get(os.path.abspath(path))
+        if meta is None:
+            return 0
+
+        stat = os.stat(path)
+        if stat.st_size == meta["size"] and stat.st_mtime_ns == meta["mtime_ns"]:
+            return None
+        if stat.st_size > meta["size"]:
+            digest, at_line_end = _tail_digest(path, meta["size"])
+            if digest == meta["tail"] and at_line_end:
+                return meta["size"]
+        return 0
+
+    def mark_source(self, path):
+        stat = os.stat(path)
+        meta = self.state["sources"].setdefault(os.path.abspath(path), {"parts": []})
+        meta.update(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            tail=_tail_digest(path, stat.st_size)[0],
+        )
+
+    def drop_source(self, path):
+        """Borrar las partes escritas desde ``path``; devuelve las series tocadas"""
+        meta = self.state["sources"].pop(os.path.abspath(path), None)
+        if not meta or not meta["parts"]:
+            return set()
+        touched = self.series.remove_parts(meta["parts"])
+        if touched:
+            # Quitar filas de los acumuladores no es posible: se reconstruyen
+            # antes del próximo append o al guardar, y los guardados se borran
+            # ya por si la corrida no termina
+            self._stale = True
+            self._remove_accumulators()
+        return touched
+
+    def append(self, rows, path):
+        """Anexar las filas leídas de ``path`` como una parte nueva.
+
+        Devuelve (filas escritas por serie, filas tardías); las tardías
+        caen en o antes de la marca de agua de su serie y se guardan igual.
+        """
+        if self._stale:
+            self._rebuild()
+        keys = PARTITION_KEYS + ["fecha"]
+        rows = rows.sort_values(keys, kind="mergesort").reset_index(drop=True)
+        grouped = rows.groupby(PARTITION_KEYS, sort=True, observed=True)
+        last = grouped["fecha"].max()
+        limits = pd.DatetimeIndex(
+            [self.watermarks.get(key, pd.NaT) for key in last.index]
+        ).to_numpy()
+        late = rows["fecha"].to_numpy() <= limits[grouped.ngroup().to_numpy()]
+
+        part = self.state["next_part"]
+        self.state["next_part"] += 1
+        written = self.series.append(rows, part)
+        meta = self.state["sources"].setdefault(os.path.abspath(path), {"parts": []})
+        meta["parts"].append(part)
+
+        self.moments.update(rows)
+        self.sketches.update(rows)
+        for key, fecha in last.items():
+            if key not in self.watermarks or fecha > self.watermarks[key]:
+                self.watermarks[key] = fecha
+        return written, int(late.sum())
+
+    def load(self):
+        """Vista completa: todas las series del almacén"""
+        return self.series.load()
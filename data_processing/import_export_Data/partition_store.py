@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+from urllib.parse import quote, unquote
+import pandas as pd
+from .frame_cache import frame_extension, read_frame, write_frame
+
+PARTITION_KEYS = ["departamento", "tecnologia"]
+MANIFEST_FILE = "_manifest.json"
+
+
+class PartitionedStore:
+    """Almacén en disco particionado por departamento/tecnología.
+
+    Estructura: ``<root>/departamento=<d>/tecnologia=<t>/part-00000.parquet``.
+    Cada bloque leído del CSV agrega un archivo ``part-*`` a las particiones
+    que toca, así nunca hace falta tener el dataset completo en memoria.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+
+    def _partition_dir(self, dept, tech):
+        return os.path.join(
+            self.root,
+            f"departamento={quote(str(dept), safe='')}",
+            f"tecnologia={quote(str(tech), safe='')}",
+        )
+
+    def clear(self):
+        """Borrar las particiones de una ingesta anterior (solo lo que creó el almacén)"""
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith("departamento=") and os.path.isdir(path):
+                shutil.rmtree(path)
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+    def append(self, chunk, part_id):
+        """Escribir un bloque repartido en sus particiones; devuelve filas por partición"""
+        written = {}
+        for (dept, tech), group in chunk.groupby(PARTITION_KEYS, observed=True):
+            path = os.path.join(
+                self._partition_dir(dept, tech),
+                f"part-{part_id:05d}{frame_extension()}",
+            )
+            write_frame(group.reset_index(drop=True), path)
+            written[(dept, tech)] = len(group)
+        return written
+
+    def remove_parts(self, part_ids):
+        """Borrar las partes ``part_ids`` de todas las particiones; devuelve las tocadas"""
+        names = {f"part-{part_id:05d}{frame_extension()}" for part_id in part_ids}
+        touched = set()
+        for dept, tech in self.partitions():
+            partition_dir = self._partition_dir(dept, tech)
+            for name in os.listdir(partition_dir):
+                if name in names:
+                    os.remove(os.path.join(partition_dir, name))
+                    touched.add((dept, tech))
+            # Una partición sin partes deja de existir
+            if not any(name.startswith("part-") for name in os.listdir(partition_dir)):
+                shutil.rmtree(partition_dir)
+                dept_dir = os.path.dirname(partition_dir)
+                if not os.listdir(dept_dir):
+                    os.rmdir(dept_dir)
+        return touched
+
+    def write_manifest(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    def read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def partitions(self):
+        """Lista ordenada de (departamento, tecnologia) presentes en disco"""
+        keys = []
+        if not os.path.isdir(self.root):
+            return keys
+        for dept_dir in os.listdir(self.root):
+            if not dept_dir.startswith("departamento="):
+                continue
+            dept = unquote(dept_dir.split("=", 1)[1])
+            for tech_dir in os.listdir(os.path.join(self.root, dept_dir)):
+                if tech_dir.startswith("tecnologia="):
+                    keys.append((dept, unquote(tech_dir.split("=", 1)[1])))
+        return sorted(keys)
+
+    def read_partition(self, dept, tech, columns=None):
+        """Leer una partición completa (todas sus partes, en orden de ingesta)"""
+        partition_dir = self._partition_dir(dept, tech)
+        parts = sorted(
+            name for name in os.listdir(partition_dir) if name.startswith("part-")
+        )
+        frames = [read_frame(os.path.join(partition_dir, name)) for name in parts]
+        df = pd.concat(frames, ignore_index=True)
+        for key in PARTITION_KEYS:
+            df[key] = df[key].astype("category")
+        return df[columns] if columns is not None else df
+
+    def iter_partitions(self, columns=None):
+        """Generador de ((departamento, tecnologia), DataFrame), una partición a la vez"""
+        for dept, tech in self.partitions():
+            yield (dept, tech), self.read_partition(dept, tech, columns)
+
+    def load(self):
+        """Reunir todas las particiones en un solo DataFrame (solo si cabe en memoria)"""
+        frames = [df for _, df in self.iter_partitions()]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        for key in PARTITION_KEYS:
+            df[key] = df[key].astype("category")
+        return df
@@ -2,48 +2,139 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
 from data_processing.config.config import PredictionConfig
+from data_processing.import_export_Data.calendar_store import CalendarFeatureStore
+from .feature_engine import (
+    FeatureRegistry,
+    LazyFeatureFrame,
+    lag_features,
+    rolling_means,
+)
+from .feature_store import FeatureStore
+from .forecast_engine import SERIES_KEYS
 
+# Columnas de calendario que se leen del CalendarFeatureStore (por fecha distinta)
+CALENDAR_FEATURES = ["año", "mes", "trimestre", "semana_año", "dia_año"]
 
-def prepare_data(df):
-    """Preparar y enriquecer datos para predicción"""
-    print("\n🔄 Preparando datos para predicción...")
+# Columnas de entrada de las que dependen todas las características
+STORE_COLUMNS = SERIES_KEYS + ["produccion_mwh", "fecha"]
+
+
+def _calendar_feature(column):
+    return lambda frame: frame.calendar.column(column)
+
+
+def _cyclic_feature(column, period, wave):
+    return lambda frame: wave(2 * np.pi * frame.df[column] / period)
+
+
+def _encoded_feature(column, name):
+    def producer(frame):
+        encoder = LabelEncoder()
+        classes = frame.label_classes.get(name)
+        if classes is None:
+            codes = encoder.fit_transform(frame.df[column])
+            frame.label_classes[name] = encoder.classes_
+            return codes
+        # Clases ya conocidas (almacén de características): mismos códigos
+        encoder.classes_ = classes
+        return encoder.transform(frame.df[column])
+
+    return producer
+
+
+def _lag_feature(lag):
+    def producer(frame):
+        starts, valid = frame.series_bounds
+        values = frame.df["produccion_mwh"].to_numpy()
+        return lag_features(values, starts, valid, [lag])[lag]
+
+    return producer
+
+
+def _rolling_feature(window):
+    def producer(frame):
+        starts, valid = frame.series_bounds
+        values = frame.df["produccion_mwh"].to_numpy()
+        return rolling_means(values, starts, valid, [window])[window]
 
-    df = df.copy()
-    df["fecha"] = pd.to_datetime(df["fecha"])
-    df = df.sort_values(["departamento", "tecnologia", "fecha"]).reset_index(drop=True)
+    return producer
+
+
+def feature_registry():
+    """Características disponibles para los modelos, con sus dependencias"""
+    config = PredictionConfig.PREDICTION_CONFIG
+    registry = FeatureRegistry()
 
     # Características temporales
-    df["año"] = df["fecha"].dt.year
-    df["mes"] = df["fecha"].dt.month
-    df["trimestre"] = df["fecha"].dt.quarter
-    df["semana_año"] = df["fecha"].dt.isocalendar().week
-    df["dia_año"] = df["fecha"].dt.dayofyear
+    for column in CALENDAR_FEATURES:
+        registry.register(column, _calendar_feature(column))
 
     # Variables cíclicas
-    df["mes_sin"] = np.sin(2 * np.pi * df["mes"] / 12)
-    df["mes_cos"] = np.cos(2 * np.pi * df["mes"] / 12)
-    df["semana_sin"] = np.sin(2 * np.pi * df["semana_año"] / 52)
-    df["semana_cos"] = np.cos(2 * np.pi * df["semana_año"] / 52)
+    registry.register("mes_sin", _cyclic_feature("mes", 12, np.sin), ["mes"])
+    registry.register("mes_cos", _cyclic_feature("mes", 12, np.cos), ["mes"])
+    registry.register(
+        "semana_sin", _cyclic_feature("semana_año", 52, np.sin), ["semana_año"]
+    )
+    registry.register(
+        "semana_cos", _cyclic_feature("semana_año", 52, np.cos), ["semana_año"]
+    )
 
     # Encoding
-    le_dept = LabelEncoder()
-    le_tech = LabelEncoder()
-    df["dept_encoded"] = le_dept.fit_transform(df["departamento"])
-    df["tech_encoded"] = le_tech.fit_transform(df["tecnologia"])
-
-    # Lags
-    df = df.sort_values(["departamento", "tecnologia", "fecha"])
-    for lag in PredictionConfig.PREDICTION_CONFIG["lags"]:
-        df[f"produccion_lag_{lag}"] = df.groupby(
-            ["departamento", "tecnologia"]
-        )["produccion_mwh"].shift(lag)
-
-    # Medias móviles
-    for window in [4, 8]:
-        df[f"produccion_ma_{window}"] = (
-            df.groupby(["departamento", "tecnologia"])["produccion_mwh"]
-            .transform(lambda x: x.rolling(window, min_periods=1).mean())
-        )
+    registry.register("dept_encoded", _encoded_feature("departamento", "dept_encoded"))
+    registry.register("tech_encoded", _encoded_feature("tecnologia", "tech_encoded"))
+
+    # Lags y medias móviles por serie
+    for lag in config["lags"]:
+        registry.register(f"produccion_lag_{lag}", _lag_feature(lag))
+    for window in config["rolling_windows"]:
+        registry.register(f"produccion_ma_{window}", _rolling_feature(window))
+    return registry
+
+
+def feature_store_for(df, registry, store_dir):
+    """Almacén en disco para las características de ``df`` (ver FeatureStore)"""
+    config = PredictionConfig.PREDICTION_CONFIG
+    key = {
+        "version": PredictionConfig.FEATURE_STORE_CONFIG["version"],
+        "features": registry.names(),
+        "lags": config["lags"],
+        "rolling_windows": config["rolling_windows"],
+        "dtypes": {column: str(df[column].dtype) for column in STORE_COLUMNS},
+    }
+    # Filas previas de la serie que necesita una fila nueva para lags y medias
+    context = max(config["lags"] + config["rolling_windows"], default=0)
+    return FeatureStore(store_dir, key, context)
+
+
+def prepare_features(df, calendar=None, store_dir=None):
+    """Datos ordenados por serie y fecha; cada característica se calcula al pedirla.
 
+    Con ``store_dir`` las características se persisten ahí y, si los datos no
+    cambiaron, se mapean desde disco en lugar de recalcularse.
+    """
+    print("\n🔄 Preparando datos para predicción...")
+    calendar = CalendarFeatureStore.for_frame(df, calendar)
+    registry = feature_registry()
+    if store_dir is None:
+        return LazyFeatureFrame(df, registry, calendar, SERIES_KEYS)
+    store = feature_store_for(df, registry, store_dir)
+    return store.open(df, registry, calendar, SERIES_KEYS, STORE_COLUMNS)
+
+
+def prepare_data(df, calendar=None, features=None):
+    """Preparar y enriquecer datos para predicción (solo ``features`` si se indican)"""
+    df = prepare_features(df, calendar).frame(features)
     print(f"✅ Datos preparados: {df.shape}")
     return df
+
+
+def infer_frequency(df):
+    """Inferir la cadencia del dataset como la mediana del paso entre fechas distintas"""
+    fechas = pd.Series(pd.to_datetime(df["fecha"]).unique()).sort_values()
+    steps = fechas.diff().dt.days
+    steps = steps[steps > 0]
+    if steps.empty:
+        return "D"
+
+    step_days = int(round(steps.median()))
+    return "D" if step_days <= 1 else f"{step_days}D"
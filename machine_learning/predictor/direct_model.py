@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from data_processing.config.config import PredictionConfig
+from .forecast_engine import (
+    SERIES_KEYS,
+    calendar_matrix,
+    future_dates,
+    interpolate_daily,
+    make_wave_adjustment,
+)
+
+# Contexto observado en la fecha de origen del pronóstico
+ORIGIN_FEATURES = [
+    "produccion_mwh",
+    "produccion_lag_1",
+    "produccion_lag_2",
+    "produccion_ma_4",
+]
+
+# Calendario de la fecha objetivo + distancia al origen
+TARGET_FEATURES = [
+    "mes",
+    "trimestre",
+    "semana_año",
+    "mes_sin",
+    "mes_cos",
+    "semana_sin",
+    "semana_cos",
+    "horizonte_dias",
+]
+
+DIRECT_FEATURES = ["dept_encoded", "tech_encoded"] + ORIGIN_FEATURES + TARGET_FEATURES
+
+# Esquema de evaluación de las métricas (ver export_predictions)
+EVALUATION = "holdout_pares_directos"
+
+
+def direct_pair_counts(group_ids, days, horizon_days):
+    """Primer objetivo y número de objetivos de cada origen.
+
+    ``group_ids``/``days`` ordenados por serie y fecha: los objetivos de la
+    fila i son las filas posteriores de su serie con fecha entre el día
+    siguiente y ``horizon_days`` días después, es decir un tramo contiguo.
+    """
+    if not len(days):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Clave (serie, día) creciente y sin solapes entre series: cada tramo sale
+    # de dos búsquedas binarias
+    offsets = days - days.min()
+    span = int(offsets.max()) + horizon_days + 1
+    keys = group_ids.astype(np.int64) * span + offsets
+    first = np.searchsorted(keys, keys, side="right")
+    last = np.searchsorted(keys, keys + horizon_days, side="right")
+    return first, np.maximum(last - first, 0)
+
+
+def build_direct_training_set(data, horizon_days, max_rows=None, seed=None):
+    """Pares (origen, objetivo) dentro de cada serie hasta ``horizon_days``.
+
+    Cada fila observada actúa como origen y se empareja con las
+    observaciones posteriores de su serie que caen en el horizonte. Con
+    ``max_rows`` se sortea uniformemente esa cantidad de pares sin
+    construir los demás: memoria y tiempo crecen con filas + ``max_rows`` y
+    no con filas x horizonte.
+    """
+    data = data.sort_values(SERIES_KEYS + ["fecha"], kind="mergesort")
+    data = data.reset_index(drop=True)
+
+    group_ids = data.groupby(SERIES_KEYS, sort=True, observed=True).ngroup()
+    group_ids = group_ids.to_numpy()
+    fechas = data["fecha"].to_numpy(dtype="datetime64[D]")
+    days = fechas.astype(np.int64)
+
+    first, counts = direct_pair_counts(group_ids, days, horizon_days)
+    ends = np.cumsum(counts)
+    n_pairs = int(ends[-1]) if len(ends) else 0
+
+    # Índice global de cada par -> (origen, desplazamiento dentro de su tramo)
+    if max_rows and n_pairs > max_rows:
+        rng = np.random.default_rng(seed)
+        pairs = np.sort(rng.choice(n_pairs, size=max_rows, replace=False))
+    else:
+        pairs = np.arange(n_pairs)
+    origins = np.searchsorted(ends, pairs, side="right")
+    targets = first[origins] + pairs - (ends[origins] - counts[origins])
+
+    features = pd.DataFrame(
+        {
+            "dept_encoded": data["dept_encoded"].to_numpy()[origins],
+            "tech_encoded": data["tech_encoded"].to_numpy()[origins],
+        }
+    )
+    for col in ORIGIN_FEATURES:
+        features[col] = data[col].to_numpy(dtype=float)[origins]
+
+    calendar = calendar_matrix(data["fecha"].to_numpy()[targets])
+    for col in TARGET_FEATURES[:-1]:
+        features[col] = calendar[col]
+    features["horizonte_dias"] = (fechas[targets] - fechas[origins]).astype(float)
+
+    target = pd.Series(data["produccion_mwh"].to_numpy(dtype=float)[targets])
+    return features, target, origins
+
+
+def predict_with_ml_direct(self, horizon_weeks):
+    """Estrategia directa: un solo modelo con el horizonte como característica"""
+    print(f"\n🤖 Ejecutando predicciones ML directas ({horizon_weeks} semanas)...")
+
+    # El calendario de la fecha objetivo se calcula aparte (calendar_matrix);
+    # "mes" solo alimenta el ajuste estacional del pronóstico
+    columns = ["dept_encoded", "tech_encoded"] + ORIGIN_FEATURES
+    clean_data = self.feature_frame(columns + ["mes"]).dropna(subset=columns)
+    if len(clean_data) < PredictionConfig.PREDICTION_CONFIG["min_data_points"]:
+        print("❌ Datos insuficientes.")
+        return None
+
+    horizon_days = int(horizon_weeks) * 7
+    max_rows = PredictionConfig.PREDICTION_CONFIG["direct_max_training_rows"]
+
+    def fit():
+        # Submuestreo reproducible para acotar el costo de entrenamiento
+        X, y, origins = build_direct_training_set(
+            clean_data,
+            horizon_days,
+            max_rows,
+            PredictionConfig.ML_CONFIG["random_state"],
+        )
+
+        # División temporal por posición del origen, igual que la estrategia recursiva
+        split_origin = int(
+            len(clean_data) * (1 - PredictionConfig.ML_CONFIG["test_size"])
+        )
+        train_mask = origins < split_origin
+        X_train, X_test = X[train_mask], X[~train_mask]
+        y_train, y_test = y[train_mask], y[~train_mask]
+
+        rf_config = {
+            k: v for k, v in PredictionConfig.ML_CONFIG.items() if k != "test_size"
+        }
+        rf_model = RandomForestRegressor(**rf_config)
+
+        print(f"   🔧 Entrenando modelo Random Forest directo ({len(X_train)} pares)...")
+        rf_model.fit(X_train, y_train)
+
+        y_pred = rf_model.predict(X_test)
+        metrics = {
+            "mae": mean_absolute_error(y_test, y_pred),
+            "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
+            "r2": r2_score(y_test, y_pred),
+            "mape": np.mean(np.abs((y_test - y_pred) / y_test)) * 100,
+            "estrategia": "direct",
+        }
+        importance = pd.DataFrame(
+            {"feature": DIRECT_FEATURES, "importance": rf_model.feature_importances_}
+        ).sort_values("importance", ascending=False)
+        return {"model": rf_model, "metrics": metrics, "feature_importance": importance}
+
+    fitted = self.registry.fetch_or_fit(
+        "ml_direct",
+        clean_data[
+            SERIES_KEYS + ["fecha", "dept_encoded", "tech_encoded"] + ORIGIN_FEATURES
+        ],
+        {
+            "ml": PredictionConfig.ML_CONFIG,
+            "horizon_days": horizon_days,
+            "max_rows": max_rows,
+        },
+        fit,
+    )
+    rf_model = fitted["model"]
+    # Pares (origen, objetivo) a varios días: no comparable con el holdout de
+    # un paso de la estrategia recursiva
+    self.metrics["ml"] = {**fitted["metrics"], "evaluacion": EVALUATION}
+    self.feature_importance["ml"] = fitted["feature_importance"]
+
+    ml_predictions = _generate_ml_direct_predictions(
+        rf_model, clean_data, horizon_weeks, self.frequency
+    )
+    if PredictionConfig.PREDICTION_CONFIG["interpolate_daily"]:
+        ml_predictions = interpolate_daily(ml_predictions)
+
+    self.models["ml"] = rf_model
+    self.predictions["ml"] = ml_predictions
+
+    print(f"✅ ML directo completado - R²: {self.metrics['ml']['r2']:.3f}")
+    return ml_predictions
+
+
+def _generate_ml_direct_predictions(
+    model, data, horizon_weeks, freq="D", min_history=3
+):
+    """Todo el horizonte de todas las series en una sola inferencia"""
+    dates = future_dates(data["fecha"].max(), horizon_weeks, freq)
+    n_steps = len(dates)
+
+    data = data.sort_values(SERIES_KEYS + ["fecha"], kind="mergesort")
+    grouped = data.groupby(SERIES_KEYS, sort=True, observed=True)
+    sizes = grouped.size()
+    long_enough = sizes[sizes >= min_history].index
+    last_rows = grouped.tail(1).set_index(SERIES_KEYS).loc[long_enough]
+    n_series = len(last_rows)
+
+    features = pd.DataFrame(
+        {
+            col: np.repeat(last_rows[col].to_numpy(dtype=float), n_steps)
+            for col in ["dept_encoded", "tech_encoded"] + ORIGIN_FEATURES
+        }
+    )
+    calendar = calendar_matrix(dates)
+    for col in TARGET_FEATURES[:-1]:
+        features[col] = np.tile(calendar[col], n_series)
+
+    origin_dates = last_rows["fecha"].to_numpy(dtype="datetime64[D]")
+    target_dates = np.tile(dates.to_numpy(dtype="datetime64[D]"), n_series)
+    features["horizonte_dias"] = (
+        target_dates - np.repeat(origin_dates, n_steps)
+    ).astype(float)
+
+    pred = np.maximum(model.predict(features[DIRECT_FEATURES]), 0.0)
+
+    adjust = make_wave_adjustment(data)
+    elapsed_days = np.tile((dates - dates[0]).days.to_numpy(), n_series)
+    months = features["mes"].to_numpy()
+    pred = adjust(elapsed_days, months, pred)
+
+    return pd.DataFrame(
+        {
+            "fecha": np.tile(dates, n_series),
+            "departamento": np.repeat(
+                last_rows.index.get_level_values(0).to_numpy(), n_steps
+            ),
+            "tecnologia": np.repeat(
+                last_rows.index.get_level_values(1).to_numpy(), n_steps
+            ),
+            "prediccion_mwh": pred,
+        }
+    )
@@ -1,28 +1,60 @@
-from .data_preparation import prepare_data
+from .data_preparation import prepare_features, infer_frequency
 from .ml_model import predict_with_ml
 from .prophet_model import predict_with_prophet
+from .ets_model import predict_with_ets
 from .insights import generate_prediction_insights
 from .export_utils import export_predictions
+from .model_registry import ModelRegistry
 from data_processing.config.config import PredictionConfig
 
 
 class EnergyPredictor:
     """Sistema de predicciones de energía integrado y modularizado"""
 
-    def __init__(self, df):
+    def __init__(self, df, model_dir=None, calendar=None, feature_dir=None):
         PredictionConfig.validate_dataframe(df)
-        self.df = prepare_data(df)
+        # Cada motor pide sus características con feature_frame(); se calculan
+        # solo las que alguno usa, una vez, y quedan en el almacén en disco
+        store_config = PredictionConfig.FEATURE_STORE_CONFIG
+        if feature_dir is None and store_config["enabled"]:
+            feature_dir = store_config["store_dir"]
+        self.features = prepare_features(df, calendar, feature_dir)
+        self.frequency = PredictionConfig.PREDICTION_CONFIG["forecast_frequency"]
+        if self.frequency == "auto":
+            self.frequency = infer_frequency(self.features.df)
+        print(f"📆 Cadencia de pronóstico: {self.frequency}")
         self.models = {}
         self.predictions = {}
         self.metrics = {}
         self.feature_importance = {}
 
-    def predict_with_ml(self, horizon_weeks=None):
-        return predict_with_ml(self, horizon_weeks)
+        registry_config = PredictionConfig.REGISTRY_CONFIG
+        if model_dir is None and registry_config["enabled"]:
+            model_dir = registry_config["model_dir"]
+        self.registry = ModelRegistry(model_dir)
+
+    @property
+    def df(self):
+        """Datos ordenados con todas las características registradas.
+
+        Las calcula al leerse (si no lo estaban); los motores usan
+        ``feature_frame`` para pedir solo las suyas.
+        """
+        return self.features.frame()
+
+    def feature_frame(self, columns):
+        """Columnas de entrada más ``columns`` (y sus dependencias), calculadas al pedirlas"""
+        return self.features.frame(columns)
+
+    def predict_with_ml(self, horizon_weeks=None, strategy=None):
+        return predict_with_ml(self, horizon_weeks, strategy)
 
     def predict_with_prophet(self, horizon_weeks=None):
         return predict_with_prophet(self, horizon_weeks)
 
+    def predict_with_ets(self, horizon_weeks=None):
+        return predict_with_ets(self, horizon_weeks)
+
     def generate_prediction_insights(self):
         return generate_prediction_insights(self)
 
@@ -0,0 +1,238 @@
+import itertools
+import numpy as np
+import pandas as pd
+from scipy import stats
+from data_processing.config.config import PredictionConfig
+
+FORECAST_COLUMNS = [
+    "ds",
+    "yhat",
+    "yhat_lower",
+    "yhat_upper",
+    "departamento",
+    "tecnologia",
+]
+
+# Esquema de evaluación de las métricas: residuos de un paso adelante sobre la
+# misma historia del ajuste; se exportan aparte de las del holdout del ML
+EVALUATION = "en_muestra"
+
+
+def predict_with_ets(self, horizon_weeks=None):
+    """Holt-Winters por lotes: todas las series departamento x tecnología a la vez"""
+    if horizon_weeks is None:
+        horizon_weeks = PredictionConfig.PREDICTION_CONFIG["default_horizon_weeks"]
+
+    config = PredictionConfig.ETS_CONFIG
+    print(f"\n📉 Ejecutando predicciones ETS ({horizon_weeks} semanas)...")
+
+    series, dates, Y = _build_series_matrix(self.feature_frame([]), config["step_days"])
+    min_points = PredictionConfig.PREDICTION_CONFIG["min_data_points"]
+    keep = np.sum(~np.isnan(Y), axis=1) >= min_points
+    series, Y = series[keep], Y[keep]
+    if len(series) == 0:
+        print("❌ Datos insuficientes.")
+        return None
+
+    Y = _fill_gaps(Y)
+    n_times = Y.shape[1]
+
+    seasonal = config["seasonal"]
+    season_length = int(config["seasonal_periods"])
+    if n_times < 2 * season_length:
+        print(
+            f"   ℹ️  Historia de {n_times} pasos < 2 temporadas de {season_length}: "
+            "se ajusta Holt sin componente estacional"
+        )
+        seasonal = None
+    if seasonal == "mul" and np.any(Y <= 0):
+        print("   ℹ️  Valores no positivos: se usa estacionalidad aditiva")
+        seasonal = "add"
+
+    fit = _fit_holt_winters(Y, seasonal, season_length, config["param_grid"])
+    horizon = int(horizon_weeks) * 7 // config["step_days"]
+    yhat, sigma_h = _forecast(fit, horizon)
+
+    z = stats.norm.ppf(0.5 + config["interval_width"] / 2)
+    n_series = len(series)
+    step = pd.Timedelta(days=config["step_days"])
+    future = pd.DatetimeIndex([dates[-1] + step * (h + 1) for h in range(horizon)])
+
+    forecast = pd.DataFrame(
+        {
+            "ds": np.tile(future, n_series),
+            "yhat": np.maximum(yhat, 0).ravel(),
+            "yhat_lower": (yhat - z * sigma_h).ravel(),
+            "yhat_upper": (yhat + z * sigma_h).ravel(),
+            "departamento": np.repeat(series.get_level_values(0).to_numpy(), horizon),
+            "tecnologia": np.repeat(series.get_level_values(1).to_numpy(), horizon),
+        }
+    )[FORECAST_COLUMNS]
+
+    residuals = fit["residuals"]
+    actuals = Y[:, n_times - residuals.shape[1] :]
+    nonzero_actuals = np.where(actuals == 0, np.nan, actuals)
+    self.metrics["ets"] = {
+        "mae": float(np.mean(np.abs(residuals))),
+        "rmse": float(np.sqrt(np.mean(residuals**2))),
+        "mape": float(np.nanmean(np.abs(residuals / nonzero_actuals)) * 100),
+        "estacionalidad": seasonal or "ninguna",
+        "evaluacion": EVALUATION,
+    }
+    self.models["ets"] = {
+        "series": list(series),
+        "alpha": fit["alpha"],
+        "beta": fit["beta"],
+        "gamma": fit["gamma"],
+    }
+    self.predictions["ets"] = forecast
+
+    mae = self.metrics["ets"]["mae"]
+    print(f"✅ ETS completado - {n_series} series, MAE en muestra: {mae:.2f}")
+    return forecast
+
+
+def _build_series_matrix(df, step_days):
+    """Matriz (series x tiempo) con el promedio por serie en pasos de ``step_days``"""
+    fechas = pd.to_datetime(df["fecha"])
+    start = fechas.min()
+    bucket = ((fechas - start).dt.days // step_days).to_numpy()
+
+    matrix = (
+        pd.DataFrame(
+            {
+                "departamento": df["departamento"].to_numpy(),
+                "tecnologia": df["tecnologia"].to_numpy(),
+                "paso": bucket,
+                "produccion_mwh": df["produccion_mwh"].to_numpy(dtype=float),
+            }
+        )
+        .groupby(["departamento", "tecnologia", "paso"], observed=True)
+        .produccion_mwh.mean()
+        .unstack("paso")
+    )
+    matrix = matrix.reindex(columns=np.arange(bucket.max() + 1))
+    dates = start + pd.to_timedelta(matrix.columns * step_days, unit="D")
+    return matrix.index, dates, matrix.to_numpy(dtype=float)
+
+
+def _fill_gaps(Y):
+    """Interpolación lineal de pasos sin datos dentro de cada serie"""
+    filled = Y.copy()
+    positions = np.arange(Y.shape[1])
+    for i in np.flatnonzero(np.isnan(Y).any(axis=1)):
+        observed = ~np.isnan(Y[i])
+        filled[i] = np.interp(positions, positions[observed], Y[i, observed])
+    return filled
+
+
+def _fit_holt_winters(Y, seasonal, season_length, param_grid):
+    """Búsqueda en malla vectorizada sobre (series x combinaciones de parámetros).
+
+    Una primera pasada acumula el error cuadrático de un paso adelante de
+    todas las combinaciones a la vez; la segunda repite el suavizado solo
+    con la mejor combinación de cada serie para obtener estados y residuos.
+    """
+    gammas = param_grid["gamma"] if seasonal else [0.0]
+    combos = np.array(
+        list(itertools.product(param_grid["alpha"], param_grid["beta"], gammas))
+    )
+    m = season_length if seasonal else 1
+    n_series = Y.shape[0]
+
+    # Inicialización clásica: primera temporada para nivel y estacionalidad
+    if seasonal:
+        first = Y[:, :m]
+        level0 = first.mean(axis=1)
+        trend0 = (Y[:, m : 2 * m].mean(axis=1) - level0) / m
+        if seasonal == "add":
+            season0 = first - level0[:, None]
+        else:
+            season0 = first / level0[:, None]
+        start = m
+    else:
+        # Sin estacionalidad: nivel = promedio inicial y tendencia nula
+        level0 = Y[:, : min(4, Y.shape[1])].mean(axis=1)
+        trend0 = np.zeros(n_series)
+        season0 = np.zeros((n_series, 1))
+        start = 1
+    init = (level0, trend0, season0, start)
+
+    params = [np.broadcast_to(combos[:, i], (n_series, len(combos))) for i in range(3)]
+    sse, _ = _smooth(Y, *params, seasonal, m, init)
+
+    best = np.argmin(sse, axis=1)
+    best_params = [combos[best, i][:, None] for i in range(3)]
+    _, state = _smooth(Y, *best_params, seasonal, m, init, keep_errors=True)
+
+    return {
+        "seasonal": seasonal,
+        "season_length": m,
+        "n_times": Y.shape[1],
+        "level": state["level"][:, 0],
+        "trend": state["trend"][:, 0],
+        "season": state["season"][:, 0],
+        "alpha": combos[best, 0],
+        "beta": combos[best, 1],
+        "gamma": combos[best, 2],
+        "residuals": state["errors"][:, 0],
+    }
+
+
+def _smooth(Y, alpha, beta, gamma, seasonal, m, init, keep_errors=False):
+    """Recursión de Holt-Winters para arreglos de parámetros (series x combinaciones)"""
+    level0, trend0, season0, start = init
+    n_series, n_times = Y.shape
+    n_combos = alpha.shape[1]
+
+    level = np.repeat(level0[:, None], n_combos, axis=1)
+    trend = np.repeat(trend0[:, None], n_combos, axis=1)
+    season = np.repeat(season0[:, None, :], n_combos, axis=1)
+    sse = np.zeros((n_series, n_combos))
+    errors = np.zeros((n_series, n_combos, n_times - start)) if keep_errors else None
+
+    for t in range(start, n_times):
+        y = Y[:, t][:, None]
+        s = season[:, :, t % m]
+        base = level + trend
+        if seasonal == "mul":
+            y_pred = base * s
+            new_level = alpha * (y / s) + (1 - alpha) * base
+        else:
+            y_pred = base + s
+            new_level = alpha * (y - s) + (1 - alpha) * base
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        if seasonal == "mul":
+            season[:, :, t % m] = gamma * (y / new_level) + (1 - gamma) * s
+        elif seasonal == "add":
+            season[:, :, t % m] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+
+        error = y - y_pred
+        sse += error**2
+        if keep_errors:
+            errors[:, :, t - start] = error
+
+    state = {"level": level, "trend": trend, "season": season, "errors": errors}
+    return sse, state
+
+
+def _forecast(fit, horizon):
+    """Pronóstico h pasos adelante y desviación estándar aproximada por horizonte"""
+    h = np.arange(1, horizon + 1)
+    m = fit["season_length"]
+    season_idx = (fit["n_times"] + h - 1) % m
+    base = fit["level"][:, None] + h[None, :] * fit["trend"][:, None]
+
+    if fit["seasonal"] == "mul":
+        yhat = base * fit["season"][:, season_idx]
+    elif fit["seasonal"] == "add":
+        yhat = base + fit["season"][:, season_idx]
+    else:
+        yhat = base
+
+    # Varianza de suavizado exponencial simple: crece con (h - 1) * alpha^2
+    sigma = np.std(fit["residuals"], axis=1, ddof=1)
+    growth = 1 + (h[None, :] - 1) * fit["alpha"][:, None] ** 2
+    sigma_h = sigma[:, None] * np.sqrt(growth)
+    return yhat, sigma_h
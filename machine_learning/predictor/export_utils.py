@@ -1,5 +1,6 @@
 import os
 import pandas as pd
+from .ml_model import EVALUATION
 
 def export_predictions(self, export_dir):
     os.makedirs(export_dir, exist_ok=True)
@@ -15,11 +16,26 @@ def export_predictions(self, export_dir):
         self.predictions["prophet"].to_csv(prophet_path, index=False)
         exported_files.append(prophet_path)
 
+    if "ets" in self.predictions:
+        ets_path = os.path.join(export_dir, "predicciones_ets.csv")
+        self.predictions["ets"].to_csv(ets_path, index=False)
+        exported_files.append(ets_path)
+
     if self.metrics:
-        metrics_df = pd.DataFrame(self.metrics).T
-        metrics_path = os.path.join(export_dir, "metricas_modelos.csv")
-        metrics_df.to_csv(metrics_path, index=True)
-        exported_files.append(metrics_path)
+        # Un archivo por esquema de evaluación: métricas de esquemas distintos
+        # no se comparan en la misma tabla
+        by_evaluation = {}
+        for model, metrics in self.metrics.items():
+            evaluation = metrics.get("evaluacion", EVALUATION)
+            by_evaluation.setdefault(evaluation, {})[model] = metrics
+        for evaluation, metrics in by_evaluation.items():
+            name = "metricas_modelos.csv"
+            if evaluation != EVALUATION:
+                name = f"metricas_modelos_{evaluation}.csv"
+            metrics_df = pd.DataFrame(metrics).T
+            metrics_path = os.path.join(export_dir, name)
+            metrics_df.to_csv(metrics_path, index=True)
+            exported_files.append(metrics_path)
 
     if "ml" in self.feature_importance:
         importance_path = os.path.join(export_dir, "importancia_caracteristicas.csv")
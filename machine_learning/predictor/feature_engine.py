@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+
+class GroupWindowIndexer(BaseIndexer):
+    """Ventana de ``window_size`` filas hacia atrás que no cruza el inicio de su grupo.
+
+    ``starts`` es la posición donde empieza el grupo de cada fila (filas
+    ordenadas por grupo). Con estos límites una sola llamada a ``rolling``
+    sobre toda la columna equivale a ``rolling`` grupo por grupo.
+    """
+
+    def get_window_bounds(
+        self, num_values=0, min_periods=None, center=None, closed=None, step=None
+    ):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.starts).astype(np.int64)
+        return start, end
+
+
+def group_starts(df, keys):
+    """Posición de inicio del grupo de cada fila y máscara de filas con claves válidas.
+
+    ``df`` debe estar ordenado por ``keys``: cada grupo es un tramo contiguo y
+    un grupo nuevo empieza donde cambia alguna clave.
+    """
+    n_rows = len(df)
+    new_group = np.zeros(n_rows, dtype=bool)
+    valid = np.ones(n_rows, dtype=bool)
+    for key in keys:
+        codes, _ = pd.factorize(df[key])
+        new_group[1:] |= codes[1:] != codes[:-1]
+        valid &= codes >= 0
+    if n_rows:
+        new_group[0] = True
+
+    positions = np.arange(n_rows)
+    starts = np.maximum.accumulate(np.where(new_group, positions, 0))
+    return starts, valid
+
+
+def lag_features(values, starts, valid, lags):
+    """``shift(lag)`` por grupo para cada lag: NaN donde el lag sale del grupo"""
+    values = np.asarray(values)
+    dtype = values.dtype if values.dtype.kind == "f" else np.float64
+    positions = np.arange(len(values))
+
+    features = {}
+    for lag in lags:
+        source = positions - lag
+        inside = valid & (source >= starts)
+        lagged = np.full(len(values), np.nan, dtype=dtype)
+        lagged[inside] = values[source[inside]]
+        features[lag] = lagged
+    return features
+
+
+def rolling_means(values, starts, valid, windows, min_periods=1):
+    """Media móvil por grupo para cada ventana, en una pasada sobre toda la columna"""
+    series = pd.Series(values)
+    features = {}
+    for window in windows:
+        indexer = GroupWindowIndexer(window_size=window, starts=starts)
+        means = series.rolling(indexer, min_periods=min_periods).mean().to_numpy()
+        features[window] = np.where(valid, means, np.nan)
+    return features
+
+
+class FeatureRegistry:
+    """Catálogo de características: cada una declara cómo se calcula y de cuáles depende.
+
+    Las dependencias deben registrarse antes, así que el orden de registro
+    es un orden de cálculo válido (y el de las columnas del resultado).
+    """
+
+    def __init__(self):
+        self._features = {}
+
+    def register(self, name, producer, depends=()):
+        """``producer(frame)`` devuelve la columna ``name`` alineada con ``frame.df``"""
+        missing = [dep for dep in depends if dep not in self._features]
+        if missing:
+            raise ValueError(
+                f"'{name}' depende de características no registradas: {missing}"
+            )
+        self._features[name] = (producer, tuple(depends))
+
+    def __contains__(self, name):
+        return name in self._features
+
+    def names(self):
+        return list(self._features)
+
+    def producer(self, name):
+        return self._features[name][0]
+
+    def resolve(self, names):
+        """``names`` más sus dependencias, en orden de registro"""
+        unknown = [name for name in names if name not in self._features]
+        if unknown:
+            raise KeyError(f"Características no registradas: {unknown}")
+        needed = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self._features[name][1])
+        return [name for name in self._features if name in needed]
+
+
+class LazyFeatureFrame:
+    """Filas ordenadas por serie y fecha cuyas características se calculan al pedirlas.
+
+    ``df`` empieza con las columnas de entrada; ``frame(names)`` calcula lo que
+    falte de ``names`` y sus dependencias (una sola vez, queda en caché) y
+    devuelve solo esas características junto a las columnas de entrada.
+
+    ``order`` (posición de entrada de cada fila ya ordenada) y
+    ``series_offsets`` permiten reconstruir el marco sin volver a ordenar; si
+    se asigna ``store``, cada característica calculada se persiste ahí.
+    """
+
+    def __init__(self, df, registry, calendar, keys, order=None, series_offsets=None):
+        self.registry = registry
+        self.keys = list(keys)
+
+        # Un solo ordenamiento por serie y fecha; el take de las filas ya es la copia
+        if order is None:
+            order = (
+                df[self.keys]
+                .reset_index(drop=True)
+                .assign(fecha=calendar.column("fecha").to_numpy())
+                .sort_values(self.keys + ["fecha"])
+                .index.to_numpy()
+            )
+        self.order = order
+        self.df = df.take(order).reset_index(drop=True)
+        self.calendar = calendar.take(order)
+        self.df["fecha"] = self.calendar.column("fecha")
+        self.inputs = list(self.df.columns)
+
+        # Clases de cada codificación, para codificar filas nuevas con los mismos códigos
+        self.label_classes = {}
+        self.store = None
+        self._computed = set()
+        self._series_bounds = None
+        self._series_offsets = series_offsets
+
+    @property
+    def series_bounds(self):
+        """(inicio de la serie de cada fila, filas con claves válidas)"""
+        if self._series_bounds is None:
+            if self._series_offsets is None:
+                self._series_bounds = group_starts(self.df, self.keys)
+            else:
+                offsets = np.asarray(self._series_offsets, dtype=np.int64)
+                starts = np.repeat(offsets[:-1], np.diff(offsets))
+                valid = self.df[self.keys].notna().all(axis=1).to_numpy()
+                self._series_bounds = starts, valid
+        return self._series_bounds
+
+    @property
+    def series_offsets(self):
+        """Posición donde empieza cada serie, más el total de filas"""
+        if self._series_offsets is None:
+            starts, _ = self.series_bounds
+            first = np.flatnonzero(starts == np.arange(len(starts)))
+            self._series_offsets = np.append(first, len(starts))
+        return self._series_offsets
+
+    def attach(self, features):
+        """Agregar características ya calculadas (alineadas con ``df``) sin copiarlas"""
+        columns = list(self.df.columns)
+        columns += [name for name in features.columns if name not in columns]
+        inputs = self.df.drop(columns=[c for c in features.columns if c in self.df])
+        self.df = pd.concat([inputs, features], axis=1)
+        if list(self.df.columns) != columns:
+            self.df = self.df[columns]
+        self._computed.update(features.columns)
+        return self
+
+    def require(self, names):
+        for name in self.registry.resolve(names):
+            if name not in self._computed:
+                self.df[name] = self.registry.producer(name)(self)
+                self._computed.add(name)
+                if self.store is not None:
+                    self.store.save_feature(self, name)
+        return self
+
+    def frame(self, names=None):
+        """Columnas de entrada más ``names`` (todas las registradas si es None).
+
+        ``names`` puede incluir columnas de entrada (p. ej. ``produccion_mwh``).
+        """
+        if names is None:
+            names = self.registry.names()
+        features = [name for name in names if name in self.registry]
+        missing = [
+            name
+            for name in names
+            if name not in self.registry and name not in self.df.columns
+        ]
+        if missing:
+            raise KeyError(f"Características no registradas: {missing}")
+
+        # Entradas en su orden y el resto en orden de registro, sin importar
+        # en qué orden (o sesión) se calcularon
+        wanted = self.registry.resolve(features)
+        self.require(features)
+        columns = [c for c in self.inputs if c not in self.registry or c in wanted]
+        columns += [name for name in wanted if name not in self.inputs]
+        return self.df[columns]
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from .feature_engine import LazyFeatureFrame
+
+META_FILE = "_meta.json"
+GENERATION_PREFIX = "gen-"
+
+# Columnas con máscara de nulos que se guardan como datos + máscara
+MASKED_ARRAYS = (
+    pd.arrays.IntegerArray,
+    pd.arrays.FloatingArray,
+    pd.arrays.BooleanArray,
+)
+
+
+def row_hashes(df, columns):
+    """Hash de cada fila de ``df[columns]`` (sin el índice)"""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def data_hash(hashes):
+    return hashlib.sha256(np.ascontiguousarray(hashes).tobytes()).hexdigest()
+
+
+class FeatureStore:
+    """Características preparadas en disco: un ``.npy`` por columna más ``_meta.json``.
+
+    El metadato guarda la clave de configuración, el hash de los datos de
+    entrada, los offsets de cada serie, las clases de cada codificación y las
+    columnas almacenadas; junto a ellas están el orden de las filas (posición
+    de entrada de cada fila ordenada) y el hash de cada fila.
+
+    Con los mismos datos las columnas se mapean en memoria
+    (``np.load(mmap_mode="c")``) sin recalcular nada. Si los datos solo
+    ganaron filas al final y cada una es posterior a lo almacenado de su
+    serie, se calculan solo esas filas (con ``context`` filas previas de la
+    serie para lags y medias móviles) y lo almacenado se reordena. En
+    cualquier otro caso se reconstruye desde cero.
+    """
+
+    def __init__(self, store_dir, key=None, context=0):
+        self.store_dir = store_dir
+        self.key = json.loads(json.dumps(key or {}, default=str))
+        self.context = context
+        self.meta_path = os.path.join(store_dir, META_FILE)
+        self.meta = None
+
+    def _read_meta(self):
+        if not os.path.exists(self.meta_path):
+            return None
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            print(
+                f"⚠️ Almacén de características: no se pudo leer {self.meta_path}: {e}"
+            )
+            return None
+        return meta if meta.get("key") == self.key else None
+
+    def _generation_dir(self, generation):
+        return os.path.join(self.store_dir, f"{GENERATION_PREFIX}{generation:05d}")
+
+    def _path(self, meta, name):
+        return os.path.join(self._generation_dir(meta["generation"]), f"{name}.npy")
+
+    def _array(self, meta, name):
+        # ndarray (no la subclase memmap) que sigue apuntando al archivo mapeado
+        return np.asarray(np.load(self._path(meta, name), mmap_mode="c"))
+
+    def _features(self, meta):
+        """Columnas almacenadas, mapeadas en memoria (sin copiarlas)"""
+        columns = {}
+        for name, spec in meta["features"].items():
+            values = self._array(meta, name)
+            if spec["masked"]:
+                dtype = pd.api.types.pandas_dtype(spec["dtype"])
+                mask = self._array(meta, f"{name}.mask")
+                values = dtype.construct_array_type()(values, mask)
+            columns[name] = values
+        return pd.DataFrame(columns, copy=False)
+
+    @staticmethod
+    def _label_classes(meta):
+        return {
+            name: np.array(classes, dtype=object)
+            for name, classes in meta["label_classes"].items()
+        }
+
+    def open(self, df, registry, calendar, keys, columns):
+        """Marco de características de ``df`` respaldado por el almacén.
+
+        ``columns`` son las columnas de entrada de las que dependen las
+        características: su hash por fila decide si el almacén sirve.
+        """
+        hashes = row_hashes(df, columns)
+        meta = self._read_meta()
+        frame = None
+        try:
+            if meta is not None and meta["rows"] == len(df):
+                if meta["data_hash"] == data_hash(hashes):
+                    frame = self._restore(meta, df, registry, calendar, keys)
+            elif meta is not None and meta["rows"] < len(df):
+                stored = self._array(meta, "row_hashes")
+                if np.array_equal(stored, hashes[: meta["rows"]]):
+                    frame = self._extend(meta, df, registry, calendar, keys, hashes)
+        except (OSError, ValueError) as e:
+            print(
+                f"⚠️ Almacén de características: no se pudo usar {self.store_dir}: {e}"
+            )
+            frame = None
+
+        if frame is None:
+            frame = LazyFeatureFrame(df, registry, calendar, keys)
+            self._write(frame, hashes, [])
+        frame.store = self
+        return frame
+
+    def _restore(self, meta, df, registry, calendar, keys):
+        frame = LazyFeatureFrame(
+            df,
+            registry,
+            calendar,
+            keys,
+            order=self._array(meta, "order"),
+            series_offsets=meta["group_offsets"],
+        )
+        frame.label_classes = self._label_classes(meta)
+        frame.attach(self._features(meta))
+        self.meta = meta
+        print(
+            f"💾 Características mapeadas desde {self.store_dir}"
+            f" ({len(meta['features'])} columnas, {meta['rows']:,} filas)"
+        )
+        return frame
+
+    def _extend(self, meta, df, registry, calendar, keys, hashes):
+        """Calcular solo las filas anexadas y reordenar lo almacenado"""
+        n_old = meta["rows"]
+        names = list(meta["features"])
+        frame = LazyFeatureFrame(df, registry, calendar, keys)
+        is_new = frame.order >= n_old
+        starts, _ = frame.series_bounds
+        positions = np.arange(len(is_new))
+
+        def same_series(step):
+            # La fila i + step pertenece a la misma serie que la fila i
+            return starts[step:] <= positions[:-step]
+
+        # Una fila histórica después de una nueva en su serie cambiaría sus lags
+        if np.any(is_new[:-1] & ~is_new[1:] & same_series(1)):
+            print(
+                "   ♻️  Hay filas nuevas intercaladas en el histórico: se recalcula todo"
+            )
+            return None
+
+        needed = is_new.copy()
+        for step in range(1, self.context + 1):
+            needed[:-step] |= is_new[step:] & same_series(step)
+        rows = np.flatnonzero(needed)
+        tail = LazyFeatureFrame(df, registry, calendar, keys, order=frame.order[rows])
+        tail.label_classes = self._label_classes(meta)
+        try:
+            tail.require(names)
+        except ValueError:
+            # Categorías nuevas: cambian los códigos de las filas históricas
+            print("   ♻️  Hay categorías nuevas: se recalcula todo")
+            return None
+
+        # Filas históricas desde el almacén, filas nuevas desde el cálculo
+        rank = np.empty(n_old, dtype=np.int64)
+        rank[self._array(meta, "order")] = np.arange(n_old)
+        indexer = np.empty(len(is_new), dtype=np.int64)
+        indexer[~is_new] = rank[frame.order[~is_new]]
+        indexer[is_new] = n_old + np.arange(int(is_new.sum()))
+
+        stored = self._features(meta)
+        computed = tail.df.loc[is_new[rows], names]
+        features = pd.DataFrame(
+            {
+                name: pd.concat(
+                    [stored[name], computed[name]], ignore_index=True
+                ).array.take(indexer)
+                for name in names
+            }
+        )
+        frame.label_classes = tail.label_classes
+        frame.attach(features)
+        self._write(frame, hashes, names)
+        print(
+            f"💾 Características: {int(is_new.sum()):,} filas nuevas calculadas"
+            f" ({len(rows) - int(is_new.sum()):,} de contexto), {n_old:,} desde {self.store_dir}"
+        )
+        return frame
+
+    def _write(self, frame, hashes, names):
+        """Nueva generación con el orden, los hashes y las características ``names``"""
+        # Número nuevo: nunca se sobrescriben archivos que otro marco tenga mapeados
+        generation = 0
+        if os.path.isdir(self.store_dir):
+            generation = 1 + max(
+                (
+                    int(entry[len(GENERATION_PREFIX) :])
+                    for entry in os.listdir(self.store_dir)
+                    if entry.startswith(GENERATION_PREFIX)
+                ),
+                default=-1,
+            )
+
+        meta = {
+            "key": self.key,
+            "rows": len(frame.df),
+            "data_hash": data_hash(hashes),
+            "generation": generation,
+            "group_offsets": np.asarray(frame.series_offsets).tolist(),
+            "features": {},
+            "label_classes": {},
+        }
+        os.makedirs(self._generation_dir(generation), exist_ok=True)
+        np.save(self._path(meta, "order"), np.asarray(frame.order, dtype=np.int64))
+        np.save(self._path(meta, "row_hashes"), hashes)
+        for name in names:
+            self._write_feature(meta, frame, name)
+        self._write_meta(meta)
+
+        # Generaciones anteriores, solo cuando el metadato ya apunta a la nueva
+        current = os.path.basename(self._generation_dir(generation))
+        for entry in os.listdir(self.store_dir):
+            if entry.startswith(GENERATION_PREFIX) and entry != current:
+                shutil.rmtree(os.path.join(self.store_dir, entry), ignore_errors=True)
+
+    def _write_feature(self, meta, frame, name):
+        values = frame.df[name].array
+        if isinstance(values, MASKED_ARRAYS):
+            np.save(self._path(meta, f"{name}.mask"), values.isna())
+            data = values.to_numpy(dtype=values.dtype.numpy_dtype, na_value=0)
+            masked = True
+        else:
+            data = frame.df[name].to_numpy()
+            if data.dtype.kind not in "biuf":
+                return False
+            masked = False
+
+        np.save(self._path(meta, name), data)
+        meta["features"][name] = {"dtype": str(values.dtype), "masked": masked}
+        if name in frame.label_classes:
+            meta["label_classes"][name] = np.asarray(frame.label_classes[name]).tolist()
+        return True
+
+    def _write_meta(self, meta):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+        self.meta = meta
+
+    def save_feature(self, frame, name):
+        """Persistir una característica recién calculada en la generación actual"""
+        if self.meta is not None and self._write_feature(self.meta, frame, name):
+            self._write_meta(self.meta)
@@ -0,0 +1,219 @@
+import re
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ["departamento", "tecnologia"]
+
+_LAG_PATTERN = re.compile(r"^produccion_lag_(\d+)$")
+_MA_PATTERN = re.compile(r"^produccion_ma_(\d+)$")
+
+
+def calendar_matrix(dates):
+    """Características de calendario para un conjunto de fechas futuras"""
+    dates = pd.DatetimeIndex(dates)
+    mes = dates.month.to_numpy(dtype=float)
+    semana = dates.isocalendar().week.to_numpy(dtype=float)
+    return {
+        "mes": mes,
+        "trimestre": dates.quarter.to_numpy(dtype=float),
+        "semana_año": semana,
+        "mes_sin": np.sin(2 * np.pi * mes / 12),
+        "mes_cos": np.cos(2 * np.pi * mes / 12),
+        "semana_sin": np.sin(2 * np.pi * semana / 52),
+        "semana_cos": np.cos(2 * np.pi * semana / 52),
+    }
+
+
+def frequency_days(freq):
+    """Número de días de un paso de la cadencia ("D", "7D", ...)"""
+    step = pd.Timedelta(freq if freq[:1].isdigit() else f"1{freq}")
+    return max(1, step.days)
+
+
+def future_dates(last_date, horizon_weeks, freq="D"):
+    """Fechas a pronosticar a partir de la última observación, en la cadencia dada"""
+    horizon_days = int(horizon_weeks) * 7
+    step_days = frequency_days(freq)
+    return pd.date_range(
+        start=last_date + pd.Timedelta(days=step_days),
+        periods=max(1, horizon_days // step_days),
+        freq=f"{step_days}D",
+    )
+
+
+def interpolate_daily(predictions, value_column="prediccion_mwh"):
+    """Interpolar linealmente un pronóstico a resolución diaria.
+
+    Espera el layout de salida de los motores (series contiguas con las
+    mismas fechas), así que los pesos se calculan una sola vez.
+    """
+    dates = pd.DatetimeIndex(predictions["fecha"].drop_duplicates().sort_values())
+    if len(dates) < 2 or len(predictions) == 0:
+        return predictions
+
+    n_steps = len(dates)
+    n_series = len(predictions) // n_steps
+    values = predictions[value_column].to_numpy(dtype=float).reshape(n_series, n_steps)
+
+    daily = pd.date_range(dates[0], dates[-1], freq="D")
+    position = np.interp(
+        daily.asi8.astype(float), dates.asi8.astype(float), np.arange(n_steps)
+    )
+    left = np.floor(position).astype(int)
+    right = np.minimum(left + 1, n_steps - 1)
+    weight = position - left
+    daily_values = values[:, left] * (1 - weight) + values[:, right] * weight
+
+    series = predictions[["departamento", "tecnologia"]].iloc[::n_steps]
+    return pd.DataFrame(
+        {
+            "fecha": np.tile(daily, n_series),
+            "departamento": np.repeat(series["departamento"].to_numpy(), len(daily)),
+            "tecnologia": np.repeat(series["tecnologia"].to_numpy(), len(daily)),
+            value_column: daily_values.ravel(),
+        }
+    )
+
+
+def make_wave_adjustment(data):
+    """Ajuste mensual histórico + onda estacional + ruido controlado.
+
+    Devuelve ``adjust(days, months, values)``, vectorizado sobre arreglos
+    de días transcurridos y meses para usarse paso a paso o en bloque.
+    """
+    # Promedios históricos por mes
+    monthly_means = data.groupby("mes")["produccion_mwh"].mean()
+    monthly_factor = monthly_means / monthly_means.mean()
+    factor_by_month = np.ones(13)
+    factor_by_month[monthly_factor.index.astype(int)] = monthly_factor.to_numpy()
+
+    def adjust(days, months, values):
+        months = np.asarray(months, dtype=int)
+        days = np.asarray(days, dtype=float)
+
+        # Ajuste por promedio mensual histórico
+        values = values * factor_by_month[months]
+
+        # Patrón estacional suavizado tipo onda
+        seasonal_factor = 1 + 0.05 * np.sin(2 * np.pi * (days / 30))
+
+        # Ruido aleatorio controlado
+        noise = np.random.normal(1, 0.015, size=np.shape(values))
+
+        return values * seasonal_factor * noise
+
+    return adjust
+
+
+class BatchForecaster:
+    """Pronóstico recursivo que avanza todas las series un paso a la vez.
+
+    Cada paso arma una matriz NumPy (series x características) y hace una
+    sola llamada a ``model.predict``; los lags y medias móviles se leen de
+    una matriz de historia preasignada en lugar de listas por serie.
+    """
+
+    def __init__(self, model, data, feature_columns, min_history=3):
+        self.model = model
+        self.feature_columns = list(feature_columns)
+
+        self.lag_columns = {}
+        self.ma_columns = {}
+        for idx, col in enumerate(self.feature_columns):
+            lag_match = _LAG_PATTERN.match(col)
+            ma_match = _MA_PATTERN.match(col)
+            if lag_match:
+                self.lag_columns[idx] = int(lag_match.group(1))
+            elif ma_match:
+                self.ma_columns[idx] = int(ma_match.group(1))
+
+        self.history_size = max(
+            list(self.lag_columns.values()) + list(self.ma_columns.values()) + [1]
+        )
+
+        data = data.sort_values(SERIES_KEYS + ["fecha"], kind="mergesort")
+        sizes = data.groupby(SERIES_KEYS, sort=True, observed=True)[
+            "produccion_mwh"
+        ].transform("size")
+        data = data[sizes.to_numpy() >= min_history].reset_index(drop=True)
+
+        grouped = data.groupby(SERIES_KEYS, sort=True, observed=True)
+        self.series = grouped.size().index
+        series_idx = grouped.ngroup().to_numpy()
+
+        # Última observación de cada serie: base de las características estáticas
+        last_rows = grouped.tail(1)
+        self.base_features = last_rows[self.feature_columns].to_numpy(dtype=float)
+
+        # Historia alineada a la derecha: columna history_size - 1 = último valor
+        tails = grouped.tail(self.history_size)
+        from_end = tails.groupby(SERIES_KEYS, sort=False, observed=True).cumcount(
+            ascending=False
+        )
+        tail_pos = self.history_size - 1 - from_end.to_numpy()
+        self.initial_history = np.full((len(self.series), self.history_size), np.nan)
+        self.initial_history[series_idx[tails.index], tail_pos] = tails[
+            "produccion_mwh"
+        ].to_numpy(dtype=float)
+
+    def run(self, future_dates, adjust=None):
+        """Generar predicciones para todas las series y fechas futuras.
+
+        ``adjust(days, months, values)`` permite post-procesar el vector de
+        predicciones de cada paso antes de incorporarlo a la historia.
+        """
+        future_dates = pd.DatetimeIndex(future_dates)
+        n_series = len(self.series)
+        n_steps = len(future_dates)
+        if n_series == 0 or n_steps == 0:
+            return pd.DataFrame(
+                columns=["fecha", "departamento", "tecnologia", "prediccion_mwh"]
+            )
+
+        calendar = calendar_matrix(future_dates)
+        elapsed_days = (future_dates - future_dates[0]).days.to_numpy()
+        calendar_idx = {
+            idx: calendar[col]
+            for idx, col in enumerate(self.feature_columns)
+            if col in calendar
+        }
+
+        history = np.full((n_series, self.history_size + n_steps), np.nan)
+        history[:, : self.history_size] = self.initial_history
+        X = self.base_features.copy()
+
+        for step in range(n_steps):
+            end = self.history_size + step
+
+            for idx, values in calendar_idx.items():
+                X[:, idx] = values[step]
+            for idx, lag in self.lag_columns.items():
+                X[:, idx] = np.nan_to_num(history[:, end - lag], nan=0.0)
+            for idx, window in self.ma_columns.items():
+                window_values = history[:, end - window : end]
+                counts = np.sum(~np.isnan(window_values), axis=1)
+                sums = np.nansum(window_values, axis=1)
+                X[:, idx] = np.divide(
+                    sums, counts, out=np.zeros(n_series), where=counts > 0
+                )
+
+            X_step = pd.DataFrame(X, columns=self.feature_columns)
+            pred = np.maximum(self.model.predict(X_step), 0.0)
+            if adjust is not None:
+                pred = adjust(elapsed_days[step], calendar["mes"][step], pred)
+
+            history[:, end] = pred
+
+        predictions = history[:, self.history_size :]
+        return pd.DataFrame(
+            {
+                "fecha": np.tile(future_dates, n_series),
+                "departamento": np.repeat(
+                    self.series.get_level_values(0).to_numpy(), n_steps
+                ),
+                "tecnologia": np.repeat(
+                    self.series.get_level_values(1).to_numpy(), n_steps
+                ),
+                "prediccion_mwh": predictions.ravel(),
+            }
+        )
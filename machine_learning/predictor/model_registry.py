@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import joblib
+import pandas as pd
+
+
+class ModelRegistry:
+    """Registro de modelos entrenados direccionado por contenido.
+
+    La clave es un hash de los datos de entrenamiento preparados más la
+    configuración del modelo; si ya existe un artefacto con esa clave se
+    reutiliza en lugar de volver a entrenar. Con ``model_dir=None`` el
+    registro queda deshabilitado y siempre se entrena.
+    """
+
+    def __init__(self, model_dir=None):
+        self.model_dir = model_dir
+
+    @property
+    def enabled(self):
+        return self.model_dir is not None
+
+    @staticmethod
+    def fingerprint(data, config):
+        """Hash estable de un DataFrame + configuración (dict serializable)"""
+        digest = hashlib.sha256()
+        digest.update(",".join(map(str, data.columns)).encode("utf-8"))
+        digest.update(
+            pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()
+        )
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, kind, key):
+        return os.path.join(self.model_dir, kind, f"{key}.joblib")
+
+    def load(self, kind, key):
+        """Cargar el artefacto registrado para ``key`` (o None si no existe)"""
+        if not self.enabled:
+            return None
+        path = self._path(kind, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            print(f"⚠️ Registro de modelos: no se pudo leer {path}: {e}")
+            return None
+
+    def save(self, kind, key, payload):
+        """Persistir un artefacto (modelo, métricas, ...) bajo ``key``"""
+        if not self.enabled:
+            return None
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def fetch_or_fit(self, kind, data, config, fit):
+        """Devolver el artefacto registrado o entrenarlo con ``fit()`` y guardarlo"""
+        if not self.enabled:
+            return fit()
+
+        key = self.fingerprint(data, config)
+        payload = self.load(kind, key)
+        if payload is not None:
+            print(f"   ♻️  Modelo {kind} reutilizado del registro ({key[:10]})")
+            return payload
+
+        payload = fit()
+        self.save(kind, key, payload)
+        return payload
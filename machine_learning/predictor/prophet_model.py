@@ -1,13 +1,26 @@
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 import pandas as pd
 from data_processing.config.config import PredictionConfig
 
 try:
     from prophet import Prophet
+    from prophet.serialize import model_from_json, model_to_json
     PROPHET_AVAILABLE = True
 except ImportError:
     PROPHET_AVAILABLE = False
 
+STAN_LOGGERS = ["cmdstanpy", "prophet"]
+WARM_START_PARAMS = ["k", "m", "delta", "beta", "sigma_obs"]
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper", "departamento", "tecnologia"]
+
+
 def predict_with_prophet(self, horizon_weeks=None):
     if not PROPHET_AVAILABLE:
         print("⚠️ Prophet no disponible.")
@@ -17,26 +30,185 @@ def predict_with_prophet(self, horizon_weeks=None):
         horizon_weeks = PredictionConfig.PREDICTION_CONFIG["default_horizon_weeks"]
 
     print(f"\n🔮 Ejecutando predicciones Prophet ({horizon_weeks} semanas)...")
-    prophet_results = []
 
-    for (dept, tech), group_data in self.df.groupby(["departamento", "tecnologia"]):
+    runtime = PredictionConfig.PROPHET_RUNTIME_CONFIG
+    warm_start = _load_warm_start(runtime["warm_start_file"]) if runtime["warm_start"] else {}
+    config_key = json.dumps(PredictionConfig.PROPHET_CONFIG, sort_keys=True)
+
+    tasks, keys = [], []
+    for (dept, tech), group_data in self.feature_frame([]).groupby(["departamento", "tecnologia"], observed=True):
         if len(group_data) < PredictionConfig.PREDICTION_CONFIG["min_data_points"]:
             continue
 
         prophet_df = pd.DataFrame({"ds": group_data["fecha"], "y": group_data["produccion_mwh"]})
-        model = Prophet(**PredictionConfig.PROPHET_CONFIG)
-        model.fit(prophet_df)
+        key = None
+        model_json = None
+        if self.registry.enabled:
+            key = self.registry.fingerprint(
+                prophet_df,
+                {"serie": [dept, tech], "prophet": PredictionConfig.PROPHET_CONFIG},
+            )
+            cached = self.registry.load("prophet", key)
+            if cached is not None:
+                print(f"   ♻️  Modelo prophet reutilizado del registro ({key[:10]})")
+                model_json = cached["model_json"]
+
+        # Parámetros del ajuste anterior de la serie como punto de partida
+        init = None
+        previous = warm_start.get(f"{dept}|{tech}")
+        if model_json is None and previous and previous["config"] == config_key:
+            init = previous["params"]
+
+        tasks.append((dept, tech, prophet_df, horizon_weeks, model_json, init))
+        keys.append(key)
+
+    n_warm = sum(task[5] is not None for task in tasks)
+    if n_warm:
+        print(f"   🔥 {n_warm} series con arranque en caliente")
 
-        future_dates = model.make_future_dataframe(periods=horizon_weeks, freq="W")
-        forecast = model.predict(future_dates)
-        future_forecast = forecast.tail(horizon_weeks).copy()
-        future_forecast["departamento"] = dept
-        future_forecast["tecnologia"] = tech
+    n_workers = runtime["n_workers"] or os.cpu_count() or 1
+    n_workers = min(n_workers, len(tasks))
 
-        prophet_results.append(future_forecast[["ds", "yhat", "yhat_lower", "yhat_upper", "departamento", "tecnologia"]])
+    with _stan_logging(runtime["log_file"], parallel=n_workers > 1) as log_queue:
+        if n_workers > 1:
+            print(f"   ⚙️  Ajustando {len(tasks)} series en {n_workers} procesos...")
+            context = multiprocessing.get_context()
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=context,
+                initializer=_init_worker_logging,
+                initargs=(log_queue,),
+            ) as executor:
+                # map conserva el orden de las tareas: resultados deterministas
+                results = list(executor.map(_fit_prophet_series, tasks))
+        else:
+            results = [_fit_prophet_series(task) for task in tasks]
+
+    prophet_results = []
+    for task, key, (forecast, model_json, params) in zip(tasks, keys, results):
+        if key is not None and task[4] is None:
+            self.registry.save("prophet", key, {"model_json": model_json})
+        if params is not None:
+            warm_start[f"{task[0]}|{task[1]}"] = {"config": config_key, "params": params}
+        prophet_results.append(forecast)
+
+    if runtime["warm_start"]:
+        _save_warm_start(runtime["warm_start_file"], warm_start)
 
     if prophet_results:
         self.predictions["prophet"] = pd.concat(prophet_results, ignore_index=True)
         self.predictions["prophet"]["yhat"] = np.maximum(self.predictions["prophet"]["yhat"], 0)
 
     return self.predictions.get("prophet")
+
+
+def _fit_prophet_series(task):
+    """Ajustar (o reconstruir) el modelo de una serie y pronosticar su horizonte.
+
+    Función de módulo para poder ejecutarse en un proceso del pool.
+    """
+    dept, tech, prophet_df, horizon_weeks, model_json, init = task
+
+    params = None
+    if model_json is None:
+        model = Prophet(**PredictionConfig.PROPHET_CONFIG)
+        if init is not None:
+            init = {
+                name: np.asarray(value) if isinstance(value, list) else value
+                for name, value in init.items()
+            }
+            model.fit(prophet_df, init=init)
+        else:
+            model.fit(prophet_df)
+        model_json = model_to_json(model)
+        params = _warm_start_params(model)
+    else:
+        model = model_from_json(model_json)
+
+    future_dates = model.make_future_dataframe(periods=horizon_weeks, freq="W")
+    forecast = model.predict(future_dates)
+    future_forecast = forecast.tail(horizon_weeks).copy()
+    future_forecast["departamento"] = dept
+    future_forecast["tecnologia"] = tech
+
+    return future_forecast[FORECAST_COLUMNS].reset_index(drop=True), model_json, params
+
+
+def _warm_start_params(model):
+    """Extraer k, m, delta, beta y sigma_obs de un modelo ajustado"""
+    params = {}
+    for name in WARM_START_PARAMS:
+        values = np.asarray(model.params[name])[0]
+        if name in ("k", "m", "sigma_obs"):
+            params[name] = float(values[0])
+        else:
+            params[name] = values.tolist()
+    return params
+
+
+def _load_warm_start(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No se pudieron leer los parámetros de arranque en caliente: {e}")
+        return {}
+
+
+def _save_warm_start(path, warm_start):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(warm_start, f)
+
+
+def _init_worker_logging(log_queue):
+    """Redirigir los logs de Stan del proceso hijo a la cola del proceso padre"""
+    handler = logging.handlers.QueueHandler(log_queue)
+    for name in STAN_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+@contextmanager
+def _stan_logging(log_file, parallel=False):
+    """Enviar los logs de cmdstanpy/prophet a un único archivo en lugar de la consola.
+
+    En modo paralelo entrega una cola que los procesos hijos usan para
+    escribir, a través de un ``QueueListener``, en el mismo archivo.
+    """
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    saved = {}
+    for name in STAN_LOGGERS:
+        logger = logging.getLogger(name)
+        saved[name] = (logger.handlers, logger.level, logger.propagate)
+        logger.handlers = [file_handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    log_queue = None
+    listener = None
+    if parallel:
+        log_queue = multiprocessing.get_context().Queue()
+        listener = logging.handlers.QueueListener(log_queue, file_handler)
+        listener.start()
+
+    try:
+        yield log_queue
+    finally:
+        if listener is not None:
+            listener.stop()
+        for name, (handlers, level, propagate) in saved.items():
+            logger = logging.getLogger(name)
+            logger.handlers = handlers
+            logger.setLevel(level)
+            logger.propagate = propagate
+        file_handler.close()
@@ -5,8 +5,10 @@ def generate_comparative_analysis(self):
     print("📈 ANÁLISIS COMPARATIVO: HISTÓRICO vs FUTURO")
     print("=" * 60)
 
-    historical_avg = self.df_historical["produccion_mwh"].mean()
-    historical_total = self.df_historical["produccion_mwh"].sum()
+    # Reducciones en float64 (la producción puede venir en float32)
+    historical = self.df_historical["produccion_mwh"].astype(float)
+    historical_avg = historical.mean()
+    historical_total = historical.sum()
 
     print(f"📊 DATOS HISTÓRICOS:")
     print(f"   • Promedio semanal: {historical_avg:.2f} MWh")
@@ -10,7 +10,7 @@ def analyze_leadership_consistency(self):
     if "ml" in self.predictor.predictions:
         future_leader_ml = (
             self.predictor.predictions["ml"]
-            .groupby("departamento")["prediccion_mwh"]
+            .groupby("departamento", observed=True)["prediccion_mwh"]
             .sum()
             .idxmax()
         )
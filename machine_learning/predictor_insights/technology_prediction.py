@@ -2,14 +2,17 @@ def analyze_technology_trends(self):
     print(f"\n⚡ TENDENCIAS TECNOLÓGICAS:")
     print("-" * 30)
 
-    historical_tech = self.df_historical.groupby("tecnologia")["produccion_mwh"].sum()
+    historical = self.df_historical["produccion_mwh"].astype(float)
+    historical_tech = historical.groupby(
+        self.df_historical["tecnologia"], observed=True
+    ).sum()
     historical_leader = historical_tech.idxmax()
     print(f"   📊 Tecnología líder histórica: {historical_leader}")
 
     if "ml" in self.predictor.predictions:
         future_tech = (
             self.predictor.predictions["ml"]
-            .groupby("tecnologia")["prediccion_mwh"]
+            .groupby("tecnologia", observed=True)["prediccion_mwh"]
             .sum()
         )
         future_leader = future_tech.idxmax()
@@ -1,6 +1,8 @@
 import os
 import traceback  # Para mostrar tracebacks
+from data_processing.config.config import EDAConfig
 from data_processing.import_export_Data.data_loader import DataLoader
+from data_processing.import_export_Data.calendar_store import CalendarFeatureStore
 from data_processing.eda.eda import EnergyEDA
 from data_processing.eda.insights import InsightsGenerator
 from data_processing.import_export_Data.exporter import DataExporter
@@ -43,17 +45,22 @@ def main():
         print("❌ Error: No se pudieron cargar los datos")
         return
 
-    # EDA existente
-    eda = EnergyEDA(loader.df)
-    eda.basic_info()
-    eda.analyze_temporal_patterns()  # Crea mes, trimestre, etc.
-    eda.analyze_departments()
-    eda.analyze_technologies()
-    eda.cross_analysis()
+    # EDA existente: cada sección se calcula la primera vez que se lee; el
+    # reporte completo las usa todas, así que por defecto se calculan ya
+    # (en paralelo entre secciones independientes)
+    # Columnas de calendario una vez por fecha distinta, compartidas por el
+    # EDA, la preparación de predicciones y la exportación
+    calendar = CalendarFeatureStore.from_frame(loader.df)
+
+    eda = EnergyEDA(loader.df, calendar=calendar)
+    if EDAConfig.SECTIONS_CONFIG["materialize_all"]:
+        eda.run_sections()
 
 
     # insights existentes
-    insights_gen = InsightsGenerator(loader.df, eda.insights)
+    insights_gen = InsightsGenerator(
+        loader.df, eda.insights, cube=eda.cube, pivot=eda.cross_matrix.production
+    )
     insights_gen.generate_summary()
     
     # Generar insights comprehensive para el reporte
@@ -69,7 +76,7 @@ def main():
     try:
         # Inicializar sistema de predicciones
         print("🔧 Inicializando sistema de predicciones...")
-        predictor = EnergyPredictor(loader.df)
+        predictor = EnergyPredictor(loader.df, calendar=calendar)
 
         # Ejecutar predicciones ML (siempre disponible)
         print("\n🤖 Ejecutando predicciones con Machine Learning...")
@@ -79,6 +86,10 @@ def main():
         print("\n🔮 Ejecutando predicciones con Prophet...")
         prophet_predictions = predictor.predict_with_prophet(horizon_weeks=24)
 
+        # Ejecutar Holt-Winters por lotes (alternativa rápida a Prophet)
+        print("\n📉 Ejecutando predicciones con suavizado exponencial...")
+        ets_predictions = predictor.predict_with_ets(horizon_weeks=24)
+
         # Generar insights de predicciones
         prediction_insights = predictor.generate_prediction_insights()
 
@@ -114,7 +125,7 @@ def main():
 
         # Tu exportación tradicional (sin cambios)
         print("📁 Exportando datos EDA tradicionales...")
-        exporter = DataExporter(loader.df, EXPORT_DIR)
+        exporter = DataExporter(loader.df, EXPORT_DIR, calendar)
         exporter.export_processed_data()
 
         # Nueva exportación de predicciones
@@ -140,6 +151,8 @@ def main():
             print(f"🤖 Predicciones ML: {len(ml_predictions)} registros")
         if prophet_predictions is not None:
             print(f"🔮 Predicciones Prophet: {len(prophet_predictions)} registros")
+        if ets_predictions is not None:
+            print(f"📉 Predicciones ETS: {len(ets_predictions)} registros")
 
         print(f"💡 Recomendaciones generadas: {len(recommendations)}")
 
@@ -164,7 +177,7 @@ def main():
         print("📊 Continuando solo con EDA tradicional...")
 
         # Fallback: solo tu EDA original
-        exporter = DataExporter(loader.df, EXPORT_DIR)
+        exporter = DataExporter(loader.df, EXPORT_DIR, calendar)
         exporter.export_processed_data()
 
         print("✅ EDA completado (sin predicciones)")
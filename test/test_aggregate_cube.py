@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from data_processing.eda.aggregate_cube import AggregateCube
+from data_processing.eda.moments import MomentStore
+
+
+def _frame(offset=0.0, seed=0, n_rows=2000):
+    """Producción sintética; ``offset`` grande hace visible la cancelación"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "departamento": rng.choice(["Atlántico", "Cesar", "Magdalena"], n_rows),
+            "tecnologia": rng.choice(["Solar", "Eólica"], n_rows),
+            "fecha": pd.Timestamp("2023-01-01")
+            + pd.to_timedelta(rng.integers(0, 730, n_rows), unit="D"),
+            "produccion_mwh": offset + rng.normal(0, 1, n_rows),
+        }
+    )
+
+
+def _expected(df, by):
+    fechas = df["fecha"]
+    keys = {"año": fechas.dt.year, "mes": fechas.dt.month}
+    groups = [keys.get(dim, df.get(dim)) for dim in by]
+    return df.groupby(groups)["produccion_mwh"].agg(["sum", "count", "mean", "std"])
+
+
+def test_rollup_std_matches_pandas_with_large_offset():
+    """Desviación por fusión de M2: sin cancelación aunque la media sea enorme"""
+    df = _frame(offset=1e9)
+    cube = AggregateCube.from_frame(df)
+    for by in (["mes"], ["departamento", "tecnologia"], ["año", "tecnologia"]):
+        actual = cube.rollup(by)
+        expected = _expected(df, by)
+        np.testing.assert_array_equal(actual["count"], expected["count"])
+        np.testing.assert_allclose(actual["mean"], expected["mean"], rtol=1e-12)
+        np.testing.assert_allclose(actual["std"], expected["std"], rtol=1e-6)
+
+    total = cube.total(tecnologia="Solar")
+    solar = df.loc[df["tecnologia"] == "Solar", "produccion_mwh"]
+    assert np.isclose(total["std"], solar.std(), rtol=1e-6)
+    print("✅ rollup con M2 fusionado igual a pandas: OK")
+
+
+def test_cube_from_moments_matches_from_frame():
+    """El cubo armado desde un MomentStore da los mismos agregados"""
+    df = _frame()
+    direct = AggregateCube.from_frame(df)
+    from_moments = AggregateCube.from_moments(MomentStore.from_frame(df).cells)
+    for by in ("departamento", ["tecnologia", "trimestre"]):
+        pd.testing.assert_frame_equal(
+            direct.rollup(by), from_moments.rollup(by), check_exact=False, rtol=1e-9
+        )
+    print("✅ Cubo desde momentos igual al cubo desde filas: OK")
+
+
+if __name__ == "__main__":
+    test_rollup_std_matches_pandas_with_large_offset()
+    test_cube_from_moments_matches_from_frame()
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from data_processing.import_export_Data.calendar_store import CalendarFeatureStore
+
+
+def _frame(n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "fecha": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 400, n_rows), unit="D"),
+            "produccion_mwh": rng.normal(1000, 100, n_rows),
+        }
+    )
+
+
+def test_calendar_reused_for_same_rows():
+    """Mismas filas y fechas (aunque sea otra copia u otras columnas): se reutiliza"""
+    df = _frame()
+    calendar = CalendarFeatureStore.from_frame(df)
+
+    assert CalendarFeatureStore.for_frame(df, calendar) is calendar
+    assert CalendarFeatureStore.for_frame(df.copy(), calendar) is calendar
+    other_values = df.assign(produccion_mwh=0.0)
+    assert CalendarFeatureStore.for_frame(other_values, calendar) is calendar
+
+    pd.testing.assert_series_equal(
+        calendar.column("mes"), df["fecha"].dt.month.rename("mes"), check_dtype=False
+    )
+    print("✅ Calendario reutilizado con las mismas fechas: OK")
+
+
+def test_calendar_invalidated_when_rows_change():
+    """Otro índice, otra longitud u otras fechas con el mismo índice: se recalcula"""
+    df = _frame()
+    calendar = CalendarFeatureStore.from_frame(df)
+
+    shifted = df.assign(fecha=df["fecha"] + pd.Timedelta(days=40))
+    rebuilt = CalendarFeatureStore.for_frame(shifted, calendar)
+    assert rebuilt is not calendar
+    pd.testing.assert_series_equal(
+        rebuilt.column("mes"),
+        shifted["fecha"].dt.month.rename("mes"),
+        check_dtype=False,
+    )
+
+    # Una sola fecha distinta basta
+    edited = df.copy()
+    edited.loc[0, "fecha"] = df.loc[0, "fecha"] + pd.Timedelta(days=1)
+    assert not calendar.matches(edited)
+
+    assert not calendar.matches(df.iloc[1:])
+    assert not calendar.matches(df.set_axis(df.index + 1))
+    assert not calendar.matches(df.drop(columns="fecha"))
+    print("✅ Calendario invalidado si cambian las filas: OK")
+
+
+def test_taken_calendar_matches_selected_rows():
+    """``take`` sirve para las filas elegidas (con índice 0..n-1) y nada más"""
+    df = _frame()
+    calendar = CalendarFeatureStore.from_frame(df)
+    positions = np.flatnonzero(df["produccion_mwh"].to_numpy() > 1000)
+
+    subset = df.iloc[positions].reset_index(drop=True)
+    taken = calendar.take(positions)
+    assert taken.matches(subset)
+    assert CalendarFeatureStore.for_frame(subset, taken) is taken
+    assert calendar.matches(df)
+    assert not taken.matches(df.iloc[: len(positions)].reset_index(drop=True))
+    print("✅ Calendario de un subconjunto de filas: OK")
+
+
+if __name__ == "__main__":
+    test_calendar_reused_for_same_rows()
+    test_calendar_invalidated_when_rows_change()
+    test_taken_calendar_matches_selected_rows()
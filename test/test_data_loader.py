@@ -0,0 +1,88 @@
+import os
+import tempfile
+import pandas as pd
+from data_processing.import_export_Data.data_loader import DataLoader
+
+HEADER = "departamento,tecnología,producción_mwh,fecha\n"
+
+
+def _write_csv(directory, name, rows):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "".join(f"{row}\n" for row in rows))
+    return path
+
+
+def _rows(df):
+    """Filas como tuplas comparables (sin depender de tipos ni del índice)"""
+    return sorted(
+        zip(
+            df["departamento"].astype(str),
+            df["tecnologia"].astype(str),
+            df["produccion_mwh"].astype(float),
+            df["fecha"].dt.strftime("%Y-%m-%d"),
+        )
+    )
+
+
+def test_load_many_dedupes_only_across_files():
+    """Una clave repetida en otro archivo se reemplaza; dentro de un archivo no"""
+    first = [
+        "Cesar,Solar,100,2024-01-01",
+        "Cesar,Solar,110,2024-01-01",  # duplicado dentro del archivo: se conserva
+        "Cesar,Eólica,200,2024-01-01",
+        "Magdalena,Solar,300,2024-01-08",
+    ]
+    second = [
+        "Magdalena,Solar,350,2024-01-08",  # re-entrega: reemplaza la anterior
+        "Magdalena,Solar,360,2024-01-08",
+        "Atlántico,Solar,400,2024-01-15",
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        _write_csv(directory, "a.csv", first)
+        _write_csv(directory, "b.csv", second)
+
+        loader = DataLoader(directory, use_cache=False)
+        assert loader.load_data()
+
+    expected = [
+        ("Atlántico", "Solar", 400.0, "2024-01-15"),
+        ("Cesar", "Eólica", 200.0, "2024-01-01"),
+        ("Cesar", "Solar", 100.0, "2024-01-01"),
+        ("Cesar", "Solar", 110.0, "2024-01-01"),
+        ("Magdalena", "Solar", 350.0, "2024-01-08"),
+        ("Magdalena", "Solar", 360.0, "2024-01-08"),
+    ]
+    assert _rows(loader.df) == expected
+    print("✅ _load_many quita duplicados solo entre archivos: OK")
+
+
+def test_load_many_matches_single_file_without_overlap():
+    """Archivos sin claves compartidas: igual que cargar el CSV completo"""
+    rows = [
+        "Cesar,Solar,100,2024-01-01",
+        "Cesar,Solar,100,2024-01-01",
+        "Cesar,Eólica,200,2024-01-08",
+        "La Guajira,Eólica,250,2024-01-08",
+        "La Guajira,Eólica,260,2024-01-08",
+        "Magdalena,Solar,300,2024-01-15",
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        single = DataLoader(_write_csv(directory, "todo.csv", rows), use_cache=False)
+        assert single.load_data()
+
+        parts = os.path.join(directory, "partes")
+        os.makedirs(parts)
+        _write_csv(parts, "1.csv", rows[:3])
+        _write_csv(parts, "2.csv", rows[3:])
+        many = DataLoader(parts, use_cache=False)
+        assert many.load_data()
+
+    assert _rows(many.df) == _rows(single.df)
+    assert list(many.df.columns) == list(single.df.columns)
+    print("✅ _load_many igual al archivo único sin solapamiento: OK")
+
+
+if __name__ == "__main__":
+    test_load_many_dedupes_only_across_files()
+    test_load_many_matches_single_file_without_overlap()
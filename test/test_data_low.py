@@ -1,4 +1,5 @@
 import os
+import tempfile
 import traceback  # Para mostrar tracebacks
 from data_processing.import_export_Data.data_loader import DataLoader
 from data_processing.eda.eda import EnergyEDA
@@ -27,7 +28,8 @@ def quick_test_with_sample_data():
             eda.analyze_departments()
 
             print("\n🔮 Ejecutando predicciones...")
-            predictor = EnergyPredictor(loader.df)
+            # Registro de modelos temporal: los tests no escriben en data/models
+            predictor = EnergyPredictor(loader.df, model_dir=tempfile.mkdtemp())
             predictor.predict_with_ml(horizon_weeks=8)
             predictor.generate_prediction_insights()
 
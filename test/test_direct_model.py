@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from machine_learning.predictor.direct_model import (
+    ORIGIN_FEATURES,
+    build_direct_training_set,
+    direct_pair_counts,
+)
+
+
+def _series_frame(seed=0, n_rows=300):
+    """Varias series con fechas irregulares y fechas repetidas"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "departamento": rng.choice(["Atlántico", "Cesar", "Magdalena"], n_rows),
+            "tecnologia": rng.choice(["Solar", "Eólica"], n_rows),
+            "fecha": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 120, n_rows), unit="D"),
+            "produccion_mwh": rng.integers(100, 2000, n_rows).astype(float),
+        }
+    )
+    df["dept_encoded"] = df["departamento"].astype("category").cat.codes
+    df["tech_encoded"] = df["tecnologia"].astype("category").cat.codes
+    for col in ORIGIN_FEATURES[1:]:
+        df[col] = rng.normal(1000, 100, n_rows)
+    return df
+
+
+def _brute_force_pairs(df, horizon_days):
+    """Pares (origen, objetivo) por comparación directa de todas las filas"""
+    df = df.sort_values(
+        ["departamento", "tecnologia", "fecha"], kind="mergesort"
+    ).reset_index(drop=True)
+    keys = list(zip(df["departamento"], df["tecnologia"]))
+    days = df["fecha"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    pairs = []
+    for i in range(len(df)):
+        for j in range(len(df)):
+            if keys[i] == keys[j] and 0 < days[j] - days[i] <= horizon_days:
+                pairs.append((i, j))
+    return df, pairs
+
+
+def test_direct_pair_counts_match_brute_force():
+    """Primer objetivo y cantidad de objetivos de cada origen"""
+    df, pairs = _brute_force_pairs(_series_frame(), horizon_days=14)
+    group_ids = df.groupby(["departamento", "tecnologia"], sort=True).ngroup()
+    days = df["fecha"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    first, counts = direct_pair_counts(group_ids.to_numpy(), days, 14)
+
+    expected_counts = np.zeros(len(df), dtype=np.int64)
+    for origin, _ in pairs:
+        expected_counts[origin] += 1
+    np.testing.assert_array_equal(counts, expected_counts)
+    for origin, target in pairs:
+        assert first[origin] <= target < first[origin] + counts[origin]
+
+    empty = np.zeros(0, dtype=np.int64)
+    first, counts = direct_pair_counts(empty, empty, 14)
+    assert len(first) == len(counts) == 0
+    print("✅ direct_pair_counts igual a la comparación directa: OK")
+
+
+def _pair_set(features, target):
+    """Pares construidos como tuplas (origen, horizonte, objetivo) comparables"""
+    return set(
+        zip(
+            features["produccion_mwh"],
+            features["horizonte_dias"],
+            target,
+        )
+    )
+
+
+def test_direct_training_set_without_cap_builds_every_pair():
+    """Sin tope se construyen todos los pares, con el horizonte correcto"""
+    raw = _series_frame()
+    df, pairs = _brute_force_pairs(raw, horizon_days=14)
+
+    features, target, origins = build_direct_training_set(raw, 14)
+
+    assert len(features) == len(target) == len(origins) == len(pairs)
+    np.testing.assert_array_equal(origins, [origin for origin, _ in pairs])
+    days = df["fecha"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    expected_horizon = [float(days[j] - days[i]) for i, j in pairs]
+    np.testing.assert_array_equal(features["horizonte_dias"], expected_horizon)
+    np.testing.assert_array_equal(
+        target, df["produccion_mwh"].to_numpy()[[j for _, j in pairs]]
+    )
+    print("✅ build_direct_training_set sin tope: OK")
+
+
+def test_direct_training_set_samples_pairs_reproducibly():
+    """Con tope: exactamente max_rows pares distintos, reproducibles por semilla"""
+    raw = _series_frame()
+    full = _pair_set(*build_direct_training_set(raw, 14)[:2])
+    n_pairs = len(build_direct_training_set(raw, 14)[0])
+    max_rows = n_pairs // 3
+
+    features, target, origins = build_direct_training_set(raw, 14, max_rows, seed=7)
+    again, _, _ = build_direct_training_set(raw, 14, max_rows, seed=7)
+    other, _, _ = build_direct_training_set(raw, 14, max_rows, seed=8)
+
+    assert len(features) == len(target) == max_rows
+    assert np.all(np.diff(origins) >= 0)
+    assert _pair_set(features, target) <= full
+    pd.testing.assert_frame_equal(features, again)
+    assert not features.equals(other)
+    print("✅ build_direct_training_set con tope: OK")
+
+
+if __name__ == "__main__":
+    test_direct_pair_counts_match_brute_force()
+    test_direct_training_set_without_cap_builds_every_pair()
+    test_direct_training_set_samples_pairs_reproducibly()
@@ -1,5 +1,7 @@
 import os
 import traceback  # Para mostrar tracebacks
+import numpy as np
+import pandas as pd
 from data_processing.import_export_Data.data_loader import DataLoader
 from data_processing.eda.eda import EnergyEDA
 from data_processing.eda.insights import InsightsGenerator
@@ -44,11 +46,35 @@ def run_eda_only():
         return eda
 
 
+def test_analyze_departments_without_calendar():
+    """analyze_departments sobre un DataFrame sin columna "mes" (llamada directa)"""
+    rng = np.random.default_rng(0)
+    n_rows = 200
+    df = pd.DataFrame(
+        {
+            "departamento": rng.choice(["Atlántico", "Cesar", "Magdalena"], n_rows),
+            "tecnologia": rng.choice(["Solar", "Eólica"], n_rows),
+            "produccion_mwh": rng.integers(100, 2000, n_rows).astype(float),
+            "fecha": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D"),
+        }
+    )
+
+    eda = EnergyEDA(df)
+    eda.analyze_departments()
+
+    analysis = eda.insights["analisis_departamentos"]
+    assert set(analysis) == {"Atlántico", "Cesar", "Magdalena"}
+    assert all(dept["tendencia_mensual"] for dept in analysis.values())
+    print("✅ analyze_departments sin columna 'mes': OK")
+
+
 if __name__ == "__main__":
     # Ejecutar análisis completo
     # main()
 
     # Opciones adicionales para ejecutar por separado:
     run_eda_only()  # Solo EDA original
+    test_analyze_departments_without_calendar()
     # run_predictions_only()      # Solo predicciones
     # quick_test_with_sample_data()  # Test con dataset pequeño
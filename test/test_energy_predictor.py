@@ -0,0 +1,37 @@
+import os
+import tempfile
+import pandas as pd
+from data_processing.config.config import ROOT_DIR
+from data_processing.import_export_Data.data_loader import DataLoader
+from machine_learning.predictor.data_preparation import prepare_data
+from machine_learning.predictor.energy_predictor import EnergyPredictor
+
+DATA_PATH = os.path.join(
+    ROOT_DIR, "data", "raw", "dataset_energia_completo_2050_registros.csv"
+)
+
+
+def test_predictor_df_materializes_every_feature():
+    """``.df`` trae todas las características; ``feature_frame`` solo las pedidas"""
+    loader = DataLoader(DATA_PATH, use_cache=False)
+    assert loader.load_data()
+
+    with tempfile.TemporaryDirectory() as directory:
+        predictor = EnergyPredictor(
+            loader.df,
+            model_dir=os.path.join(directory, "models"),
+            feature_dir=os.path.join(directory, "features"),
+        )
+        # Construir el predictor no calcula características
+        assert not predictor.features._computed
+
+        lags = predictor.feature_frame(["produccion_lag_1"])
+        assert "produccion_lag_1" in lags.columns
+        assert "mes_sin" not in lags.columns
+
+        pd.testing.assert_frame_equal(predictor.df, prepare_data(loader.df))
+    print("✅ EnergyPredictor.df con todas las características: OK")
+
+
+if __name__ == "__main__":
+    test_predictor_df_materializes_every_feature()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import os
+import tempfile
+import pandas as pd
+from data_processing.config.config import ROOT_DIR
+from data_processing.import_export_Data.data_loader import DataLoader
+from machine_learning.predictor.data_preparation import prepare_features
+
+DATA_PATH = os.path.join(
+    ROOT_DIR, "data", "raw", "dataset_energia_completo_2050_registros.csv"
+)
+
+
+def _load():
+    loader = DataLoader(DATA_PATH, use_cache=False)
+    assert loader.load_data()
+    return loader.df
+
+
+def _split(df):
+    """Histórico y filas posteriores (por fecha) de cada serie"""
+    cutoff = df["fecha"].quantile(0.8)
+    old = df[df["fecha"] <= cutoff].reset_index(drop=True)
+    new = df[df["fecha"] > cutoff].reset_index(drop=True)
+    return old, new
+
+
+def _open(df, store_dir):
+    """Marco completo desde el almacén y lo que imprimió al abrirlo"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        frame = prepare_features(df, store_dir=store_dir).frame()
+    return frame, output.getvalue()
+
+
+def _cold(df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return prepare_features(df).frame()
+
+
+def test_store_restores_same_data():
+    """Mismos datos: columnas mapeadas desde disco, iguales al cálculo en frío"""
+    df = _load()
+    expected = _cold(df)
+    # Las comparaciones, con los archivos mapeados todavía en disco
+    with tempfile.TemporaryDirectory() as store_dir:
+        first, _ = _open(df, store_dir)
+        restored, output = _open(df, store_dir)
+        pd.testing.assert_frame_equal(first, expected)
+        assert "mapeadas desde" in output
+        pd.testing.assert_frame_equal(restored, expected)
+    print("✅ Almacén de características con los mismos datos: OK")
+
+
+def test_store_extends_appended_rows():
+    """Filas anexadas al final: solo se calculan esas, igual que en frío"""
+    df = _load()
+    old, new = _split(df)
+    full = pd.concat([old, new], ignore_index=True)
+    expected = _cold(full)
+    with tempfile.TemporaryDirectory() as store_dir:
+        _open(old, store_dir)
+        extended, output = _open(full, store_dir)
+        assert "filas nuevas calculadas" in output
+        pd.testing.assert_frame_equal(extended, expected)
+
+        again, again_output = _open(full, store_dir)
+        assert "mapeadas desde" in again_output
+        pd.testing.assert_frame_equal(again, expected)
+    print("✅ Almacén de características extendido con filas nuevas: OK")
+
+
+def test_store_rebuilds_interleaved_rows():
+    """Filas anteriores a lo almacenado de su serie: se reconstruye desde cero"""
+    df = _load()
+    old, new = _split(df)
+    # Se guarda lo posterior y después llega el histórico anexado al final
+    late = pd.concat([new, old], ignore_index=True)
+    with tempfile.TemporaryDirectory() as store_dir:
+        _open(new, store_dir)
+        rebuilt, output = _open(late, store_dir)
+        assert "se recalcula todo" in output
+        pd.testing.assert_frame_equal(rebuilt, _cold(late))
+    print("✅ Almacén de características reconstruido: OK")
+
+
+if __name__ == "__main__":
+    test_store_restores_same_data()
+    test_store_extends_appended_rows()
+    test_store_rebuilds_interleaved_rows()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from machine_learning.predictor.forecast_engine import (
+    BatchForecaster,
+    calendar_matrix,
+    make_wave_adjustment,
+)
+
+FEATURES = [
+    "mes",
+    "trimestre",
+    "semana_año",
+    "mes_sin",
+    "mes_cos",
+    "semana_sin",
+    "semana_cos",
+    "produccion_lag_1",
+    "produccion_lag_2",
+    "produccion_ma_4",
+    "departamento_encoded",
+]
+
+
+def _history(seed=0):
+    """Series diarias sintéticas con las columnas que produce prepare_data"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    series = [("Atlántico", "Solar"), ("Cesar", "Eólica"), ("Magdalena", "Solar")]
+    for code, (dept, tech) in enumerate(series):
+        fechas = pd.date_range("2024-01-01", periods=60, freq="D")
+        prod = 1000 + 200 * code + rng.normal(0, 50, len(fechas)).cumsum()
+        df = pd.DataFrame(
+            {
+                "departamento": dept,
+                "tecnologia": tech,
+                "fecha": fechas,
+                "produccion_mwh": prod,
+                "departamento_encoded": float(code),
+            }
+        )
+        for name, values in calendar_matrix(fechas).items():
+            df[name] = values
+        df["produccion_lag_1"] = df["produccion_mwh"].shift(1).fillna(0.0)
+        df["produccion_lag_2"] = df["produccion_mwh"].shift(2).fillna(0.0)
+        df["produccion_ma_4"] = df["produccion_mwh"].rolling(4, min_periods=1).mean()
+        frames.append(df)
+    # Una serie demasiado corta: ambos caminos la omiten
+    frames.append(frames[0].head(2).assign(departamento="Cesar", tecnologia="Solar"))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _per_step_loop(model, data, dates, noise):
+    """Bucle anterior por serie y por día (referencia), con el ruido dado"""
+    monthly_means = data.groupby("mes")["produccion_mwh"].mean().to_dict()
+    predictions = []
+    groups = [g for _, g in data.groupby(["departamento", "tecnologia"]) if len(g) >= 3]
+    for s, group in enumerate(groups):
+        group = group.sort_values("fecha")
+        last_obs = group.iloc[-1]
+        history = group["produccion_mwh"].tail(4).tolist()
+        for i, date in enumerate(dates):
+            row = last_obs[FEATURES].astype(float).copy()
+            for name, values in calendar_matrix([date]).items():
+                row[name] = values[0]
+            row["produccion_lag_1"] = history[-1]
+            row["produccion_lag_2"] = history[-2]
+            row["produccion_ma_4"] = float(np.mean(history[-4:]))
+
+            value = max(0.0, model.predict(pd.DataFrame([row])[FEATURES])[0])
+            if row["mes"] in monthly_means:
+                mean = np.mean(list(monthly_means.values()))
+                value *= monthly_means[row["mes"]] / mean
+            value *= (1 + 0.05 * np.sin(2 * np.pi * (i / 30))) * noise[i, s]
+            predictions.append(
+                {
+                    "fecha": date,
+                    "departamento": group["departamento"].iloc[0],
+                    "tecnologia": group["tecnologia"].iloc[0],
+                    "prediccion_mwh": value,
+                }
+            )
+            history.append(value)
+    return pd.DataFrame(predictions)
+
+
+def test_batch_forecaster_matches_per_step_loop():
+    """BatchForecaster reproduce el bucle por serie con el mismo ruido sembrado"""
+    data = _history()
+    model = LinearRegression().fit(data[FEATURES], data["produccion_mwh"])
+    dates = pd.date_range(data["fecha"].max() + pd.Timedelta(days=1), periods=45)
+
+    # El motor en bloque toma el ruido paso a paso: una fila por paso
+    np.random.seed(42)
+    batch = BatchForecaster(model, data, FEATURES, min_history=3).run(
+        dates, make_wave_adjustment(data)
+    )
+    np.random.seed(42)
+    noise = np.random.normal(1, 0.015, size=(len(dates), 3))
+    expected = _per_step_loop(model, data, dates, noise)
+
+    assert len(batch) == 3 * len(dates)
+    pd.testing.assert_frame_equal(
+        batch.reset_index(drop=True), expected, check_dtype=False, rtol=1e-9
+    )
+    print("✅ BatchForecaster igual al bucle por paso: OK")
+
+
+if __name__ == "__main__":
+    test_batch_forecaster_matches_per_step_loop()
@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from data_processing.import_export_Data.data_loader import DataLoader
+from data_processing.import_export_Data.incremental_store import IncrementalStore
+from data_processing.eda.aggregate_cube import CUBE_DIMENSIONS
+from data_processing.eda.moments import MomentStore
+from data_processing.config.config import ROOT_DIR
+
+SOURCE = os.path.join(
+    ROOT_DIR, "data", "raw", "dataset_energia_completo_2050_registros.csv"
+)
+
+
+def _rows(df):
+    """Filas como tuplas comparables (sin depender del orden ni del índice)"""
+    return sorted(
+        zip(
+            df["departamento"].astype(str),
+            df["tecnologia"].astype(str),
+            df["produccion_mwh"].astype(float),
+            df["fecha"].dt.strftime("%Y-%m-%d"),
+        )
+    )
+
+
+def _source_lines():
+    with open(SOURCE, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    return lines[0], lines[1:]
+
+
+def _write(path, header, lines, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        if mode == "w":
+            f.write(header + "\n")
+        f.write("".join(f"{line}\n" for line in lines))
+
+
+def _ingest(path, store_dir):
+    loader = DataLoader(path, use_cache=False)
+    assert loader.load_incremental(store_dir)
+    return loader
+
+
+def _full_load(path):
+    loader = DataLoader(path, use_cache=False)
+    assert loader.load_data()
+    return loader.df
+
+
+def _assert_moments_match(loader):
+    """Acumuladores incrementales iguales a calcularlos sobre la vista completa"""
+    expected = MomentStore.from_frame(loader.df).cells
+    expected = expected.set_index(CUBE_DIMENSIONS).sort_index()
+    actual = loader.moments.cells.set_index(CUBE_DIMENSIONS).sort_index()
+    assert actual.index.equals(expected.index)
+    for column in ["count", "sum", "m2", "min", "max"]:
+        np.testing.assert_allclose(
+            actual[column].to_numpy(dtype=float),
+            expected[column].to_numpy(dtype=float),
+            rtol=1e-9,
+        )
+
+
+def test_split_ingest_matches_full_load():
+    """Un archivo que llega en dos corridas queda igual que load_data()"""
+    header, lines = _source_lines()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "energia.csv")
+        store_dir = os.path.join(directory, "store")
+
+        _write(path, header, lines[:1600])
+        first = _ingest(path, store_dir)
+        assert len(first.df) == 1600
+        _assert_moments_match(first)
+
+        _write(path, header, lines[1600:], mode="a")
+        second = _ingest(path, store_dir)
+        assert _rows(second.df) == _rows(_full_load(path))
+        assert len(second.df) == len(lines)
+        _assert_moments_match(second)
+
+        # Sin cambios en el archivo: la corrida no lee nada
+        rerun = _ingest(path, store_dir)
+        assert rerun.changed_series == set()
+        assert _rows(rerun.df) == _rows(second.df)
+    print("✅ Ingesta en dos corridas igual a load_data(): OK")
+
+
+def test_late_rows_are_kept_and_rewrites_replace():
+    """Las filas tardías se guardan; un archivo reescrito reemplaza sus filas"""
+    header, lines = _source_lines()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "energia.csv")
+        store_dir = os.path.join(directory, "store")
+        _write(path, header, lines)
+        _ingest(path, store_dir)
+
+        # Fila anterior a la marca de agua y con clave ya presente
+        dept, tech, _, fecha = lines[0].split(",")
+        _write(path, header, [f"{dept},{tech},123.5,{fecha}"], mode="a")
+        late = _ingest(path, store_dir)
+        assert len(late.df) == len(lines) + 1
+        assert _rows(late.df) == _rows(_full_load(path))
+        assert len(late.changed_series) == 1
+
+        # Reescritura con el mismo contenido: idempotente
+        shutil.copy(path, f"{path}.bak")
+        os.remove(path)
+        shutil.copy(f"{path}.bak", path)
+        same = _ingest(path, store_dir)
+        assert _rows(same.df) == _rows(late.df)
+
+        # Reescritura sin la fila tardía: esa fila desaparece del almacén
+        _write(path, header, lines)
+        rewritten = _ingest(path, store_dir)
+        assert _rows(rewritten.df) == _rows(_full_load(path))
+        _assert_moments_match(rewritten)
+
+        # Los acumuladores guardados se reutilizan tal cual en la corrida siguiente
+        reopened = IncrementalStore(store_dir)
+        assert reopened.moments.cells.sort_index().equals(
+            rewritten.moments.cells.sort_index()
+        )
+    print("✅ Filas tardías y archivos reescritos: OK")
+
+
+def test_watermarks_use_structured_keys():
+    """Las marcas de agua sobreviven nombres con '|' (sin claves compuestas en texto)"""
+    header = "departamento,tecnología,producción_mwh,fecha"
+    lines = [
+        "Norte|Sur,Solar,100,2024-01-01",
+        "Norte|Sur,Solar,110,2024-01-08",
+        "Cesar,Eólica|Solar,200,2024-01-15",
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "energia.csv")
+        store_dir = os.path.join(directory, "store")
+        _write(path, header, lines)
+        _ingest(path, store_dir)
+
+        with open(os.path.join(store_dir, "_state.json"), encoding="utf-8") as f:
+            marks = json.load(f)["watermarks"]
+        assert {(mark["departamento"], mark["tecnologia"]) for mark in marks} == {
+            ("Norte|Sur", "Solar"),
+            ("Cesar", "Eólica|Solar"),
+        }
+
+        store = IncrementalStore(store_dir)
+        assert set(store.watermarks) == {
+            ("Norte|Sur", "Solar"),
+            ("Cesar", "Eólica|Solar"),
+        }
+        assert str(store.watermarks[("Norte|Sur", "Solar")].date()) == "2024-01-08"
+    print("✅ Marcas de agua con claves estructuradas: OK")
+
+
+if __name__ == "__main__":
+    test_split_ingest_matches_full_load()
+    test_late_rows_are_kept_and_rewrites_replace()
+    test_watermarks_use_structured_keys()
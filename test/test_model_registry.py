@@ -0,0 +1,37 @@
+import os
+import tempfile
+import pandas as pd
+from machine_learning.predictor.model_registry import ModelRegistry
+
+
+def test_registry_reuses_fitted_artifact():
+    """Mismos datos y configuración: el segundo pedido no vuelve a entrenar"""
+    data = pd.DataFrame({"x": [1.0, 2.0, 3.0], "y": [2.0, 4.0, 6.0]})
+    calls = []
+
+    def fit():
+        calls.append(1)
+        return {"coef": 2.0}
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        registry = ModelRegistry(model_dir)
+        assert registry.fetch_or_fit("lineal", data, {"a": 1}, fit) == {"coef": 2.0}
+        assert registry.fetch_or_fit("lineal", data, {"a": 1}, fit) == {"coef": 2.0}
+        assert len(calls) == 1
+        assert os.listdir(os.path.join(model_dir, "lineal"))
+
+        # Otra configuración u otros datos: otra clave
+        registry.fetch_or_fit("lineal", data, {"a": 2}, fit)
+        registry.fetch_or_fit("lineal", data.assign(y=0.0), {"a": 1}, fit)
+        assert len(calls) == 3
+
+    # Sin directorio el registro queda deshabilitado
+    disabled = ModelRegistry(None)
+    disabled.fetch_or_fit("lineal", data, {"a": 1}, fit)
+    disabled.fetch_or_fit("lineal", data, {"a": 1}, fit)
+    assert len(calls) == 5
+    print("✅ Registro de modelos: OK")
+
+
+if __name__ == "__main__":
+    test_registry_reuses_fitted_artifact()
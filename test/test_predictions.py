@@ -1,4 +1,5 @@
 import os
+import tempfile
 import traceback  # Para mostrar tracebacks
 from data_processing.import_export_Data.data_loader import DataLoader
 from data_processing.eda.eda import EnergyEDA
@@ -24,7 +25,8 @@ def run_predictions_only():
     try:
         loader = DataLoader(DATA_PATH)
         if loader.load_data():
-            predictor = EnergyPredictor(loader.df)
+            # Registro de modelos temporal: los tests no escriben en data/models
+            predictor = EnergyPredictor(loader.df, model_dir=tempfile.mkdtemp())
             predictor.predict_with_ml(horizon_weeks=12)
             predictor.generate_prediction_insights()
 
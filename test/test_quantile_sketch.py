@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from data_processing.eda.quantile_sketch import (
+    GroupedQuantileSketch,
+    QuantileSketch,
+    capacity_for_error,
+)
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def _rank_error(data, estimates, qs=QS):
+    """Distancia en rango entre cada estimación y el cuantil pedido"""
+    ordered = np.sort(data)
+    low = np.searchsorted(ordered, estimates, side="left") / len(data)
+    high = np.searchsorted(ordered, estimates, side="right") / len(data)
+    return np.maximum(0, np.maximum(low - qs, qs - high))
+
+
+def test_sketch_rank_error_within_bound():
+    """Con varias semillas el error de rango queda dentro de max_error"""
+    for seed in range(10):
+        data = np.random.default_rng(seed).lognormal(7, 1, 100_000)
+        sketch = QuantileSketch.for_error(0.01, seed)
+        for chunk in np.array_split(data, 7):
+            sketch.update(chunk)
+
+        assert sketch.count == len(data)
+        assert len(sketch.levels) > 1
+        assert _rank_error(data, sketch.quantiles(QS)).max() <= sketch.max_error
+    print("✅ Error de rango del sketch dentro de la cota: OK")
+
+
+def test_merged_sketch_within_bound():
+    """Fusionar sketches de partes mantiene la cota sobre el flujo completo"""
+    data = np.random.default_rng(1).normal(1000, 200, 120_000)
+    parts = np.array_split(data, 5)
+    merged = QuantileSketch.for_error(0.01, seed=0)
+    for i, part in enumerate(parts):
+        merged.merge(QuantileSketch.for_error(0.01, seed=i + 1).update(part))
+
+    assert merged.count == len(data)
+    assert _rank_error(data, merged.quantiles(QS)).max() <= merged.max_error
+    np.testing.assert_allclose(
+        merged.rank(np.quantile(data, QS)), QS, atol=merged.max_error
+    )
+
+    other = QuantileSketch(capacity_for_error(0.05))
+    try:
+        merged.merge(other)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Fusionar capacidades distintas debería fallar")
+    print("✅ Sketch fusionado dentro de la cota: OK")
+
+
+def test_small_inputs_are_exact():
+    """Sin compactaciones el cuantil es exacto, como Series.quantile"""
+    values = pd.Series(np.random.default_rng(2).normal(0, 1, 200))
+    sketch = QuantileSketch.for_error(0.01).update(values)
+    assert len(sketch.levels) == 1
+    np.testing.assert_allclose(
+        sketch.quantiles([0.25, 0.5, 0.75]), values.quantile([0.25, 0.5, 0.75])
+    )
+    assert np.isnan(QuantileSketch.for_error(0.01).quantile(0.5))
+    print("✅ Cuantiles exactos sin compactar: OK")
+
+
+def test_grouped_sketch_bounds_and_round_trip():
+    """Cota por grupo, independiente del orden de llegada y tras serializar"""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "departamento": rng.choice(["Atlántico", "Cesar", "Magdalena"], 150_000),
+            "produccion_mwh": rng.gamma(2.0, 500.0, 150_000),
+        }
+    )
+    grouped = GroupedQuantileSketch.from_frame(df, "departamento", 0.01, seed=42)
+    table = grouped.quantiles(QS)
+    for dept, values in df.groupby("departamento")["produccion_mwh"]:
+        error = _rank_error(values.to_numpy(), table.loc[dept].to_numpy())
+        assert error.max() <= grouped.sketches[dept].max_error
+
+    # Otro orden de llegada y en dos bloques: la cota se mantiene
+    shuffled = df.sample(frac=1.0, random_state=0)
+    halves = GroupedQuantileSketch.for_error(0.01, "departamento", seed=42)
+    for part in np.array_split(shuffled.index, 2):
+        halves.update(shuffled.loc[part])
+    overall = _rank_error(
+        df["produccion_mwh"].to_numpy(), halves.overall().quantiles(QS)
+    )
+    assert overall.max() <= halves.overall().max_error
+
+    restored = GroupedQuantileSketch.from_dict(grouped.to_dict())
+    pd.testing.assert_frame_equal(restored.quantiles(QS), table)
+    print("✅ Sketch por grupo dentro de la cota: OK")
+
+
+if __name__ == "__main__":
+    test_sketch_rank_error_within_bound()
+    test_merged_sketch_within_bound()
+    test_small_inputs_are_exact()
+    test_grouped_sketch_bounds_and_round_trip()